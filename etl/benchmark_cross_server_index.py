@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Times the canonical monster id lookup done for every card in MonsterProcessor._process_monsters, as the linear scan
+over ownable_cards it used to be and through the CrossServerDatabase index, over growing numbers of cards.
+"""
+import argparse
+import logging
+import time
+
+from pad.common.shared_types import Server
+from pad.raw_processor import merged_database
+from pad.raw_processor.crossed_data import CrossServerDatabase
+
+logging.basicConfig()
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks CrossServerDatabase lookups.", add_help=False)
+
+    input_group = parser.add_argument_group("Input")
+    input_group.add_argument("--input_dir", required=True,
+                             help="Path to a folder where the input data is")
+    input_group.add_argument("--snapshot_dir", required=False,
+                             help="Directory for parsed database snapshots, reused while the raw data is unchanged")
+    input_group.add_argument("--steps", type=int, default=4,
+                             help="Number of card counts to time, each double the previous one")
+
+    help_group = parser.add_argument_group("Help")
+    help_group.add_argument("-h", "--help", action="help",
+                            help="Displays this help message and exits.")
+
+    return parser.parse_args()
+
+
+def scan_canonical_ids(data: CrossServerDatabase, cards):
+    return [next((cm.monster_id for cm in data.ownable_cards if cm.monster_id == m.monster_id % 100_000), None)
+            for m in cards]
+
+
+def index_canonical_ids(data: CrossServerDatabase, cards):
+    result = []
+    for m in cards:
+        canonical = data.ownable_card_by_monster_id(m.monster_id % 100_000)
+        result.append(canonical.monster_id if canonical else None)
+    return result
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run(args):
+    jp_db, na_db, kr_db = merged_database.load_databases([Server.jp, Server.na, Server.kr], args.input_dir,
+                                                         snapshot_dir=args.snapshot_dir)
+    data = CrossServerDatabase(jp_db, na_db, kr_db, Server.jp)
+    # The cards are merged on first access; build them first so only the index is timed.
+    data.ownable_cards
+    index_time, _ = timed(lambda: data.ownable_monster_id_to_card)
+
+    # The scan has to cover the whole ownable list for each card either way, so time prefixes of all_cards.
+    total = len(data.all_cards)
+    counts = [max(total >> i, 1) for i in reversed(range(args.steps))]
+    print('index built in {:.4f}s for {} ownable cards'.format(index_time, len(data.ownable_cards)))
+    print('{:>8} {:>10} {:>10}'.format('cards', 'scan s', 'index s'))
+    for count in counts:
+        cards = data.all_cards[:count]
+        scan_time, scanned = timed(scan_canonical_ids, data, cards)
+        lookup_time, looked_up = timed(index_canonical_ids, data, cards)
+        if scanned != looked_up:
+            raise ValueError('index and scan disagree')
+        print('{:>8} {:>10.4f} {:>10.4f}'.format(count, scan_time, lookup_time))
+
+
+if __name__ == '__main__':
+    run(parse_args())
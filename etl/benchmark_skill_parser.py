@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Times SkillParser.parse for each server's raw skill data, serially and with worker processes, and checks that
+every mode produces the same skills.
+"""
+import argparse
+import logging
+import os
+import time
+
+from pad.common.shared_types import Server
+from pad.raw import skill
+from pad.raw.skills.skill_parser import SkillParser
+
+logging.basicConfig()
+logging.getLogger('human_fix').setLevel(logging.CRITICAL)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks skill parsing.", add_help=False)
+
+    input_group = parser.add_argument_group("Input")
+    input_group.add_argument("--input_dir", required=True,
+                             help="Path to a folder where the input data is")
+    input_group.add_argument("--servers", default="jp,na,kr", help="Comma separated servers to parse")
+    input_group.add_argument("--processes", default="1,2,4",
+                             help="Comma separated worker process counts to time; 1 is a serial parse")
+    input_group.add_argument("--repeat", type=int, default=3, help="Runs per mode; the fastest is reported")
+
+    help_group = parser.add_argument_group("Help")
+    help_group.add_argument("-h", "--help", action="help",
+                            help="Displays this help message and exits.")
+
+    return parser.parse_args()
+
+
+def summarize(parser: SkillParser):
+    """Enough of the parse result to tell whether two parses agree."""
+    def describe(skills):
+        return [(type(s).__name__, s.skill_id, s.raw_data, [c.skill_id for c in getattr(s, 'child_skills', [])])
+                for s in skills]
+
+    return describe(parser.active_skills), describe(parser.leader_skills)
+
+
+def time_parse(data_dir: str, processes: int, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        # Parsing marks unknown skills, so each run starts from freshly loaded data.
+        skill_list = skill.load_skill_data(data_dir=data_dir)
+        start = time.perf_counter()
+        parser = SkillParser().parse(skill_list, processes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        result = summarize(parser)
+    return best, result
+
+
+def run(args):
+    process_counts = [int(p) for p in args.processes.split(',')]
+    print('{:<8} {:>10} {:>10} {:>10} {:>8}'.format('server', 'skills', 'processes', 'seconds', 'speedup'))
+    for server_name in args.servers.split(','):
+        server = Server[server_name.strip().lower()]
+        data_dir = os.path.join(args.input_dir, server.name)
+        skill_count = len(skill.load_skill_data(data_dir=data_dir))
+
+        baseline, baseline_result = time_parse(data_dir, 1, args.repeat)
+        for processes in process_counts:
+            if processes == 1:
+                elapsed, result = baseline, baseline_result
+            else:
+                elapsed, result = time_parse(data_dir, processes, args.repeat)
+            if result != baseline_result:
+                raise ValueError('{} parse with {} processes differs from the serial parse'.format(
+                    server.name, processes))
+            print('{:<8} {:>10} {:>10} {:>10.2f} {:>7.2f}x'.format(
+                server.name, skill_count, processes, elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Writes the column caches for raw data that was pulled before pad_data_pull.py wrote them, or after the cache
+format changed.
+"""
+import argparse
+import logging
+import os
+
+from pad.common import column_cache
+from pad.common.shared_types import Server
+from pad.raw import card
+
+logging.basicConfig()
+logging.getLogger('processor').setLevel(logging.INFO)
+
+# Raw file -> the list in it that is cached. Only tables that load faster from the cache are listed; the skill
+# rows are short and mostly strings, and load faster from JSON.
+CACHED_TABLES = {
+    card.FILE_NAME: 'card',
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Builds column caches of the raw data.", add_help=False)
+
+    input_group = parser.add_argument_group("Input")
+    input_group.add_argument("--input_dir", required=True,
+                             help="Path to a folder where the input data is")
+
+    help_group = parser.add_argument_group("Help")
+    help_group.add_argument("-h", "--help", action="help",
+                            help="Displays this help message and exits.")
+
+    return parser.parse_args()
+
+
+def build(input_dir: str):
+    for server in Server:
+        for file_name, key in CACHED_TABLES.items():
+            json_file = os.path.join(input_dir, server.name, file_name)
+            if not os.path.exists(json_file):
+                continue
+            if column_cache.write_cache(json_file, key):
+                print('wrote', column_cache.cache_path(json_file))
+
+
+if __name__ == '__main__':
+    build(parse_args().input_dir)
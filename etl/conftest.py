@@ -0,0 +1,4 @@
+import os
+
+# The generated dadguide_proto modules predate protobuf 4, whose default implementation refuses to load them.
+os.environ.setdefault('PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION', 'python')
@@ -9,22 +9,30 @@ import logging
 import os
 from typing import Any, Dict, List
 
+from pad.common import pad_util
+from pad.common.json_writer import JsonWriter, save_files
 from pad.common.shared_types import Server
+from pad.common.stage_profiler import StageProfiler
 from pad.db.db_util import DbWrapper
-from pad.raw_processor import crossed_data, merged_database
+from pad.db.statement_stats import StatementStats
+from pad.raw.skills.skill_text_renderer import renderer
+from pad.raw_processor import crossed_data, database_snapshot, merged_database
 from pad.storage_processor.awoken_skill_processor import AwokenSkillProcessor
+from pad.storage_processor.checkpoint import ProcessorCheckpoint
 from pad.storage_processor.dimension_processor import DimensionProcessor
 from pad.storage_processor.dungeon_content_processor import DungeonContentProcessor
 from pad.storage_processor.dungeon_processor import DungeonProcessor
 from pad.storage_processor.egg_machine_processor import EggMachineProcessor
 from pad.storage_processor.enemy_skill_processor import EnemySkillProcessor
 from pad.storage_processor.exchange_processor import ExchangeProcessor
+from pad.storage_processor.input_manifest import InputManifest, listing_hash, select_changed_processors
 from pad.storage_processor.latent_skill_processor import LatentSkillProcessor
 from pad.storage_processor.monster_processor import MonsterProcessor
 from pad.storage_processor.purchase_processor import PurchaseProcessor
 from pad.storage_processor.purge_data_processor import PurgeDataProcessor
 from pad.storage_processor.rank_reward_processor import RankRewardProcessor
 from pad.storage_processor.schedule_processor import ScheduleProcessor
+from pad.storage_processor.scheduler import ProcessorScheduler, ProcessorTask, processor_task
 from pad.storage_processor.series_processor import SeriesProcessor
 from pad.storage_processor.skill_tag_processor import SkillTagProcessor
 from pad.storage_processor.timestamp_processor import TimestampProcessor
@@ -107,17 +115,56 @@ def parse_args():
                              help="If true, only load ES and then quit")
     input_group.add_argument("--media_dir", required=False,
                              help="Path to the root folder containing images, voices, etc")
+    input_group.add_argument("--load_processes", type=int, default=1,
+                             help="Load the JP/NA/KR databases in this many parallel processes")
+    input_group.add_argument("--skill_processes", type=int, default=1,
+                             help="Convert each server's skills in this many parallel processes")
+    input_group.add_argument("--incremental", default=False, action="store_true",
+                             help="Only run the processors whose inputs changed since they last completed")
+    input_group.add_argument("--manifest", required=False,
+                             help="Input manifest for --incremental, defaults to input_manifest.json in output_dir")
+    input_group.add_argument("--resume", default=False, action="store_true",
+                             help="Skip the processor work a failed run with the same inputs completed")
+    input_group.add_argument("--checkpoint", required=False,
+                             help="Checkpoint file for --resume, defaults to processor_checkpoint.json in output_dir")
+    input_group.add_argument("--snapshot_dir", required=False,
+                             help="Directory for parsed database snapshots, reused while the raw data is unchanged")
+    input_group.add_argument("--skill_text_cache", required=False,
+                             help="File of rendered skill text, reused for skills whose data is unchanged")
 
     proc_group = parser.add_argument_group("Processors")
     proc_group.add_argument("--processors", default="All",
                             help="Comma-separated specific processors to run.")
     proc_group.add_argument("--server", default="COMBINED", help="Server to build for")
+    proc_group.add_argument("--commit_every", type=int, default=None,
+                            help="Commit after this many writes instead of once per processor")
+    proc_group.add_argument("--verify_content_hashes", default=False, action="store_true",
+                            help="Compare every row in full even if its content hash is unchanged, repairing rows "
+                                 "that were changed outside the pipeline")
+    proc_group.add_argument("--processor_threads", type=int, default=1,
+                            help="How many independent processors may run at the same time")
 
     output_group = parser.add_argument_group("Output")
     output_group.add_argument("--output_dir", required=True,
                               help="Path to a folder where output should be saved")
     output_group.add_argument("--pretty", default=False, action="store_true",
                               help="Controls pretty printing of results")
+    output_group.add_argument("--intermediate_processes", type=int, default=1,
+                              help="Write the intermediate files in this many parallel processes")
+    output_group.add_argument("--intermediate_compression", choices=['gzip', 'zstd'], default=None,
+                              help="Compress the intermediate files, adding .gz/.zst to their names")
+    output_group.add_argument("--fast_json", default=False, action="store_true",
+                              help="Write the intermediate files with orjson; faster, but the output differs")
+    output_group.add_argument("--change_feed", default=False, action="store_true",
+                              help="Saves change_feed.json to output_dir, listing the cross-server cards, skills and "
+                                   "dungeons that changed since the last successful run with this flag")
+    output_group.add_argument("--profile", default=False, action="store_true",
+                              help="Times each stage and SQL statement, saving profile_summary.json, profile.folded and "
+                                   "sql_statement_stats.json to output_dir")
+    output_group.add_argument("--profile_cpu", default=False, action="store_true",
+                              help="Implies --profile, also saves a cProfile .pstats file per stage")
+    output_group.add_argument("--profile_memory", default=False, action="store_true",
+                              help="Implies --profile, also traces memory allocated per stage (slow)")
 
     help_group = parser.add_argument_group("Help")
     help_group.add_argument("-h", "--help", action="help",
@@ -147,132 +194,227 @@ def load_data(args):
     if args.processors == "None":
         return
 
+    profiler = StageProfiler(args.profile, args.profile_cpu, args.profile_memory)
+    try:
+        process_data(args, profiler)
+    finally:
+        if profiler.enabled:
+            logger.info('Stage timings:\n%s', profiler.report())
+            profiler.save(args.output_dir)
+
+
+def process_data(args, profiler: StageProfiler):
     if args.logsql:
         logging.getLogger('database').setLevel(logging.DEBUG)
     dry_run = not args.doupdates
 
-    logger.info('Loading data')
-    jp_database = merged_database.Database(Server.jp, args.input_dir)
-    jp_database.load_database()
-
-    na_database = merged_database.Database(Server.na, args.input_dir)
-    na_database.load_database()
+    processors = []
+    for proc in args.processors.split(","):
+        proc = proc.strip()
+        if proc in type_name_to_processor:
+            processors.extend(type_name_to_processor[proc])
+        else:
+            logger.warning("Unknown processor: {}\nSkipping...".format(proc))
 
-    kr_database = merged_database.Database(Server.kr, args.input_dir)
-    kr_database.load_database()
+    manifest = InputManifest(args.manifest or os.path.join(args.output_dir, 'input_manifest.json'), args.input_dir,
+                             {'server': args.server.lower(), 'es_dir': args.es_dir, 'media_dir': args.media_dir})
+    input_digests = processor_input_digests(processors, manifest, args)
+    if args.incremental:
+        processors = select_changed_processors(processors, manifest, input_digests)
+        if not processors:
+            logger.info('No processor inputs changed since the last run')
+            return
 
-    if input_args.server.lower() == "combined":
-        cs_database = crossed_data.CrossServerDatabase(jp_database, na_database, kr_database, Server.jp)
-    elif input_args.server.lower() == "jp":
-        cs_database = crossed_data.CrossServerDatabase(jp_database, jp_database, jp_database, Server.jp)
-    elif input_args.server.lower() == "na":
-        cs_database = crossed_data.CrossServerDatabase(na_database, na_database, na_database, Server.na)
-    elif input_args.server.lower() == "kr":
-        cs_database = crossed_data.CrossServerDatabase(kr_database, kr_database, kr_database, Server.kr)
-    else:
-        raise ValueError()
+    logger.info('Loading data')
+    with profiler.span('load_databases'):
+        jp_database, na_database, kr_database = merged_database.load_databases(
+            [Server.jp, Server.na, Server.kr], args.input_dir, args.load_processes, profiler,
+            snapshot_dir=args.snapshot_dir, skill_processes=args.skill_processes)
+
+    with profiler.span('cross_server_database'):
+        if input_args.server.lower() == "combined":
+            cs_database = crossed_data.CrossServerDatabase(jp_database, na_database, kr_database, Server.jp)
+        elif input_args.server.lower() == "jp":
+            cs_database = crossed_data.CrossServerDatabase(jp_database, jp_database, jp_database, Server.jp)
+        elif input_args.server.lower() == "na":
+            cs_database = crossed_data.CrossServerDatabase(na_database, na_database, na_database, Server.na)
+        elif input_args.server.lower() == "kr":
+            cs_database = crossed_data.CrossServerDatabase(kr_database, kr_database, kr_database, Server.kr)
+        else:
+            raise ValueError()
 
     if args.media_dir:
-        cs_database.load_extra_image_info(args.media_dir)
+        with profiler.span('load_extra_image_info'):
+            cs_database.load_extra_image_info(args.media_dir)
 
     if not args.skipintermediate:
         logger.info('Storing intermediate data')
         # This is supported for https://pad.chesterip.cc/ and PadSpike, until we can support it better in the dg db
-        jp_database.save_all(args.output_dir, args.pretty)
-        na_database.save_all(args.output_dir, args.pretty)
+        writer = JsonWriter(args.pretty, 'orjson' if args.fast_json else 'json', args.intermediate_compression)
+        with profiler.span('save_all'):
+            cs_database.apply_source_fixups()
+            save_files(writer,
+                       jp_database.intermediate_files(args.output_dir) + na_database.intermediate_files(args.output_dir),
+                       args.intermediate_processes)
         # kr_database.save_all(args.output_dir, args.pretty)
 
+    change_feed = None
+    if args.change_feed:
+        with profiler.span('change_feed'):
+            change_feed = cs_database.change_feed(os.path.join(args.output_dir, 'cross_server_digests.json'))
+            change_feed.save_feed(os.path.join(args.output_dir, 'change_feed.json'))
+        logger.info('Changes since the last run: %s', change_feed.summary())
+
     logger.info('Connecting to database')
     with open(args.db_config) as f:
         db_config = json.load(f)
 
-    db_wrapper = DbWrapper(dry_run)
-    db_wrapper.connect(db_config)
-
-    processors = []
-    for proc in args.processors.split(","):
-        proc = proc.strip()
-        if proc in type_name_to_processor:
-            processors.extend(type_name_to_processor[proc])
-        else:
-            logger.warning("Unknown processor: {}\nSkipping...".format(proc))
+    def connect() -> DbWrapper:
+        db_wrapper = DbWrapper(dry_run, trust_content_hashes=not args.verify_content_hashes,
+                               record_statement_stats=profiler.enabled)
+        db_wrapper.connect(db_config)
+        return db_wrapper
+
+    processor_threads = args.processor_threads
+    if db_config.get('backend') == 'sqlite' and processor_threads > 1:
+        logger.info('sqlite allows a single writer, running processors one at a time')
+        processor_threads = 1
+
+    # Processors declare what they depend on and write (DEPENDS_ON, WRITES); the scheduler runs independent ones
+    # concurrently, each in its own transaction on its own connection. Tasks are added in the preferred
+    # sequential order.
+    # Completed tasks (and progress within DungeonContentProcessor) are recorded so that --resume can pick up a
+    # failed run where it stopped. The key ties the checkpoint to these inputs and options.
+    checkpoint = ProcessorCheckpoint(
+        args.checkpoint or os.path.join(args.output_dir, 'processor_checkpoint.json'),
+        manifest.digest(database_snapshot.INPUT_FILES, [args.processors, 'dry_run={}'.format(dry_run)]),
+        args.resume)
+    scheduler = ProcessorScheduler(connect, processor_threads, args.commit_every, profiler, checkpoint)
+
+    def schedule(processor, run=None, name=None):
+        scheduler.add(processor_task(processor, run or processor.process, name))
 
     # Load dimension tables
     if DimensionProcessor in processors:
-        DimensionProcessor().process(db_wrapper)
+        schedule(DimensionProcessor())
 
     # # Load rank data
     if RankRewardProcessor in processors:
-        RankRewardProcessor().process(db_wrapper)
+        schedule(RankRewardProcessor())
 
     # # Ensure awakenings
     if AwokenSkillProcessor in processors:
-        AwokenSkillProcessor().process(db_wrapper)
+        schedule(AwokenSkillProcessor())
 
     # # Ensure tags
     if SkillTagProcessor in processors:
-        SkillTagProcessor().process(db_wrapper)
+        schedule(SkillTagProcessor())
 
     # # Load enemy skills
     if EnemySkillProcessor in processors:
-        es_processor = EnemySkillProcessor(db_wrapper, cs_database)
-        es_processor.load_static()
-        es_processor.load_enemy_skills()
-        if args.es_dir:
-            es_processor.load_enemy_data(args.es_dir)
+        def load_enemy_skills(db_wrapper: DbWrapper):
+            es_processor = EnemySkillProcessor(db_wrapper, cs_database)
+            es_processor.load_static()
+            es_processor.load_enemy_skills()
+            if args.es_dir:
+                es_processor.load_enemy_data(args.es_dir)
+
+        schedule(EnemySkillProcessor, load_enemy_skills)
 
     # Load basic series data
     if SeriesProcessor in processors:
-        SeriesProcessor(cs_database).process(db_wrapper)
+        schedule(SeriesProcessor(cs_database))
 
     # # Load monster data
     if MonsterProcessor in processors:
-        MonsterProcessor(cs_database).process(db_wrapper)
+        schedule(MonsterProcessor(cs_database))
 
     # # Ensure Latents
     if LatentSkillProcessor in processors:
-        LatentSkillProcessor(cs_database).process(db_wrapper)
+        schedule(LatentSkillProcessor(cs_database))
 
     # Egg machines
     if EggMachineProcessor in processors:
-        EggMachineProcessor(cs_database).process(db_wrapper)
+        schedule(EggMachineProcessor(cs_database))
 
     # Load dungeon data
-    dungeon_processor = None
+    dungeon_processor = DungeonProcessor(cs_database)
     if DungeonProcessor in processors:
-        dungeon_processor = DungeonProcessor(cs_database)
-        dungeon_processor.process(db_wrapper)
+        schedule(dungeon_processor)
 
-    if DungeonContentProcessor in processors and input_args.server.lower() == "combined":
+    load_dungeon_content = DungeonContentProcessor in processors and input_args.server.lower() == "combined"
+    if load_dungeon_content:
         # Load dungeon data derived from wave info
-        DungeonContentProcessor(cs_database).process(db_wrapper)
+        schedule(DungeonContentProcessor(cs_database, checkpoint))
 
-    # Toggle any newly-available dungeons visible
-    if dungeon_processor is not None:
-        dungeon_processor.post_encounter_process(db_wrapper)
+    if DungeonProcessor in processors or load_dungeon_content:
+        # Toggle any newly-available dungeons visible, once encounters are loaded. This also runs when only the
+        # encounters are loaded, e.g. when --incremental skips DungeonProcessor because dungeon.json is unchanged.
+        scheduler.add(ProcessorTask('DungeonProcessor.post_encounter_process', dungeon_processor.post_encounter_process,
+                                    depends_on=['DungeonProcessor', 'DungeonContentProcessor'],
+                                    writes=['dungeons']))
 
     # Load event data
     if ScheduleProcessor in processors:
-        ScheduleProcessor(cs_database).process(db_wrapper)
+        schedule(ScheduleProcessor(cs_database))
 
     # Load exchange data
     if ExchangeProcessor in processors:
-        ExchangeProcessor(cs_database).process(db_wrapper)
+        schedule(ExchangeProcessor(cs_database))
 
     # Load purchase data
     if PurchaseProcessor in processors:
-        PurchaseProcessor(cs_database).process(db_wrapper)
+        schedule(PurchaseProcessor(cs_database))
 
     # Update timestamps
-    if ExchangeProcessor in processors:
-        TimestampProcessor().process(db_wrapper)
+    if TimestampProcessor in processors:
+        schedule(TimestampProcessor())
 
     if PurgeDataProcessor in processors:
-        PurgeDataProcessor().process(db_wrapper)
+        schedule(PurgeDataProcessor())
 
+    if args.skill_text_cache:
+        renderer.load(args.skill_text_cache)
+
+    try:
+        with profiler.span('storage_processors', cpu=False):
+            scheduler.run()
+        checkpoint.clear()
+        if change_feed:
+            # Only a completed run moves the baseline, so a failed run's changes are listed again by the next one.
+            change_feed.save()
+    finally:
+        renderer.save()
+        if profiler.enabled:
+            report_statement_stats(scheduler.statement_stats, args.output_dir)
+        if not dry_run:
+            for processor, digest in input_digests.items():
+                if processor.__name__ in scheduler.completed:
+                    manifest.record(processor.__name__, digest)
+            manifest.save()
     logger.info('Done')
 
 
+def processor_input_digests(processors, manifest: InputManifest, args) -> Dict[Any, str]:
+    """Input digest of every processor that declares INPUTS."""
+    extra_inputs = {}
+    if args.es_dir and EnemySkillProcessor in processors:
+        extra_inputs[EnemySkillProcessor] = [pad_util.tree_hash(args.es_dir)]
+    if args.media_dir:
+        # Only the file names are read, see CrossServerDatabase.load_extra_image_info
+        extra_inputs[MonsterProcessor] = [listing_hash(os.path.join(args.media_dir, 'jp', 'hq_portraits'),
+                                                       os.path.join(args.media_dir, 'animated_tombstones'))]
+    return {p: manifest.digest(p.INPUTS, extra_inputs.get(p, ()))
+            for p in processors if getattr(p, 'INPUTS', None) is not None}
+
+
+def report_statement_stats(stats: StatementStats, output_dir: str):
+    logger.info('SQL statements by total time:\n%s', stats.report())
+    stats_file = os.path.join(output_dir, 'sql_statement_stats.json')
+    stats.save(stats_file)
+    logger.info('Saved SQL statement stats to %s', stats_file)
+
+
 if __name__ == '__main__':
     input_args = parse_args()
     os.environ['CURRENT_PIPELINE_SERVER'] = input_args.server.strip()
@@ -0,0 +1,171 @@
+"""
+Binary, memory-mapped copies of the list tables in the raw JSON files (e.g. the card and skill rows).
+
+The rows of these tables are flat lists of ints with a few strings and floats mixed in. A cache file stores every
+cell as an int64 column, with per-row patches that put the floats and strings (from their own tables) back in
+place, so a row is rebuilt from one slice of the mapped file instead of being parsed from JSON.
+
+A cache file sits next to its JSON file and records the JSON file's inode, size, mtime and ctime; it is ignored once
+any of them changes. A copy that keeps the mtime still gets a new ctime, which can't be set from user space.
+Tables with cells of any other type (e.g. nested lists) are not cached.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger('processor')
+
+MAGIC = b'PADCOLS2'
+
+# Patch kinds: the cell's slot in the int column holds an index into the matching table, or nothing.
+_FLOAT, _STRING, _NONE, _TRUE, _FALSE = range(5)
+_CONSTANTS = {_NONE: None, _TRUE: True, _FALSE: False}
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+# Sections of the file: arrays of int64, float64 for floats, and the strings as one JSON array so that they are
+# decoded in a single call.
+_SECTIONS = ('row_offsets', 'cells', 'patch_offsets', 'patches', 'floats', 'strings')
+
+
+def cache_path(json_file: str) -> str:
+    return os.path.splitext(json_file)[0] + '.cols'
+
+
+def _source_stamp(json_file: str) -> Dict[str, int]:
+    stat = os.stat(json_file)
+    return {'ino': stat.st_ino, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'ctime_ns': stat.st_ctime_ns}
+
+
+def write_cache(json_file: str, key: str) -> bool:
+    """Writes the cache of the list at key in json_file; returns False if the table can't be cached."""
+    # Stamped before reading, so a write to the JSON file during the read leaves a cache that is already stale.
+    source = _source_stamp(json_file)
+    with open(json_file, encoding='utf-8') as f:
+        rows = json.load(f)[key]
+
+    sections = {name: array('q') for name in ('row_offsets', 'cells', 'patch_offsets', 'patches')}
+    floats = array('d')
+    string_index = {}  # type: Dict[str, int]
+    sections['row_offsets'].append(0)
+    sections['patch_offsets'].append(0)
+
+    for row in rows:
+        if not isinstance(row, list):
+            logger.info('Not caching %s: %s entries are not lists', json_file, key)
+            return False
+        for pos, value in enumerate(row):
+            if value is None or value is True or value is False:
+                kind = _NONE if value is None else _TRUE if value else _FALSE
+                sections['patches'].extend((pos, kind, 0))
+                value = 0
+            elif isinstance(value, int):
+                if not _INT64_MIN <= value <= _INT64_MAX:
+                    logger.info('Not caching %s: %d does not fit in 64 bits', json_file, value)
+                    return False
+            elif isinstance(value, float):
+                sections['patches'].extend((pos, _FLOAT, len(floats)))
+                floats.append(value)
+                value = 0
+            elif isinstance(value, str):
+                if value not in string_index:
+                    string_index[value] = len(string_index)
+                sections['patches'].extend((pos, _STRING, string_index[value]))
+                value = 0
+            else:
+                logger.info('Not caching %s: unsupported %s value in %s', json_file, type(value).__name__, key)
+                return False
+            sections['cells'].append(value)
+        sections['row_offsets'].append(len(sections['cells']))
+        sections['patch_offsets'].append(len(sections['patches']) // 3)
+
+    sections['floats'] = floats
+    sections['strings'] = json.dumps(list(string_index), ensure_ascii=False).encode('utf-8')
+
+    header = {'key': key, 'rows': len(rows), 'source': source, 'sections': {}}
+    body = bytearray()
+    for name in _SECTIONS:
+        data = bytes(sections[name])
+        header['sections'][name] = [len(body), len(data)]
+        body += data
+        body += b'\0' * (-len(body) % 8)
+
+    header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+    header_bytes += b' ' * (-(len(MAGIC) + 8 + len(header_bytes)) % 8)
+
+    path = cache_path(json_file)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<q', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(body)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _read_header(f, json_file: str, key: str) -> Optional[Dict[str, Any]]:
+    if f.read(len(MAGIC)) != MAGIC:
+        return None
+    header_len, = struct.unpack('<q', f.read(8))
+    header = json.loads(f.read(header_len))
+    if header['key'] != key or header['source'] != _source_stamp(json_file):
+        return None
+    header['body_start'] = len(MAGIC) + 8 + header_len
+    return header
+
+
+def read_rows(json_file: str, key: str) -> Optional[Iterator[List[Any]]]:
+    """The rows of the list at key in json_file from its cache, or None if there is no current cache."""
+    path = cache_path(json_file)
+    if not os.path.exists(path) or not os.path.exists(json_file):
+        return None
+    with open(path, 'rb') as f:
+        header = _read_header(f, json_file, key)
+    if header is None:
+        logger.debug('Ignoring stale column cache %s', path)
+        return None
+    return _iter_rows(path, header)
+
+
+def _iter_rows(path: str, header: Dict[str, Any]) -> Iterator[List[Any]]:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        views = [memoryview(mm)]
+
+        def section(name: str, fmt: str = None) -> memoryview:
+            start, length = header['sections'][name]
+            start += header['body_start']
+            views.append(views[0][start:start + length])
+            if fmt:
+                views.append(views[-1].cast(fmt))
+            return views[-1]
+
+        try:
+            # Offsets are read for every row, and list indexing is cheaper than memoryview indexing.
+            row_offsets = section('row_offsets', 'q').tolist()
+            cells = section('cells', 'q')
+            patch_offsets = section('patch_offsets', 'q').tolist()
+            patches = section('patches', 'q')
+            floats = section('floats', 'd').tolist()
+            strings = json.loads(str(section('strings'), 'utf-8'))
+
+            for i in range(header['rows']):
+                row = cells[row_offsets[i]:row_offsets[i + 1]].tolist()
+                if patch_offsets[i] != patch_offsets[i + 1]:
+                    it = iter(patches[patch_offsets[i] * 3:patch_offsets[i + 1] * 3].tolist())
+                    for pos, kind, ref in zip(it, it, it):
+                        if kind == _STRING:
+                            row[pos] = strings[ref]
+                        elif kind == _FLOAT:
+                            row[pos] = floats[ref]
+                        else:
+                            row[pos] = _CONSTANTS[kind]
+                yield row
+        finally:
+            # The map can only close once every view of it is released.
+            for view in reversed(views):
+                view.release()
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+from pad.common import column_cache
+from pad.common.pad_util import iter_raw_json_list
+
+ROWS = [
+    [1, 'Tyrra', 2.5, -3, None, True, False, 1 << 62, 'ティラ'],
+    [],
+    [2, 'Tyrra', 0.0, 7],
+]
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    path = str(tmp_path / 'download_card_data.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'res': 0, 'card': ROWS}, f, ensure_ascii=False)
+    return path
+
+
+def test_round_trip(json_file):
+    assert column_cache.write_cache(json_file, 'card')
+    assert os.path.exists(column_cache.cache_path(json_file))
+
+    rows = list(column_cache.read_rows(json_file, 'card'))
+    assert rows == ROWS
+    # 0.0 == 0 and True == 1, so compare the types too.
+    assert [list(map(type, row)) for row in rows] == [list(map(type, row)) for row in ROWS]
+    assert list(iter_raw_json_list(json_file=json_file, key='card')) == ROWS
+
+
+def test_no_cache(json_file):
+    assert column_cache.read_rows(json_file, 'card') is None
+
+
+def test_other_key_is_not_read_from_the_cache(json_file):
+    column_cache.write_cache(json_file, 'card')
+    assert column_cache.read_rows(json_file, 'skill') is None
+
+
+@pytest.mark.parametrize('value', [[1, [2]], {'a': 1}, 1 << 64])
+def test_unsupported_values_are_not_cached(json_file, value):
+    with open(json_file, 'w') as f:
+        json.dump({'card': [[1, value]]}, f)
+    assert not column_cache.write_cache(json_file, 'card')
+    assert column_cache.read_rows(json_file, 'card') is None
+
+
+def test_rewrite_keeping_size_and_mtime_is_stale(json_file):
+    column_cache.write_cache(json_file, 'card')
+    stat = os.stat(json_file)
+
+    changed = ROWS[:2] + [[3, 'Tyrra', 0.0, 7]]
+    tmp_file = json_file + '.new'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'res': 0, 'card': changed}, f, ensure_ascii=False)
+    os.utime(tmp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_file, json_file)
+    assert os.path.getsize(json_file) == stat.st_size
+
+    assert column_cache.read_rows(json_file, 'card') is None
+    assert list(iter_raw_json_list(json_file=json_file, key='card')) == changed
@@ -0,0 +1,133 @@
+"""
+Streaming writer for the intermediate JSON files.
+
+With the default settings the output is byte-identical to pad_util.json_file_dump. Lists are encoded one element
+at a time, which keeps memory flat and, for non-pretty output, lets the json module use its C encoder instead of
+the pure Python one that json.dump falls back to.
+"""
+import gzip
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, IO, List, Optional, Tuple
+
+from pad.common.shared_types import dump_helper
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PRETTY_INDENT = 4
+
+COMPRESSION_SUFFIXES = {
+    None: '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+class JsonWriter(object):
+    """Writes objects as JSON files.
+
+    backend='orjson' is much faster but not byte-identical: enums are written by value and pretty output uses a
+    two space indent. compression='gzip' or 'zstd' appends .gz or .zst to the file names.
+    """
+
+    def __init__(self, pretty: bool = False, backend: str = 'json', compression: Optional[str] = None):
+        if backend not in ('json', 'orjson'):
+            raise ValueError('unknown json backend:', backend)
+        if backend == 'orjson' and orjson is None:
+            raise ImportError('the orjson backend requires the orjson package')
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError('unknown compression:', compression)
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError('zstd compression requires the zstandard package')
+        self.pretty = pretty
+        self.backend = backend
+        self.compression = compression
+
+    def file_path(self, path: str) -> str:
+        return path + COMPRESSION_SUFFIXES[self.compression]
+
+    def _open(self, path: str) -> IO[bytes]:
+        if self.compression == 'gzip':
+            # mtime=0 keeps the output reproducible.
+            return gzip.GzipFile(path, 'wb', mtime=0)
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+        return open(path, 'wb')
+
+    def save(self, path: str, obj: Any) -> str:
+        """Writes obj to path (plus the compression suffix) and returns the path written."""
+        path = self.file_path(path)
+        with self._open(path) as f:
+            for chunk in self.encode(obj):
+                f.write(chunk)
+        return path
+
+    def encode(self, obj: Any):
+        """Yields the encoded file content in chunks."""
+        if self.backend == 'orjson':
+            option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            if self.pretty:
+                option |= orjson.OPT_INDENT_2
+            yield orjson.dumps(obj, default=dump_helper, option=option)
+            return
+
+        if not isinstance(obj, list) or not obj:
+            yield self._dumps(obj).encode('utf-8')
+            return
+
+        if self.pretty:
+            # Same layout as json.dump with indent: one element per line, each nested one level deeper. Newlines
+            # inside strings are escaped, so every newline in an element's encoding is structural.
+            nested = '\n' + ' ' * PRETTY_INDENT
+            separator, start, end = ',' + nested, '[' + nested, '\n]'
+        else:
+            nested = None
+            separator, start, end = ', ', '[', ']'
+
+        yield start.encode('utf-8')
+        for i, item in enumerate(obj):
+            encoded = self._dumps(item)
+            if nested:
+                encoded = encoded.replace('\n', nested)
+            yield ((separator if i else '') + encoded).encode('utf-8')
+        yield end.encode('utf-8')
+
+    def _dumps(self, obj: Any) -> str:
+        indent = PRETTY_INDENT if self.pretty else None
+        return json.dumps(obj, indent=indent, sort_keys=True, default=dump_helper, ensure_ascii=False)
+
+
+# Jobs for forked save_files workers; inherited by the children rather than pickled.
+_fork_writer = None  # type: Optional[JsonWriter]
+_fork_jobs = []  # type: List[Tuple[str, Any]]
+
+
+def _save_forked_job(idx: int) -> str:
+    path, obj = _fork_jobs[idx]
+    return _fork_writer.save(path, obj)
+
+
+def save_files(writer: JsonWriter, jobs: List[Tuple[str, Any]], processes: int = 1) -> List[str]:
+    """Saves each (path, obj) job, in parallel forked processes if processes > 1 and the platform can fork."""
+    global _fork_writer, _fork_jobs
+    if processes <= 1 or len(jobs) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [writer.save(path, obj) for path, obj in jobs]
+
+    # Largest first, so that the long ones don't end up last.
+    order = sorted(range(len(jobs)), key=lambda i: -len(jobs[i][1]) if isinstance(jobs[i][1], list) else 0)
+    _fork_writer, _fork_jobs = writer, jobs
+    try:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as executor:
+            written = dict(zip(order, executor.map(_save_forked_job, order)))
+    finally:
+        _fork_writer, _fork_jobs = None, []
+    return [written[i] for i in range(len(jobs))]
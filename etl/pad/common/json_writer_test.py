@@ -0,0 +1,78 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from pad.common import pad_util
+from pad.common.json_writer import JsonWriter, save_files
+from pad.common.shared_types import Server
+
+OBJECTS = [
+    [],
+    {},
+    'text',
+    [1],
+    [{'b': 1, 'a': [1, 2, {'z': None}]}, 'multi\nline', 'ティラ', {'server': Server.jp}, [[], {}], 1.5],
+    {'card': [{'id': 1, 'names': ['a', 'b']}], 'n': {'x': {'y': [1]}}},
+    [{'nested': [{'deeper': [1, {'k': 'v'}]}]} for _ in range(3)],
+]
+
+
+def _json_file_dump(obj, pretty):
+    f = io.StringIO()
+    pad_util.json_file_dump(obj, f, pretty=pretty)
+    return f.getvalue().encode('utf-8')
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+@pytest.mark.parametrize('obj', OBJECTS)
+def test_encode_matches_json_file_dump(obj, pretty):
+    encoded = b''.join(JsonWriter(pretty=pretty).encode(obj))
+    assert encoded == _json_file_dump(obj, pretty)
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_save_matches_json_file_dump(tmp_path, pretty):
+    obj = OBJECTS[4]
+    path = JsonWriter(pretty=pretty).save(str(tmp_path / 'out.json'), obj)
+    assert path == str(tmp_path / 'out.json')
+    with open(path, 'rb') as f:
+        assert f.read() == _json_file_dump(obj, pretty)
+
+
+def test_gzip_is_reproducible(tmp_path):
+    writer = JsonWriter(compression='gzip')
+    path = writer.save(str(tmp_path / 'out.json'), OBJECTS[4])
+    assert path == str(tmp_path / 'out.json.gz')
+    with open(path, 'rb') as f:
+        first = f.read()
+    writer.save(str(tmp_path / 'out.json'), OBJECTS[4])
+    with open(path, 'rb') as f:
+        assert f.read() == first
+    with gzip.open(path, 'rb') as f:
+        assert f.read() == _json_file_dump(OBJECTS[4], False)
+
+
+def test_save_files_in_processes(tmp_path):
+    writer = JsonWriter()
+    jobs = [(str(tmp_path / '{}.json'.format(i)), obj) for i, obj in enumerate(OBJECTS)]
+    written = save_files(writer, jobs, processes=2)
+    assert written == [path for path, _ in jobs]
+    for path, obj in jobs:
+        with open(path, 'rb') as f:
+            assert f.read() == _json_file_dump(obj, False)
+
+
+def test_orjson_backend_decodes_the_same():
+    pytest.importorskip('orjson')
+    obj = OBJECTS[5]
+    encoded = b''.join(JsonWriter(backend='orjson').encode(obj))
+    assert json.loads(encoded) == json.loads(_json_file_dump(obj, False))
+
+
+def test_unknown_options():
+    with pytest.raises(ValueError):
+        JsonWriter(backend='simplejson')
+    with pytest.raises(ValueError):
+        JsonWriter(compression='bz2')
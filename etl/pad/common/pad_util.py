@@ -1,11 +1,13 @@
 import datetime
+import hashlib
 import json
 import os
 import re
-from typing import Union
+from typing import Iterable, Iterator, Union
 
 import pytz
 
+from pad.common import column_cache
 from pad.common.shared_types import JsonType, Printable, Server, dump_helper, ListJsonType
 
 # Re-exporting these types; should fix imports
@@ -137,6 +139,132 @@ def load_raw_json(data_dir: str = None, json_file: str = None, file_name: str =
         return json.load(f)
 
 
+def iter_raw_json_list(data_dir: str = None, json_file: str = None, file_name: str = None,
+                       key: str = None) -> Iterator[JsonType]:
+    """Yields the entries of the list at key in a JSON file's top level object, reading the file incrementally.
+
+    Only one entry (plus a read buffer) is decoded at a time, so callers that build objects as they go never hold
+    the whole raw list. Top level values before key are decoded and dropped. If the file has a current column cache
+    (see column_cache) the entries are read from that instead.
+    """
+    if json_file is None:
+        json_file = os.path.join(data_dir, file_name)
+
+    cached_rows = column_cache.read_rows(json_file, key)
+    if cached_rows is not None:
+        yield from cached_rows
+        return
+
+    with open(json_file, encoding='utf-8') as f:
+        reader = _JsonStreamReader(f)
+        reader.expect('{')
+        while not reader.consume('}'):
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                reader.expect('[')
+                if reader.consume(']'):
+                    return
+                while True:
+                    yield reader.value()
+                    if reader.consume(']'):
+                        return
+                    reader.expect(',')
+            reader.value()
+            reader.consume(',')
+    raise KeyError('{} has no top level key {}'.format(json_file, key))
+
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_JSON_DELIMITERS = ' \t\n\r,:]}'
+
+
+class _JsonStreamReader(object):
+    """Decodes consecutive JSON values from a text file, refilling a buffer as needed."""
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def consume(self, char: str) -> bool:
+        # Compact files rarely have whitespace between tokens, so check for char before scanning.
+        if self.buf.startswith(char, self.pos):
+            self.pos += 1
+            return True
+        self._skip_whitespace()
+        if self.buf.startswith(char, self.pos):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, char: str):
+        if not self.consume(char):
+            raise ValueError('Expected {!r} at {!r}'.format(char, self.buf[self.pos:self.pos + 20]))
+
+    def value(self) -> JsonType:
+        self._skip_whitespace()
+        while True:
+            try:
+                result, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value at the end of the buffer may be cut short, e.g. '1.' of '1.5', so it's only complete if
+                # a delimiter follows it.
+                if self.eof or (end < len(self.buf) and self.buf[end] in _JSON_DELIMITERS):
+                    self.pos = end
+                    return result
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def file_hash(path: str) -> str:
+    """md5 of a file's content, or 'missing' if it does not exist."""
+    if not os.path.exists(path):
+        return 'missing'
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def tree_hash(root: str, suffixes: Iterable[str] = None) -> str:
+    """md5 over the relative paths and content of the files under root, optionally only those with a suffix."""
+    suffixes = tuple(suffixes) if suffixes else None
+    md5 = hashlib.md5()
+    for dir_path, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for file_name in sorted(files):
+            if suffixes and not file_name.endswith(suffixes):
+                continue
+            path = os.path.join(dir_path, file_name)
+            md5.update(os.path.relpath(path, root).encode())
+            md5.update(file_hash(path).encode())
+    return md5.hexdigest()
+
+
 def json_string_dump(obj, pretty=False):
     indent = 4 if pretty else None
     return json.dumps(obj, indent=indent, sort_keys=True, default=dump_helper, ensure_ascii=False)
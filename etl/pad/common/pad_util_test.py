@@ -0,0 +1,78 @@
+import io
+import json
+
+import pytest
+
+from pad.common.pad_util import _JsonStreamReader, iter_raw_json_list
+
+RAW_DATA = {
+    'res': 0,
+    'v': 1.5,
+    'nested': {'card': [1, 2], 'text': 'a,b:]}'},
+    'card': [
+        [1, 'Tyrra', 12.25, -3, True, False, None, [], {}],
+        [2, 'ティラ', 1e-05, 123456789012, {'k': [1, [2, [3]]]}, 'esc"ape\\\n'],
+        [],
+    ],
+    'after': 'ignored',
+}
+
+
+def _write(tmp_path, text):
+    path = tmp_path / 'download_card_data.json'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1 << 20])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_iter_raw_json_list_matches_json_load(tmp_path, monkeypatch, chunk_size, indent):
+    monkeypatch.setattr(_JsonStreamReader, 'CHUNK_SIZE', chunk_size)
+    path = _write(tmp_path, json.dumps(RAW_DATA, indent=indent, ensure_ascii=False))
+
+    with open(path, encoding='utf-8') as f:
+        expected = json.load(f)['card']
+    assert list(iter_raw_json_list(json_file=path, key='card')) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 4, 1 << 20])
+def test_iter_raw_json_list_numbers_split_across_chunks(tmp_path, monkeypatch, chunk_size):
+    # A number cut at a chunk boundary decodes as a valid, shorter number unless the reader waits for a delimiter.
+    monkeypatch.setattr(_JsonStreamReader, 'CHUNK_SIZE', chunk_size)
+    values = [1.5, 12345, -0.25, 1e10, 7]
+    path = _write(tmp_path, json.dumps({'card': values}))
+
+    assert list(iter_raw_json_list(json_file=path, key='card')) == values
+
+
+def test_iter_raw_json_list_empty_list(tmp_path):
+    path = _write(tmp_path, '{"res": 0, "card": []}')
+    assert list(iter_raw_json_list(json_file=path, key='card')) == []
+
+
+def test_iter_raw_json_list_missing_key(tmp_path):
+    path = _write(tmp_path, json.dumps({'res': 0, 'dungeons': [1]}))
+    with pytest.raises(KeyError):
+        list(iter_raw_json_list(json_file=path, key='card'))
+
+
+def test_iter_raw_json_list_by_dir_and_name(tmp_path):
+    _write(tmp_path, json.dumps(RAW_DATA))
+    rows = list(iter_raw_json_list(data_dir=str(tmp_path), file_name='download_card_data.json', key='card'))
+    assert rows == RAW_DATA['card']
+
+
+def test_stream_reader_rejects_malformed_json():
+    reader = _JsonStreamReader(io.StringIO('[1, 2'))
+    reader.expect('[')
+    assert reader.value() == 1
+    reader.expect(',')
+    assert reader.value() == 2
+    with pytest.raises(ValueError):
+        reader.expect(']')
+
+
+def test_stream_reader_truncated_value_raises():
+    reader = _JsonStreamReader(io.StringIO('{"a": [1, 2'))
+    with pytest.raises(json.JSONDecodeError):
+        reader.value()
@@ -1,6 +1,7 @@
 import math
 from enum import Enum
-from typing import NewType, Dict, Any, List, Union
+from functools import lru_cache
+from typing import NewType, Dict, Any, List, Optional, Tuple, Union
 
 # Raw data types
 AttrId = NewType('AttrId', int)
@@ -20,6 +21,7 @@ ListJsonType = List[Dict[str, Any]]
 
 class Printable(object):
     """Simple way to make an object printable."""
+    __slots__ = ()
 
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__, dump_helper(self))
@@ -30,6 +32,7 @@ class Printable(object):
 
 class Curve(Printable):
     """Describes how to scale according to level 1-10."""
+    __slots__ = ('min_value', 'max_value', 'scale', 'max_level', '_values')
 
     def __init__(self,
                  min_value: Union[int, float],
@@ -40,8 +43,19 @@ class Curve(Printable):
         self.max_value = max_value or min_value * max_level
         self.scale = scale
         self.max_level = max(max_level, 1)
+        self._values = None  # type: Optional[Dict[int, int]]
 
     def value_at(self, level: int):
+        # Curves are looked up at the same few levels over and over (e.g. once per wave row), so remember them.
+        values = self._values
+        if values is None:
+            values = self._values = {}
+        value = values.get(level)
+        if value is None:
+            value = values[level] = self._compute(level)
+        return value
+
+    def _compute(self, level: int) -> int:
         f = 1 if self.max_level == 1 else ((level - 1) / (self.max_level - 1))
         return int(round(self.min_value + (self.max_value - self.min_value) * math.pow(f, self.scale)))
 
@@ -69,12 +83,34 @@ class EvolutionType(Enum):
     non_reversible = 3
 
 
+@lru_cache(maxsize=None)
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """All __slots__ declared by cls and its bases, base classes first.
+
+    Private (underscore) slots hold caches rather than data, and are left out.
+    """
+    names = []
+    for c in reversed(cls.__mro__):
+        slots = c.__dict__.get('__slots__', ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            if name not in names and not name.startswith('_'):
+                names.append(name)
+    return tuple(names)
+
+
+def object_vars(x) -> Dict[str, Any]:
+    """Like vars(), but also works for objects that use __slots__."""
+    if hasattr(x, '__dict__'):
+        return vars(x)
+    return {name: getattr(x, name) for name in slot_names(type(x)) if hasattr(x, name)}
+
+
 def dump_helper(x):
     if callable(x):
         return 'fn_obj'
     elif isinstance(x, Enum):
         return str(x)
-    elif hasattr(x, '__dict__'):
-        return vars(x)
+    elif hasattr(x, '__dict__') or slot_names(type(x)):
+        return object_vars(x)
     else:
         return repr(x)
@@ -0,0 +1,177 @@
+"""
+Timing spans around pipeline stages, with optional cProfile and tracemalloc capture.
+
+Spans nest per thread. Work started on another thread (e.g. a storage processor) can name its parent span
+explicitly. The results are a summary JSON and a folded-stack file (one 'a;b;c <microseconds>' line per span
+path), which flamegraph.pl, speedscope and similar tools read directly.
+"""
+import cProfile
+import json
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('processor')
+
+SpanPath = Tuple[str, ...]
+
+
+class Span(object):
+    def __init__(self, path: SpanPath, thread: str, start: float):
+        self.path = path
+        self.thread = thread
+        self.start = start
+        self.duration = 0.0
+        self.cpu_time = 0.0
+        self.memory_delta = None  # type: Optional[int]
+        self.memory_peak = None  # type: Optional[int]
+        self.cpu_profile = None  # type: Optional[cProfile.Profile]
+        self.cpu_profile_file = None  # type: Optional[str]
+
+    @property
+    def name(self) -> str:
+        return self.path[-1]
+
+    def to_json(self) -> Dict[str, Any]:
+        result = {
+            'name': self.name,
+            'path': '/'.join(self.path),
+            'thread': self.thread,
+            'start_s': round(self.start, 6),
+            'duration_s': round(self.duration, 6),
+            'cpu_s': round(self.cpu_time, 6),
+        }
+        if self.memory_delta is not None:
+            result['memory_delta_bytes'] = self.memory_delta
+            result['memory_peak_bytes'] = self.memory_peak
+        if self.cpu_profile_file:
+            result['cpu_profile'] = self.cpu_profile_file
+        return result
+
+
+class StageProfiler(object):
+    """Records spans when enabled; when disabled, span() does nothing so callers needn't check.
+
+    cpu=True captures a cProfile for each outermost span on a thread, saved as a .pstats file per span.
+    memory=True traces allocations for the whole run and records each span's net and peak (process-wide) usage.
+    """
+
+    def __init__(self, enabled: bool = False, cpu: bool = False, memory: bool = False):
+        self.enabled = enabled or cpu or memory
+        self.cpu = cpu
+        self.memory = memory
+        self.spans = []  # type: List[Span]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Spans measuring memory that are still open, on any thread; see _fold_memory_peak.
+        self._memory_spans = []  # type: List[Span]
+        self._origin = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def current_path(self) -> SpanPath:
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else ()
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[SpanPath] = None, cpu: bool = True):
+        """Times the block; cpu=False skips the cProfile capture, e.g. for a span that just waits on others."""
+        if not self.enabled:
+            yield
+            return
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        path = (parent if parent is not None else self.current_path()) + (name,)
+        span = Span(path, threading.current_thread().name, time.perf_counter() - self._origin)
+
+        profile = self._start_cpu_profile() if self.cpu and cpu and not stack else None
+        if self.memory:
+            with self._lock:
+                self._fold_memory_peak()
+                tracemalloc.reset_peak()
+                memory_before = tracemalloc.get_traced_memory()[0]
+                span.memory_peak = memory_before
+                self._memory_spans.append(span)
+        cpu_before = time.thread_time()
+
+        stack.append(path)
+        try:
+            yield
+        finally:
+            stack.pop()
+            span.duration = time.perf_counter() - self._origin - span.start
+            span.cpu_time = time.thread_time() - cpu_before
+            if self.memory:
+                with self._lock:
+                    self._fold_memory_peak()
+                    self._memory_spans.remove(span)
+                    span.memory_delta = tracemalloc.get_traced_memory()[0] - memory_before
+            if profile is not None:
+                profile.disable()
+                span.cpu_profile = profile
+            with self._lock:
+                self.spans.append(span)
+
+    def _fold_memory_peak(self):
+        """Credits the peak since the last reset to every open span, before a nested span resets it."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for span in self._memory_spans:
+            span.memory_peak = max(span.memory_peak, peak)
+
+    def _start_cpu_profile(self) -> Optional[cProfile.Profile]:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as ex:
+            # Only one profiler may be active at a time on some Python versions.
+            logger.debug('Skipping cpu profile: %s', ex)
+            return None
+        return profile
+
+    def folded_stacks(self) -> List[str]:
+        """Self time of each span path in microseconds, in folded-stack format."""
+        child_time = {}  # type: Dict[SpanPath, float]
+        total_time = {}  # type: Dict[SpanPath, float]
+        for span in self.spans:
+            total_time[span.path] = total_time.get(span.path, 0) + span.duration
+            if len(span.path) > 1:
+                child_time[span.path[:-1]] = child_time.get(span.path[:-1], 0) + span.duration
+        lines = []
+        for path, total in sorted(total_time.items()):
+            # Concurrent children can add up to more than their parent's wall time.
+            self_time = max(total - child_time.get(path, 0), 0)
+            lines.append('{} {}'.format(';'.join(p.replace(';', ',').replace(' ', '_') for p in path),
+                                        int(self_time * 1e6)))
+        return lines
+
+    def save(self, output_dir: str, prefix: str = 'profile'):
+        if not self.enabled:
+            return
+        for span in self.spans:
+            if span.cpu_profile is not None:
+                span.cpu_profile_file = '{}_{}.pstats'.format(prefix, re.sub(r'[^\w.-]+', '_', '_'.join(span.path)))
+                span.cpu_profile.dump_stats(os.path.join(output_dir, span.cpu_profile_file))
+
+        summary_file = os.path.join(output_dir, '{}_summary.json'.format(prefix))
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump([s.to_json() for s in sorted(self.spans, key=lambda s: s.start)], f, indent=2)
+
+        folded_file = os.path.join(output_dir, '{}.folded'.format(prefix))
+        with open(folded_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded_stacks()) + '\n')
+        logger.info('Saved stage profile to %s and %s', summary_file, folded_file)
+
+    def report(self) -> str:
+        """Plain text list of the spans in start order, indented by depth."""
+        lines = ['{:<60} {:>10} {:>10}'.format('stage', 'wall s', 'cpu s')]
+        for span in sorted(self.spans, key=lambda s: s.start):
+            label = '  ' * (len(span.path) - 1) + span.name
+            lines.append('{:<60} {:>10.2f} {:>10.2f}'.format(label[:60], span.duration, span.cpu_time))
+        return '\n'.join(lines)
@@ -0,0 +1,83 @@
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from pad.common.stage_profiler import StageProfiler
+
+
+@pytest.fixture
+def memory_profiler():
+    was_tracing = tracemalloc.is_tracing()
+    yield StageProfiler(memory=True)
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def _spans(profiler):
+    return {'/'.join(s.path): s for s in profiler.spans}
+
+
+def test_disabled_records_nothing():
+    profiler = StageProfiler()
+    with profiler.span('a'):
+        assert profiler.current_path() == ()
+    assert profiler.spans == []
+
+
+def test_spans_nest_per_thread():
+    profiler = StageProfiler(enabled=True)
+    paths = []
+
+    def task(parent):
+        paths.append(profiler.current_path())
+        with profiler.span('task', parent):
+            paths.append(profiler.current_path())
+
+    with profiler.span('run'):
+        with profiler.span('load'):
+            assert profiler.current_path() == ('run', 'load')
+        thread = threading.Thread(target=task, args=(profiler.current_path(),))
+        thread.start()
+        thread.join()
+
+    assert paths == [(), ('run', 'task')]
+    assert sorted(_spans(profiler)) == ['run', 'run/load', 'run/task']
+
+
+def test_nested_span_keeps_the_parent_peak(memory_profiler):
+    with memory_profiler.span('outer'):
+        big = bytearray(8 << 20)
+        del big
+        with memory_profiler.span('inner'):
+            small = bytearray(1 << 20)
+            del small
+
+    spans = _spans(memory_profiler)
+    assert spans['outer'].memory_peak - spans['outer/inner'].memory_peak > 6 << 20
+    assert spans['outer/inner'].memory_peak >= 1 << 20
+    assert abs(spans['outer'].memory_delta) < 1 << 20
+
+
+def test_parent_sees_the_nested_span_peak(memory_profiler):
+    with memory_profiler.span('outer'):
+        with memory_profiler.span('inner'):
+            big = bytearray(8 << 20)
+            del big
+
+    spans = _spans(memory_profiler)
+    assert spans['outer'].memory_peak >= spans['outer/inner'].memory_peak >= 8 << 20
+
+
+def test_save(tmp_path):
+    profiler = StageProfiler(enabled=True)
+    with profiler.span('run'):
+        with profiler.span('a b;c'):
+            pass
+    profiler.save(str(tmp_path))
+
+    with open(str(tmp_path / 'profile_summary.json')) as f:
+        assert [s['path'] for s in json.load(f)] == ['run', 'run/a b;c']
+    with open(str(tmp_path / 'profile.folded')) as f:
+        assert [line.split(' ')[0] for line in f.read().splitlines()] == ['run', 'run;a_b,c']
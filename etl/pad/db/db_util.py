@@ -1,48 +1,178 @@
 import logging
 import random
-from typing import Callable, List
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pymysql
 from pymysql import InterfaceError
 
 from pad.common import pad_util
-from .sql_item import SqlItem, _col_compare, _tbl_name_ref, _process_col_mappings, ExistsStrategy
+from . import sqlite_backend
+from .statement_stats import StatementStats
+from .sql_item import SqlItem, _col_compare, _col_name_ref, _tbl_name_ref, _process_col_mappings, ExistsStrategy, \
+    _value_to_comparable, _with_managed_columns, insert_template, item_bindings, row_bindings
 
 logger = logging.getLogger('database')
 logger.setLevel(logging.ERROR)
 
+_WRITE_TABLE_RE = re.compile(r'^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)`?', re.IGNORECASE)
+
+
+class UnitOfWork(object):
+    """Tracks the writes made inside one DbWrapper transaction."""
+
+    def __init__(self, name: str, commit_every: Optional[int] = None):
+        self.name = name
+        self.commit_every = commit_every
+        self.rows_by_table = defaultdict(int)  # type: Dict[str, int]
+        self.statements_since_commit = 0
+        self.commits = 0
+        # Stored content hashes by key, per (table, key columns); loaded on first use in this unit.
+        self.content_hashes = {}  # type: Dict[Tuple[str, Tuple[str, ...]], Dict[tuple, Optional[str]]]
+
+    def record_write(self, sql: str, row_count: int):
+        match = _WRITE_TABLE_RE.match(sql)
+        table = match.group(2) if match else 'unknown'
+        self.rows_by_table[table] += max(row_count, 0)
+        self.statements_since_commit += 1
+        if match and match.group(1).upper().startswith('DELETE'):
+            self.forget_content_hashes(table)
+
+    def forget_content_hashes(self, table: str):
+        for hashes_id in [x for x in self.content_hashes if x[0] == table]:
+            del self.content_hashes[hashes_id]
+
+    def total_rows(self) -> int:
+        return sum(self.rows_by_table.values())
+
+    def __str__(self):
+        tables = ', '.join('{}={}'.format(k, v) for k, v in sorted(self.rows_by_table.items()))
+        return 'UnitOfWork({}): {} rows in {} commits [{}]'.format(self.name, self.total_rows(), self.commits, tables)
+
+
+def _connect_mysql(db_config):
+    return pymysql.connect(host=db_config['host'],
+                           user=db_config['user'],
+                           password=db_config['password'],
+                           db=db_config['db'],
+                           charset=db_config['charset'],
+                           cursorclass=pymysql.cursors.DictCursor,
+                           autocommit=True)
+
+
+# Functions opening a connection for a db_config. They return an object with the pymysql connection interface
+# (cursor(), autocommit(), begin(), commit(), rollback(), ping()), with DictCursor-style cursors.
+BACKENDS = {
+    'mysql': _connect_mysql,
+    'sqlite': sqlite_backend.connect,
+}  # type: Dict[str, Callable[[Dict[str, Any]], Any]]
+
 
 class DbWrapper(object):
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, trust_content_hashes: bool = True, record_statement_stats: bool = False):
+        """With trust_content_hashes=False, rows whose stored content hash matches are still compared column by
+        column, so that rows changed without updating their hash (e.g. by hand) are repaired.
+
+        With record_statement_stats, statement_stats collects the latency of every statement; otherwise it is None.
+        """
         self.dry_run = dry_run
+        self.trust_content_hashes = trust_content_hashes
         self.connection = None
+        self.unit = None  # type: Optional[UnitOfWork]
+        self.statement_stats = StatementStats() if record_statement_stats else None  # type: Optional[StatementStats]
 
     def connect(self, db_config):
+        """Connects using db_config['backend'] (mysql by default); see BACKENDS for the config each one needs."""
         logger.debug('DB Connecting')
-        self.connection = pymysql.connect(host=db_config['host'],
-                                          user=db_config['user'],
-                                          password=db_config['password'],
-                                          db=db_config['db'],
-                                          charset=db_config['charset'],
-                                          cursorclass=pymysql.cursors.DictCursor,
-                                          autocommit=True)
+        backend = db_config.get('backend', 'mysql')
+        if backend not in BACKENDS:
+            raise ValueError('unknown database backend:', backend)
+        self.connection = BACKENDS[backend](db_config)
         logger.info('DB Connected')
 
-    def execute(self, cursor, sql, bindings: List[str] = None):
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def execute(self, cursor, sql, bindings: List[Any] = None):
         if bindings:
             logger.debug('Executing: %s with bindings %s', sql, bindings)
         else:
             bindings = None  # Don't allow empty array as an input
             logger.debug('Executing: %s', sql)
+        return self._timed(sql, lambda: cursor.execute(sql, args=bindings))
+
+    def execute_many(self, cursor, sql, bindings_list: List[List[Any]]):
+        logger.debug('Executing: %s with %d sets of bindings', sql, len(bindings_list))
+        return self._timed(sql, lambda: cursor.executemany(sql, bindings_list))
+
+    def _timed(self, sql: str, run: Callable[[], int]) -> int:
+        """Runs a statement, reconnecting once if needed, and records its latency in statement_stats if set."""
+        start = time.perf_counter()
         try:
-            return cursor.execute(sql, args=bindings)
+            result = run()
         except InterfaceError:
+            if self.unit is not None:
+                # Reconnecting would silently drop the open transaction.
+                raise
             self.connection.ping()
-            return cursor.execute(sql)
+            result = run()
+        if self.statement_stats is not None:
+            self.statement_stats.record(self.unit.name if self.unit else None, sql, result,
+                                        time.perf_counter() - start)
+        return result
+
+    @contextmanager
+    def unit_of_work(self, name: str, commit_every: Optional[int] = None):
+        """Runs the enclosed writes in a single transaction instead of autocommitting each one.
+
+        If commit_every is set, the transaction is also committed after that many write statements.
+        On failure, everything since the last commit is rolled back. Yields the UnitOfWork, which
+        holds the number of rows written per table.
+        """
+        if self.unit is not None:
+            raise ValueError('unit of work already in progress:', self.unit.name)
+
+        unit = UnitOfWork(name, commit_every)
+        self.connection.autocommit(False)
+        self.connection.begin()
+        self.unit = unit
+        try:
+            yield unit
+            self.connection.commit()
+            unit.commits += 1
+        except BaseException:
+            logger.error('Rolling back uncommitted writes for %s', name)
+            self.connection.rollback()
+            raise
+        finally:
+            self.unit = None
+            self.connection.autocommit(True)
+        logger.info('%s', unit)
 
-    def fetch_data(self, sql):
+    def _record_write(self, sql: str, row_count: int):
+        if self.unit is None:
+            return
+        self.unit.record_write(sql, row_count)
+        if self.unit.commit_every and self.unit.statements_since_commit >= self.unit.commit_every:
+            self.commit()
+
+    def commit(self):
+        """Commits the current unit of work so far, e.g. before recording progress that relies on it."""
+        if self.unit is None:
+            return
+        self.connection.commit()
+        self.connection.begin()
+        self.unit.commits += 1
+        self.unit.statements_since_commit = 0
+
+    def fetch_data(self, sql, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
-            self.execute(cursor, sql)
+            self.execute(cursor, sql, bindings)
         return list(cursor.fetchall())
 
     def load_to_key_value(self, key_name, value_name, table_name, where_clause=None):
@@ -54,9 +184,9 @@ class DbWrapper(object):
             data = list(cursor.fetchall())
             return {row['k']: row['v'] for row in data}
 
-    def get_single_or_no_row(self, sql):
+    def get_single_or_no_row(self, sql, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
-            self.execute(cursor, sql)
+            self.execute(cursor, sql, bindings)
             data = list(cursor.fetchall())
             num_rows = len(data)
             if num_rows > 1:
@@ -66,9 +196,9 @@ class DbWrapper(object):
             else:
                 return data[0]
 
-    def get_single_value(self, sql, op: Callable = str, fail_on_empty=True):
+    def get_single_value(self, sql, op: Callable = str, fail_on_empty=True, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
-            self.execute(cursor, sql)
+            self.execute(cursor, sql, bindings)
             data = list(cursor.fetchall())
             num_rows = len(data)
             if num_rows == 0:
@@ -92,32 +222,30 @@ class DbWrapper(object):
         sql = 'SELECT * FROM {} WHERE {}'.format(
             _tbl_name_ref(obj_type.TABLE),
             _col_compare(obj_type.KEY_COL))
-        sql = sql.format(**{obj_type.KEY_COL: key_val})
-        data = self.get_single_or_no_row(sql)
+        data = self.get_single_or_no_row(sql, [key_val])
         return obj_type(**_process_col_mappings(obj_type, data)) if data else None
 
     def load_multiple_objects(self, obj_type, key_val):
         sql = 'SELECT * FROM {} WHERE {}'.format(
             _tbl_name_ref(obj_type.TABLE),
             _col_compare(obj_type.LIST_COL))
-        sql = sql.format(**{obj_type.LIST_COL: key_val})
-        data = self.fetch_data(sql)
+        data = self.fetch_data(sql, [key_val])
         return [obj_type(**_process_col_mappings(obj_type, d)) for d in data]
 
     def custom_load_multiple_objects(self, obj_type, lookup_sql: str):
         data = self.fetch_data(lookup_sql)
         return [obj_type(**_process_col_mappings(obj_type, d)) for d in data]
 
-    def check_existing(self, sql: str):
+    def check_existing(self, sql: str, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
-            num_rows = self.execute(cursor, sql)
+            num_rows = self.execute(cursor, sql, bindings)
             if num_rows > 1:
                 raise ValueError('got too many results:', num_rows, sql)
             return bool(num_rows)
 
-    def check_existing_value(self, sql: str):
+    def check_existing_value(self, sql: str, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
-            num_rows = self.execute(cursor, sql)
+            num_rows = self.execute(cursor, sql, bindings)
             if num_rows > 1:
                 raise ValueError('got too many results:', num_rows, sql)
             elif num_rows == 0:
@@ -129,7 +257,7 @@ class DbWrapper(object):
                 else:
                     return row_values[0]
 
-    def insert_item(self, sql: str, bindings: List[str] = None):
+    def insert_item(self, sql: str, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
             if self.dry_run:
                 logger.warning('not inserting item due to dry run')
@@ -139,18 +267,30 @@ class DbWrapper(object):
             num_rows = len(data)
             if num_rows > 0:
                 raise ValueError('got too many results for insert:', num_rows, sql)
+            self._record_write(sql, cursor.rowcount)
             return cursor.lastrowid
 
-    def update_item(self, sql: str):
+    def update_item(self, sql: str, bindings: List[Any] = None):
         with self.connection.cursor() as cursor:
             if self.dry_run:
                 logger.warning('not running update due to dry run')
                 return 0
-            self.execute(cursor, sql)
+            self.execute(cursor, sql, bindings)
             data = list(cursor.fetchall())
             num_rows = len(data)
             if num_rows > 0:
                 raise ValueError('got too many results for update:', num_rows, sql)
+            self._record_write(sql, cursor.rowcount)
+            return cursor.rowcount
+
+    def insert_items(self, sql: str, bindings_list: List[List[Any]]) -> int:
+        """Runs one INSERT template over many rows; the driver sends them as multi-row statements."""
+        with self.connection.cursor() as cursor:
+            if self.dry_run:
+                logger.warning('not inserting %d items due to dry run', len(bindings_list))
+                return 0
+            self.execute_many(cursor, sql, bindings_list)
+            self._record_write(sql, cursor.rowcount)
             return cursor.rowcount
 
     def insert_or_update(self, item: SqlItem):
@@ -161,38 +301,265 @@ class DbWrapper(object):
             raise ex
 
     def _insert_or_update(self, item: SqlItem):
-        key = item.key or None
+        key = item.key_value()
 
         if item.exists_strategy() == ExistsStrategy.BY_KEY:
-            if not self.check_existing(item.key_exists_sql()):
+            if not self._row_exists(item):
                 logger.info('item needed insert: %s', item)
-                self.insert_item(item.insert_sql())
-            elif not self.check_existing(item.needs_update_sql()):
+                self.insert_item(*item.insert_sql())
+                self._remember_content_hash(item)
+            elif self._needs_update(item):
                 logger.info('item needed update: %s', item)
-                self.insert_item(item.update_sql())
+                self._update(item)
 
         elif item.exists_strategy() == ExistsStrategy.BY_KEY_IF_SET:
             if not key:
-                key = self.insert_item(item.insert_sql())
+                key = self.insert_item(*item.insert_sql())
                 item.set_key_value(key)
+                self._remember_content_hash(item)
                 logger.info('item needed by-key insert: %s', item)
-            elif not self.check_existing(item.needs_update_sql()):
+            elif self._needs_update(item):
                 logger.info('item needed by-key update: %s', item)
-                self.insert_item(item.update_sql())
+                self._update(item)
 
         elif item.exists_strategy() == ExistsStrategy.BY_VALUE:
-            key = self.get_single_value(item.value_exists_sql(), op=int, fail_on_empty=False)
+            sql, bindings = item.value_exists_sql()
+            key = self.get_single_value(sql, op=int, fail_on_empty=False, bindings=bindings)
             item.set_key_value(key)
 
             if not key:
-                key = self.insert_item(item.insert_sql())
+                key = self.insert_item(*item.insert_sql())
                 item.set_key_value(key)
+                self._remember_content_hash(item)
                 logger.info('item needed by-value insert: %s', item)
-            elif not self.check_existing(item.needs_update_sql()):
+            elif self._needs_update(item):
                 logger.info('item needed by-value update: %s', item)
-                self.insert_item(item.update_sql())
+                self._update(item)
 
         elif item.exists_strategy() == ExistsStrategy.CUSTOM:
             raise ValueError('Item cannot be upserted: {}'.format(item))
 
         return key
+
+    def _update(self, item: SqlItem):
+        self.insert_item(*item.update_sql())
+        if item.CLEARS_HASH_COL and self.unit is not None:
+            self.unit.forget_content_hashes(item.table)
+
+    def _content_hashes(self, item: SqlItem) -> Optional[Dict[tuple, Optional[str]]]:
+        """Stored {key: content hash} of the item's table, loaded once per unit of work.
+
+        Returns None if the item's table has no hash column or no unit of work is open.
+        """
+        if not item.HASH_COL or self.unit is None:
+            return None
+        key_cols = tuple(sorted(item.key))
+        hashes_id = (item.table, key_cols)
+        if hashes_id not in self.unit.content_hashes:
+            sql = 'SELECT {} FROM {}'.format(', '.join(map(_col_name_ref, key_cols + (item.HASH_COL,))),
+                                             _tbl_name_ref(item.table))
+            self.unit.content_hashes[hashes_id] = {_row_values(row, key_cols): row[item.HASH_COL]
+                                                   for row in self.fetch_data(sql)}
+            logger.info('loaded %d content hashes for %s',
+                        len(self.unit.content_hashes[hashes_id]), item.table)
+        return self.unit.content_hashes[hashes_id]
+
+    def _row_exists(self, item: SqlItem) -> bool:
+        hashes = self._content_hashes(item)
+        if hashes is None:
+            return self.check_existing(*item.key_exists_sql())
+        return _item_values(item, tuple(sorted(item.key))) in hashes
+
+    def _needs_update(self, item: SqlItem) -> bool:
+        hashes = self._content_hashes(item)
+        if hashes is None:
+            return not self.check_existing(*item.needs_update_sql())
+
+        key = _item_values(item, tuple(sorted(item.key)))
+        stored_hash = hashes.get(key)
+        content_hash = item.content_hash()
+        if stored_hash == content_hash:
+            if self.trust_content_hashes or self.check_existing(*item.needs_update_sql()):
+                return False
+            # The row changed without its hash; clear the hash so that the update bumps tstamp.
+            logger.warning('row changed outside the pipeline: %s', item)
+            self.update_item(*item.content_hash_sql(clear=True))
+            return True
+
+        hashes[key] = content_hash
+        if stored_hash is None and self.check_existing(*item.needs_update_sql()):
+            # The row predates its hash but is unchanged; store the hash without bumping tstamp.
+            self.update_item(*item.content_hash_sql())
+            return False
+        return True
+
+    def _remember_content_hash(self, item: SqlItem):
+        hashes = self._content_hashes(item)
+        if hashes is not None:
+            hashes[_item_values(item, tuple(sorted(item.key)))] = item.content_hash()
+
+    def bulk_insert_or_update(self, items: List[SqlItem], batch_size: int = 500) -> List[Optional[Any]]:
+        """Upserts many items with one SELECT per table instead of several queries per item.
+
+        Follows the same ExistsStrategy rules as insert_or_update, but diffs against an in-memory
+        copy of the table and writes the changed rows in multi-row batches. Items that need an
+        auto-increment key are inserted one at a time so the key can be set on the item.
+
+        Returns the key value of each item, in order.
+        """
+        items_by_table = defaultdict(list)
+        for item in items:
+            items_by_table[item.table].append(item)
+
+        for table, table_items in items_by_table.items():
+            if self.unit is not None:
+                self.unit.forget_content_hashes(table)
+            try:
+                self._bulk_insert_or_update_table(table, table_items, batch_size)
+            except Exception as ex:
+                logger.fatal('Failed to bulk insert %d items into %s', len(table_items), table)
+                raise ex
+
+        return [item.key_value() for item in items]
+
+    def _bulk_insert_or_update_table(self, table: str, items: List[SqlItem], batch_size: int):
+        snapshot = _TableSnapshot(self.fetch_data('SELECT * FROM {}'.format(_tbl_name_ref(table))))
+        logger.info('bulk upsert of %d items into %s (%d existing rows)', len(items), table, len(snapshot.rows))
+
+        new_rows = {}  # type: Dict[int, Dict[str, Any]]
+        updated_rows = {}  # type: Dict[int, Dict[str, Any]]
+        update_cols = set()
+
+        for item in items:
+            strategy = item.exists_strategy()
+            if strategy == ExistsStrategy.CUSTOM:
+                raise ValueError('Item cannot be upserted: {}'.format(item))
+
+            if strategy == ExistsStrategy.BY_VALUE:
+                item.set_key_value(snapshot.find_key_by_value(item))
+
+            if strategy != ExistsStrategy.BY_KEY and not item.key_value():
+                key = self.insert_item(*item.insert_sql())
+                item.set_key_value(key)
+                snapshot.add_row(_item_row(item, list(item.key) + list(item._insert_columns())))
+                logger.info('item needed bulk auto-key insert: %s', item)
+                continue
+
+            row = snapshot.find_by_key(item)
+            if row is None and strategy == ExistsStrategy.BY_KEY:
+                row = _item_row(item, _with_managed_columns(item, item._insert_columns()))
+                snapshot.add_row(row)
+                new_rows[id(row)] = row
+                logger.info('item needed bulk insert: %s', item)
+                continue
+            elif row is None:
+                logger.warning('no stored row to update for item: %s', item)
+                continue
+
+            cols = item._update_columns()
+            if not cols:
+                continue
+
+            content_hash = item.content_hash()
+            if content_hash is not None and row.get(item.HASH_COL) == content_hash and self.trust_content_hashes:
+                continue
+            elif not _row_differs(row, item, cols):
+                if content_hash is not None and row.get(item.HASH_COL) != content_hash:
+                    # Missing or outdated hash on an unchanged row; store it without bumping tstamp.
+                    row[item.HASH_COL] = content_hash
+                    update_cols.add(item.HASH_COL)
+                    if id(row) not in new_rows:
+                        updated_rows[id(row)] = row
+                continue
+
+            cols = _with_managed_columns(item, cols)
+            row.update(_item_row(item, cols))
+            update_cols.update(cols)
+            if id(row) not in new_rows:
+                updated_rows[id(row)] = row
+            logger.info('item needed bulk update: %s', item)
+
+        if self.dry_run:
+            logger.warning('not writing %d inserts and %d updates to %s due to dry run',
+                           len(new_rows), len(updated_rows), table)
+            return
+
+        json_cols = tuple(sorted({col for item in items for col in item.json_cols}))
+        for cols, rows in _group_by_columns(new_rows.values()).items():
+            sql = insert_template(table, cols, json_cols=json_cols)
+            for batch in _batches(rows, batch_size):
+                self.insert_items(sql, [row_bindings(row, cols) for row in batch])
+
+        # Stored rows are written back whole so the upsert hits the table's real primary key,
+        # which is not always the item's key column (e.g. evolutions, awakenings).
+        for cols, rows in _group_by_columns(updated_rows.values()).items():
+            sql = insert_template(table, cols, tuple(c for c in sorted(update_cols) if c in cols), json_cols)
+            for batch in _batches(rows, batch_size):
+                self.insert_items(sql, [row_bindings(row, cols) for row in batch])
+
+
+class _TableSnapshot(object):
+    """In-memory copy of a table, indexed by key and by lookup values on demand."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self._key_indexes = {}  # type: Dict[Tuple[str, ...], Dict[tuple, Dict[str, Any]]]
+        self._value_indexes = {}  # type: Dict[tuple, Dict[tuple, List[Dict[str, Any]]]]
+
+    def add_row(self, row: Dict[str, Any]):
+        self.rows.append(row)
+        for cols, index in self._key_indexes.items():
+            index[_row_values(row, cols)] = row
+        for (cols, _, json_cols), index in self._value_indexes.items():
+            index[_row_values(row, cols, json_cols)].append(row)
+
+    def find_by_key(self, item: SqlItem) -> Optional[Dict[str, Any]]:
+        cols = tuple(sorted(item.key))
+        if cols not in self._key_indexes:
+            self._key_indexes[cols] = {_row_values(row, cols): row for row in self.rows}
+        return self._key_indexes[cols].get(_item_values(item, cols))
+
+    def find_key_by_value(self, item: SqlItem):
+        cols = tuple(item._lookup_columns())
+        key_col = next(iter(item.key))
+        json_cols = tuple(item.json_cols)
+        index_id = (cols, key_col, json_cols)
+        if index_id not in self._value_indexes:
+            index = defaultdict(list)
+            for row in self.rows:
+                index[_row_values(row, cols, json_cols)].append(row)
+            self._value_indexes[index_id] = index
+
+        matches = self._value_indexes[index_id].get(_item_values(item, cols, json_cols), [])
+        if len(matches) > 1:
+            raise ValueError('got too many results:', len(matches), item)
+        return matches[0][key_col] if matches else None
+
+
+def _item_row(item: SqlItem, cols) -> Dict[str, Any]:
+    return dict(zip(cols, item_bindings(item, cols)))
+
+
+def _row_values(row: Dict[str, Any], cols, json_cols=()) -> tuple:
+    return tuple(_value_to_comparable(row.get(col), col in json_cols) for col in cols)
+
+
+def _item_values(item: SqlItem, cols, json_cols=()) -> tuple:
+    return _row_values(_item_row(item, cols), cols, json_cols)
+
+
+def _row_differs(row: Dict[str, Any], item: SqlItem, cols) -> bool:
+    json_cols = item.json_cols
+    return _row_values(row, cols, json_cols) != _item_values(item, cols, json_cols)
+
+
+def _group_by_columns(rows) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+    result = defaultdict(list)
+    for row in rows:
+        result[tuple(row.keys())].append(row)
+    return result
+
+
+def _batches(rows: List[Any], batch_size: int):
+    for i in range(0, len(rows), batch_size):
+        yield rows[i:i + batch_size]
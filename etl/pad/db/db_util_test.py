@@ -0,0 +1,282 @@
+import json
+
+import pytest
+
+from pad.db.db_util import DbWrapper
+from pad.db.sql_item import ExistsStrategy, SimpleSqlItem
+
+SCHEMA = [
+    'CREATE TABLE widgets (widget_id INTEGER PRIMARY KEY, name TEXT, power REAL, info TEXT, tstamp INTEGER)',
+    'CREATE TABLE tags (tag_id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, tstamp INTEGER)',
+    'CREATE TABLE hashed_widgets (widget_id INTEGER PRIMARY KEY, name TEXT, power REAL, info TEXT, '
+    'content_hash TEXT, tstamp INTEGER)',
+]
+
+
+class Widget(SimpleSqlItem):
+    TABLE = 'widgets'
+    KEY_COL = 'widget_id'
+
+    def __init__(self, widget_id: int = None, name: str = None, power: float = None, info: dict = None,
+                 tstamp: int = None):
+        self.widget_id = widget_id
+        self.name = name
+        self.power = power
+        self.info = json.dumps(info)
+        self.tstamp = tstamp
+
+    def _json_cols(self):
+        return ['info']
+
+
+class HashedWidget(Widget):
+    TABLE = 'hashed_widgets'
+    HASH_COL = 'content_hash'
+
+
+class HashedWidgetPower(SimpleSqlItem):
+    """Writes only the power of a hashed_widgets row."""
+    TABLE = 'hashed_widgets'
+    KEY_COL = 'widget_id'
+    CLEARS_HASH_COL = 'content_hash'
+
+    def __init__(self, widget_id: int = None, power: float = None):
+        self.widget_id = widget_id
+        self.power = power
+
+
+class Tag(SimpleSqlItem):
+    TABLE = 'tags'
+    KEY_COL = 'tag_id'
+
+    def __init__(self, tag_id: int = None, name: str = None, tstamp: int = None):
+        self.tag_id = tag_id
+        self.name = name
+        self.tstamp = tstamp
+
+    def exists_strategy(self):
+        return ExistsStrategy.BY_VALUE
+
+    def _non_auto_insert_cols(self):
+        return [self.KEY_COL]
+
+    def _lookup_columns(self):
+        return ['name']
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DbWrapper(False)
+    db.connect({'backend': 'sqlite', 'path': str(tmp_path / 'test.sqlite')})
+    for sql in SCHEMA:
+        db.fetch_data(sql)
+    yield db
+    db.close()
+
+
+def _widgets():
+    return [
+        Widget(1, 'one', 1.5, {'b': 1, 'a': [1]}),
+        Widget(2, 'two', 2.0, None),
+        Widget(3, 'three', 0.1, {'x': 'テ'}),
+    ]
+
+
+def _rows(db, table, key):
+    return db.fetch_data('SELECT * FROM {} ORDER BY {}'.format(table, key))
+
+
+def _upsert(db, items, bulk, name='test'):
+    with db.unit_of_work(name) as unit:
+        if bulk:
+            db.bulk_insert_or_update(items, batch_size=2)
+        else:
+            for item in items:
+                db.insert_or_update(item)
+    return unit
+
+
+def _set_tstamps(db, table):
+    db.update_item('UPDATE {} SET tstamp = 1'.format(table))
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_inserts_new_rows(db, bulk):
+    unit = _upsert(db, _widgets(), bulk)
+    assert unit.rows_by_table['widgets'] == 3
+    rows = _rows(db, 'widgets', 'widget_id')
+    assert [(r['widget_id'], r['name'], r['power']) for r in rows] == [(1, 'one', 1.5), (2, 'two', 2.0),
+                                                                       (3, 'three', 0.1)]
+    assert [json.loads(r['info']) for r in rows] == [{'a': [1], 'b': 1}, None, {'x': 'テ'}]
+    assert all(r['tstamp'] for r in rows)
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_unchanged_rows_are_not_written(db, bulk):
+    _upsert(db, _widgets(), bulk)
+    _set_tstamps(db, 'widgets')
+
+    unit = _upsert(db, _widgets(), bulk)
+
+    assert unit.total_rows() == 0
+    assert {r['tstamp'] for r in _rows(db, 'widgets', 'widget_id')} == {1}
+
+
+def test_bulk_diff_normalizes_values(db):
+    _upsert(db, _widgets(), True)
+    _set_tstamps(db, 'widgets')
+
+    # JSON key order and float vs int are not differences.
+    items = _widgets()
+    items[0].info = json.dumps({'a': [1], 'b': 1})
+    items[1].power = 2
+    unit = _upsert(db, items, True)
+
+    assert unit.total_rows() == 0
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_only_changed_rows_are_updated(db, bulk):
+    _upsert(db, _widgets(), bulk)
+    _set_tstamps(db, 'widgets')
+
+    items = _widgets() + [Widget(4, 'four', 4.0, [])]
+    items[1].name = 'TWO'
+    items[2].info = json.dumps({'x': 'y'})
+    _upsert(db, items, bulk)
+
+    rows = {r['widget_id']: r for r in _rows(db, 'widgets', 'widget_id')}
+    assert rows[2]['name'] == 'TWO'
+    assert json.loads(rows[3]['info']) == {'x': 'y'}
+    assert rows[1]['tstamp'] == 1
+    assert rows[2]['tstamp'] > 1 and rows[3]['tstamp'] > 1 and rows[4]['tstamp'] > 1
+
+
+def test_bulk_matches_single_upserts(tmp_path):
+    def run(bulk):
+        db = DbWrapper(False)
+        db.connect({'backend': 'sqlite', 'path': str(tmp_path / '{}.sqlite'.format(bulk))})
+        for sql in SCHEMA:
+            db.fetch_data(sql)
+        _upsert(db, _widgets()[:2], bulk)
+        items = _widgets()
+        items[0].power = 9.0
+        _upsert(db, items, bulk)
+        rows = [{k: v for k, v in r.items() if k != 'tstamp'} for r in _rows(db, 'widgets', 'widget_id')]
+        db.close()
+        return rows
+
+    assert run(True) == run(False)
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_by_value_items_get_their_keys(db, bulk):
+    _upsert(db, [Tag(name='a'), Tag(name='b')], bulk)
+
+    items = [Tag(name='b'), Tag(name='c'), Tag(name='a')]
+    _upsert(db, items, bulk)
+
+    stored = {r['name']: r['tag_id'] for r in _rows(db, 'tags', 'tag_id')}
+    assert sorted(stored) == ['a', 'b', 'c']
+    assert [t.tag_id for t in items] == [stored['b'], stored['c'], stored['a']]
+
+
+def test_bulk_returns_keys_in_order(db):
+    with db.unit_of_work('test'):
+        keys = db.bulk_insert_or_update([Widget(2, 'two'), Tag(name='a'), Widget(1, 'one')])
+    assert keys[0] == 2 and keys[2] == 1
+    assert keys[1] == _rows(db, 'tags', 'tag_id')[0]['tag_id']
+
+
+def test_bulk_dry_run_writes_nothing(db):
+    dry_db = DbWrapper(True)
+    dry_db.connection = db.connection
+    with dry_db.unit_of_work('test'):
+        dry_db.bulk_insert_or_update(_widgets())
+    assert _rows(db, 'widgets', 'widget_id') == []
+
+
+def _hashed_widgets():
+    return [HashedWidget(w.widget_id, w.name, w.power, json.loads(w.info)) for w in _widgets()]
+
+
+def _hashed_rows(db):
+    return {r['widget_id']: r for r in _rows(db, 'hashed_widgets', 'widget_id')}
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_content_hash_is_stored(db, bulk):
+    items = _hashed_widgets()
+    _upsert(db, items, bulk)
+    rows = _hashed_rows(db)
+    assert [rows[i.widget_id]['content_hash'] for i in items] == [i.content_hash() for i in items]
+    assert len({i.content_hash() for i in items}) == 3
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_matching_hash_skips_the_row(db, bulk):
+    _upsert(db, _hashed_widgets(), bulk)
+    _set_tstamps(db, 'hashed_widgets')
+
+    items = _hashed_widgets()
+    items[1].name = 'TWO'
+    unit = _upsert(db, items, bulk)
+
+    assert unit.rows_by_table['hashed_widgets'] == 1
+    rows = _hashed_rows(db)
+    assert rows[2]['name'] == 'TWO'
+    assert rows[2]['content_hash'] == items[1].content_hash()
+    assert rows[2]['tstamp'] > 1
+    assert rows[1]['tstamp'] == rows[3]['tstamp'] == 1
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_missing_hash_is_filled_without_bumping_tstamp(db, bulk):
+    _upsert(db, _hashed_widgets(), bulk)
+    db.update_item('UPDATE hashed_widgets SET content_hash = NULL, tstamp = 1')
+
+    items = _hashed_widgets()
+    _upsert(db, items, bulk)
+
+    rows = _hashed_rows(db)
+    assert [rows[i.widget_id]['content_hash'] for i in items] == [i.content_hash() for i in items]
+    assert {r['tstamp'] for r in rows.values()} == {1}
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_row_changed_outside_the_pipeline(db, bulk):
+    _upsert(db, _hashed_widgets(), bulk)
+    db.update_item("UPDATE hashed_widgets SET name = 'edited', tstamp = 1 WHERE widget_id = 2")
+
+    # Trusted, the matching hash hides the edit.
+    _upsert(db, _hashed_widgets(), bulk)
+    assert _hashed_rows(db)[2]['name'] == 'edited'
+
+    verifying_db = DbWrapper(False, trust_content_hashes=False)
+    verifying_db.connection = db.connection
+    unit = _upsert(verifying_db, _hashed_widgets(), bulk)
+
+    assert unit.rows_by_table['hashed_widgets'] >= 1
+    row = _hashed_rows(db)[2]
+    assert row['name'] == 'two'
+    assert row['tstamp'] > 1
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_partial_writer_clears_the_hash(db, bulk):
+    _upsert(db, _hashed_widgets(), bulk)
+
+    with db.unit_of_work('test'):
+        if bulk:
+            db.bulk_insert_or_update([HashedWidgetPower(1, 5.0)])
+            db.bulk_insert_or_update(_hashed_widgets())
+        else:
+            db.insert_or_update(HashedWidgetPower(1, 5.0))
+            assert _hashed_rows(db)[1]['content_hash'] is None
+            for item in _hashed_widgets():
+                db.insert_or_update(item)
+
+    # The full writer no longer trusts the stale hash, so it restores its own value.
+    row = _hashed_rows(db)[1]
+    assert row['power'] == 1.5
+    assert row['content_hash'] == _hashed_widgets()[0].content_hash()
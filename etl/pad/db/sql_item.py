@@ -1,57 +1,52 @@
 import decimal
+import hashlib
+import json
 import time
-import binascii
 from datetime import datetime, date
 from enum import Enum
-from typing import Any, Dict, Union, Set
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from pad.common.pad_util import Printable
+from pad.common.shared_types import object_vars, slot_names
 
+# A SQL template with %s placeholders, and the values to bind to them.
+SqlStatement = Tuple[str, List[Any]]
 
-def object_to_sql_params(obj: Union[Dict, "SqlItem"]) -> Dict[str, str]:
-    if isinstance(obj, dict):
-        d = obj.copy()
-        json_keys = []
-    else:
-        d = obj.__dict__.copy()
-        json_keys = obj.json_cols
-    d = _process_col_mappings(type(obj), d, reverse=True)
-    new_d = {}
-    for k, v in d.items():
-        new_val = _value_to_sql_param(v)
-        if k in json_keys:
-            new_val = f"CAST({new_val} AS JSON)"
-        if new_val is not None:
-            new_d[k] = new_val
-    return new_d
-
-
-def _value_to_sql_param(v):
+
+def _value_to_binding(v):
+    if type(v) == datetime:
+        return v.replace(tzinfo=None)
+    return v
+
+
+def _value_to_comparable(v, is_json=False):
+    """Normalizes a python or database value so that equal SQL values compare (and hash) equal."""
     if v is None:
-        return 'NULL'
-    elif type(v) == str:
-        clean_v = v.replace("'", r"''")
-        return "'{}'".format(clean_v)
-    elif type(v) in (int, float, decimal.Decimal):
-        return '{}'.format(v)
-    elif type(v) in [date]:
-        return "'{}'".format(v.isoformat())
-    elif type(v) in [datetime]:
-        return "'{}'".format(v.replace(tzinfo=None).isoformat())
-    elif type(v) in [bool]:
-        return str(v)
-    elif type(v) == bytes:
-        return '0x' + binascii.hexlify(bytearray(v)).decode('ascii')
-    else:
         return None
+    elif is_json:
+        return json.dumps(json.loads(v) if isinstance(v, (str, bytes)) else v, sort_keys=True)
+    elif type(v) == bool:
+        return int(v)
+    elif type(v) in (float, decimal.Decimal):
+        return decimal.Decimal(str(v)).normalize()
+    elif type(v) == datetime:
+        return v.replace(tzinfo=None).isoformat()
+    elif type(v) == date:
+        return v.isoformat()
+    return v
 
 
 def _col_compare(col):
-    return _col_name_ref(col) + ' = ' + _col_value_ref(col)
+    return _col_name_ref(col) + ' = %s'
+
 
+def _col_null_safe_compare(col, json_cols=()):
+    return _col_name_ref(col) + ' <=> ' + _col_placeholder(col, json_cols)
 
-def _col_value_ref(col):
-    return '{' + col + '}'
+
+def _col_placeholder(col, json_cols=()):
+    return 'CAST(%s AS JSON)' if col in json_cols else '%s'
 
 
 def _col_name_ref(col):
@@ -62,11 +57,75 @@ def _tbl_name_ref(table_name):
     return '`' + table_name + '`'
 
 
-def generate_insert_sql(table_name, cols, item):
+# Templates depend only on the table and column list, so they are built once per item class
+# and reused for every row; values are always bound by the driver.
+@lru_cache(maxsize=None)
+def insert_template(table_name: str, cols: Tuple[str, ...], update_cols: Tuple[str, ...] = (),
+                    json_cols: Tuple[str, ...] = ()) -> str:
+    """INSERT for one row; if update_cols is set, existing rows get those columns overwritten.
+
+    Passing this to executemany() lets the driver batch it into multi-row inserts. JSON columns are cast like in
+    update_template; pymysql sends statements with such placeholders one row at a time.
+    """
     sql = 'INSERT INTO {}'.format(_tbl_name_ref(table_name))
     sql += ' (' + ', '.join(map(_col_name_ref, cols)) + ')'
-    sql += ' VALUES (' + ', '.join(map(_col_value_ref, cols)) + ')'
-    return sql.format(**object_to_sql_params(item))
+    sql += ' VALUES (' + ', '.join(_col_placeholder(col, json_cols) for col in cols) + ')'
+    if update_cols:
+        sql += ' ON DUPLICATE KEY UPDATE '
+        sql += ', '.join('{0} = VALUES({0})'.format(_col_name_ref(col)) for col in update_cols)
+    return sql
+
+
+@lru_cache(maxsize=None)
+def update_template(table_name: str, cols: Tuple[str, ...], key_cols: Tuple[str, ...],
+                    json_cols: Tuple[str, ...] = (), hash_col: Optional[str] = None) -> str:
+    """UPDATE of cols for one row.
+
+    If hash_col is set, it and tstamp are appended to the SET clause, and tstamp only changes when the stored
+    hash differs from the new one; this takes three extra bindings (hash, tstamp, hash) before the keys.
+    """
+    sets = [_col_name_ref(col) + ' = ' + _col_placeholder(col, json_cols) for col in cols]
+    if hash_col:
+        # MySQL assigns left to right, so the hash compared here is still the stored one.
+        sets.append('`tstamp` = IF({} <=> %s, `tstamp`, %s)'.format(_col_name_ref(hash_col)))
+        sets.append(_col_compare(hash_col))
+    sql = 'UPDATE {}'.format(_tbl_name_ref(table_name))
+    sql += ' SET ' + ', '.join(sets)
+    sql += ' WHERE ' + ' AND '.join(map(_col_compare, key_cols))
+    return sql
+
+
+@lru_cache(maxsize=None)
+def select_template(table_name: str, key_cols: Tuple[str, ...], cols: Tuple[str, ...],
+                    json_cols: Tuple[str, ...] = ()) -> str:
+    sql = 'SELECT {} FROM {}'.format(', '.join(map(_col_name_ref, key_cols)), _tbl_name_ref(table_name))
+    sql += ' WHERE ' + ' AND '.join(_col_null_safe_compare(col, json_cols) for col in cols)
+    return sql
+
+
+def item_bindings(item: 'SqlItem', cols) -> List[Any]:
+    if hasattr(type(item), 'COL_MAPPINGS'):
+        get_value = _process_col_mappings(type(item), dict(object_vars(item)), reverse=True).get
+    else:
+        get_value = lambda col: getattr(item, col, None)
+
+    hash_col = item.HASH_COL
+    content_hash = item.content_hash() if hash_col and hash_col in cols else None
+    # The cleared hash column is not an attribute of the item (and content_hash would find the method), so it is
+    # bound to NULL here.
+    clears_hash_col = item.CLEARS_HASH_COL
+    return [_value_to_binding(content_hash if col == hash_col else None if col == clears_hash_col else get_value(col))
+            for col in cols]
+
+
+def row_bindings(row: Dict[str, Any], cols) -> List[Any]:
+    return [_value_to_binding(row.get(col)) for col in cols]
+
+
+def row_content_hash(row: Dict[str, Any], cols, json_cols=()) -> str:
+    """Hash of the named column values, stable across runs and across python/database value types."""
+    values = [(col, _value_to_comparable(row.get(col), col in json_cols)) for col in cols]
+    return hashlib.md5(repr(values).encode('utf-8')).hexdigest()
 
 
 # This could maybe move to a class method on SqlItem?
@@ -87,31 +146,37 @@ def _full_columns(o: 'SqlItem', remove_cols=None, add_cols=None):
     remove_cols = remove_cols or []
     add_cols = add_cols or []
 
-    cols = set(vars(o).keys())
-    # if o.uses_local_primary_key():
-    #     cols.discard(o._key())
-    cols.discard('tstamp')
+    # Keep declaration (i.e. __slots__ or __init__) order so that every instance of a class
+    # yields the same column list, and therefore the same cached statement template.
+    attrs = slot_names(type(o)) or object_vars(o).keys()
+    cols = [x for x in attrs if x != 'tstamp' and not x.startswith('resolved')]
+    cols = [x for x in cols if x not in remove_cols]
+    cols.extend(x for x in add_cols if x not in cols)
 
-    cols = set([x for x in cols if not x.startswith('resolved')])
-    cols = cols.difference(remove_cols)
-    cols = cols.union(add_cols)
+    return cols
 
-    return list(cols)
 
+def _with_managed_columns(item: 'SqlItem', cols) -> List[str]:
+    """Adds the columns the item maintains itself when inserted: tstamp (set to now) and the content hash."""
+    cols = list(cols)
+    if hasattr(item, 'tstamp'):
+        if 'tstamp' not in cols:
+            cols.append('tstamp')
+        setattr(item, 'tstamp', int(time.time()))
+    for hash_col in (item.HASH_COL, item.CLEARS_HASH_COL):
+        if hash_col and hash_col not in cols:
+            cols.append(hash_col)
+    return cols
 
-def _key_and_cols_compare(item: 'SqlItem', cols=None, include_key=True):
-    cols = cols or []
-    if include_key:
-        for col in item.key:
-            if col not in cols:
-                cols = [col] + cols
 
-    sql = 'SELECT {} FROM {} WHERE'.format(', '.join(item.key), item.table)
-    sql += ' ' + ' AND '.join(map(_col_compare, cols))
-    formatted_sql = sql.format(**object_to_sql_params(item))
-    fixed_sql = formatted_sql.replace('= NULL', 'is NULL')
+def _key_and_cols_compare(item: 'SqlItem', cols=None, include_key=True) -> SqlStatement:
+    cols = list(cols or [])
+    key_cols = tuple(sorted(item.key))
+    if include_key:
+        cols = [col for col in key_cols if col not in cols] + cols
 
-    return fixed_sql
+    sql = select_template(item.table, key_cols, tuple(cols), tuple(item.json_cols))
+    return sql, item_bindings(item, cols)
 
 
 class ExistsStrategy(Enum):
@@ -122,52 +187,93 @@ class ExistsStrategy(Enum):
 
 
 class SqlItem(Printable):
-    __dict__: Dict[str, Any]
+    __slots__ = ()
+
+    # Column storing content_hash(), if the table has one; see content_hash().
+    HASH_COL = None  # type: Optional[str]
+    # For items that write some columns of another item's row: that item's hash column, which is set to NULL on
+    # every write so that the other item is compared in full on its next upsert.
+    CLEARS_HASH_COL = None  # type: Optional[str]
 
     def key_str(self):
         return ', '.join(str(getattr(self, key)) for key in self.key) if self.key else None
 
+    def key_value(self):
+        """Value of a single-column key; None if it is not set yet or the key spans multiple columns."""
+        if len(self.key) != 1:
+            return None
+        return getattr(self, next(iter(self.key)), None)
+
     def exists_strategy(self) -> ExistsStrategy:
         return ExistsStrategy.BY_KEY
 
-    def key_exists_sql(self):
+    def key_exists_sql(self) -> SqlStatement:
         return _key_and_cols_compare(self)
 
-    def value_exists_sql(self):
+    def value_exists_sql(self) -> SqlStatement:
         exists_cols = self._lookup_columns()
         return _key_and_cols_compare(self, cols=exists_cols, include_key=False)
 
-    def needs_update_sql(self, include_key=True):
+    def needs_update_sql(self, include_key=True) -> SqlStatement:
         update_cols = self._update_columns()
         if update_cols is None:
             return False
 
         return _key_and_cols_compare(self, cols=update_cols, include_key=include_key)
 
+    def content_hash(self) -> Optional[str]:
+        """Hash of the update column values, or None if the table has no HASH_COL.
+
+        The hash is stored alongside the row, so an unchanged item can be recognized without comparing
+        every column in a query (see DbWrapper.insert_or_update).
+        """
+        if not self.HASH_COL:
+            return None
+        cols = self._update_columns()
+        return row_content_hash(dict(zip(cols, item_bindings(self, cols))), cols, self.json_cols)
+
     # TODO: move to dbutil
-    def update_sql(self):
+    def update_sql(self) -> SqlStatement:
         cols = self._update_columns()
         if not cols:
             return None  # Update not supported
 
-        # If an item is timestamped, modify the timestamp on every update
-        if hasattr(self, 'tstamp'):
-            if 'tstamp' not in cols:
-                cols = cols + ['tstamp']
-            setattr(self, 'tstamp', int(time.time()))
-
-        sql = 'UPDATE {}'.format(self._table())
-        sql += ' SET ' + ', '.join(map(_col_compare, cols))
-        sql += ' WHERE ' + ' AND '.join(_col_compare(key) for key in self.key)
-        return sql.format(**object_to_sql_params(self))
-
-    def insert_sql(self):
-        cols = self._insert_columns()
+        cols = [col for col in cols if col != 'tstamp']
+        binding_cols = list(cols)
+        hash_col = None
         if hasattr(self, 'tstamp'):
-            if 'tstamp' not in cols:
-                cols = cols + ['tstamp']
+            # Timestamped items get a new tstamp on update; with a hash column, only if the content changed.
             setattr(self, 'tstamp', int(time.time()))
-        return generate_insert_sql(self._table(), cols, self)
+            if self.HASH_COL:
+                hash_col = self.HASH_COL
+                binding_cols += [hash_col, 'tstamp', hash_col]
+            else:
+                cols.append('tstamp')
+                binding_cols.append('tstamp')
+        elif self.HASH_COL:
+            cols.append(self.HASH_COL)
+            binding_cols.append(self.HASH_COL)
+        if self.CLEARS_HASH_COL:
+            # Bound to NULL by item_bindings.
+            cols.insert(0, self.CLEARS_HASH_COL)
+            binding_cols.insert(0, self.CLEARS_HASH_COL)
+
+        key_cols = tuple(sorted(self.key))
+        sql = update_template(self._table(), tuple(cols), key_cols, tuple(self.json_cols), hash_col)
+        return sql, item_bindings(self, binding_cols + list(key_cols))
+
+    def content_hash_sql(self, clear: bool = False) -> SqlStatement:
+        """Stores the content hash (or NULL if clear) without touching anything else, e.g. for rows written before
+        it existed."""
+        key_cols = tuple(sorted(self.key))
+        sql = update_template(self._table(), (self.HASH_COL,), key_cols)
+        if clear:
+            return sql, [None] + item_bindings(self, key_cols)
+        return sql, item_bindings(self, [self.HASH_COL] + list(key_cols))
+
+    def insert_sql(self) -> SqlStatement:
+        cols = _with_managed_columns(self, self._insert_columns())
+        return insert_template(self._table(), tuple(cols), json_cols=tuple(self.json_cols)), item_bindings(self, cols)
 
     def set_key_value(self, key_value):
         assert len(self.key) == 1  # TODO: Remove this eventually
@@ -206,6 +312,24 @@ class SqlItem(Printable):
 
 
 class SimpleSqlItem(SqlItem):
+    """SqlItem whose table and key are class attributes and whose columns are its attributes.
+
+    The insert/update column lists are the same for every instance of a class, so they are computed
+    once per class (from __slots__ if declared, otherwise from the first instance) and cached.
+    """
+    __slots__ = ()
+    _column_cache = {}  # type: Dict[str, Tuple[str, ...]]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._column_cache = {}
+
+    def _class_columns(self, kind: str, compute: Callable[[], List[str]]) -> Tuple[str, ...]:
+        cache = type(self)._column_cache
+        if kind not in cache:
+            cache[kind] = tuple(compute())
+        return cache[kind]
+
     def _table(self) -> str:
         return type(self).TABLE
 
@@ -218,10 +342,10 @@ class SimpleSqlItem(SqlItem):
         return []
 
     def _insert_columns(self):
-        return _full_columns(self, remove_cols=self._non_auto_insert_cols())
+        return self._class_columns('insert', lambda: _full_columns(self, remove_cols=self._non_auto_insert_cols()))
 
     def _non_auto_update_cols(self):
         return []
 
     def _update_columns(self):
-        return _full_columns(self, remove_cols=self._non_auto_update_cols())
+        return self._class_columns('update', lambda: _full_columns(self, remove_cols=self._non_auto_update_cols()))
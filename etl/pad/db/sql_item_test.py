@@ -0,0 +1,40 @@
+import json
+
+from pad.db.sql_item import SimpleSqlItem, insert_template
+
+
+class Behavior(SimpleSqlItem):
+    TABLE = 'behaviors'
+    KEY_COL = 'behavior_id'
+
+    def __init__(self, behavior_id: int = None, name: str = None, behavior: list = None, tstamp: int = None):
+        self.behavior_id = behavior_id
+        self.name = name
+        self.behavior = json.dumps(behavior)
+        self.tstamp = tstamp
+
+    def _json_cols(self):
+        return ['behavior']
+
+
+def test_insert_and_update_cast_json_columns_alike():
+    item = Behavior(1, 'a', [1, 2])
+    insert_sql, insert_bindings = item.insert_sql()
+    update_sql, update_bindings = item.update_sql()
+
+    assert insert_sql == ('INSERT INTO `behaviors` (`behavior_id`, `name`, `behavior`, `tstamp`) '
+                          'VALUES (%s, %s, CAST(%s AS JSON), %s)')
+    assert update_sql == ('UPDATE `behaviors` SET `behavior_id` = %s, `name` = %s, `behavior` = CAST(%s AS JSON), '
+                          '`tstamp` = %s WHERE `behavior_id` = %s')
+    assert insert_bindings[:3] == update_bindings[:3] == [1, 'a', '[1, 2]']
+
+
+def test_templates_are_shared_between_items():
+    first, _ = Behavior(1, 'a', []).insert_sql()
+    second, _ = Behavior(2, 'b', [3]).insert_sql()
+    assert first is second
+
+
+def test_insert_template_with_updates():
+    sql = insert_template('t', ('a', 'b'), ('b',), ('b',))
+    assert sql == 'INSERT INTO `t` (`a`, `b`) VALUES (%s, CAST(%s AS JSON)) ON DUPLICATE KEY UPDATE `b` = VALUES(`b`)'
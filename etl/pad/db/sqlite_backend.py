@@ -0,0 +1,157 @@
+"""
+SQLite stand-in for the pymysql connection used by DbWrapper.
+
+Statements are written for MySQL throughout the pipeline; they are translated here to the equivalent SQLite syntax,
+so processors can run in-process against a local file (e.g. the sqlite database shipped to the bot) instead of a
+MySQL server.
+"""
+import decimal
+import logging
+import re
+import sqlite3
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('database')
+
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_adapter(datetime, lambda v: v.replace(tzinfo=None).isoformat(' '))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+
+_JSON_PLACEHOLDER_RE = re.compile(r'CAST\(\s*%s\s+AS\s+JSON\s*\)', re.IGNORECASE)
+_NULL_SAFE_EQUALS_RE = re.compile(r'\s*<=>\s*')
+_ON_DUPLICATE_KEY_RE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_INSERTED_VALUE_RE = re.compile(r'\bVALUES\(\s*(`?\w+`?)\s*\)', re.IGNORECASE)
+_IF_RE = re.compile(r'\bIF\s*\(', re.IGNORECASE)
+_UNIX_TIMESTAMP_RE = re.compile(r'\bUNIX_TIMESTAMP\(\s*\)', re.IGNORECASE)
+
+# Upserts without a conflict target need 3.35; IIF needs 3.32.
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+@lru_cache(maxsize=4096)
+def translate_sql(sql: str, has_bindings: bool) -> str:
+    """Rewrites a MySQL statement into the SQLite equivalent.
+
+    Covers what the pipeline uses: %s placeholders, CAST(%s AS JSON), <=>, INSERT ... ON DUPLICATE KEY UPDATE
+    (as an upsert on any unique constraint), IF() and UNIX_TIMESTAMP().
+    """
+    if has_bindings:
+        # Like pymysql, only statements with bindings treat % as a format character.
+        sql = _JSON_PLACEHOLDER_RE.sub('?', sql)
+        sql = sql.replace('%s', '?').replace('%%', '%')
+    sql = _NULL_SAFE_EQUALS_RE.sub(' IS ', sql)
+    if _ON_DUPLICATE_KEY_RE.search(sql):
+        sql = _ON_DUPLICATE_KEY_RE.sub('ON CONFLICT DO UPDATE SET', sql)
+        sql = _INSERTED_VALUE_RE.sub(r'excluded.\1', sql)
+    sql = _IF_RE.sub('IIF(', sql)
+    sql = _UNIX_TIMESTAMP_RE.sub("CAST(strftime('%s', 'now') AS INTEGER)", sql)
+    return sql
+
+
+def _dict_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+class SqliteCursor(object):
+    """Behaves like a buffered pymysql DictCursor: execute() returns the affected or selected row count."""
+
+    def __init__(self, connection: 'SqliteConnection'):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        self._rows = []  # type: List[Dict[str, Any]]
+        self.rowcount = -1
+        self.lastrowid = None  # type: Optional[int]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._cursor.close()
+
+    def execute(self, sql: str, args: Optional[List[Any]] = None) -> int:
+        self.connection.ensure_transaction()
+        self._cursor.execute(translate_sql(sql, args is not None), args or ())
+        return self._finish()
+
+    def executemany(self, sql: str, args: List[List[Any]]) -> int:
+        self.connection.ensure_transaction()
+        self._cursor.executemany(translate_sql(sql, True), args)
+        return self._finish()
+
+    def _finish(self) -> int:
+        self.lastrowid = self._cursor.lastrowid
+        if self._cursor.description is not None:
+            self._rows = self._cursor.fetchall()
+            self.rowcount = len(self._rows)
+        else:
+            self._rows = []
+            self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def fetchall(self) -> List[Dict[str, Any]]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self) -> Optional[Dict[str, Any]]:
+        return self._rows.pop(0) if self._rows else None
+
+
+class SqliteConnection(object):
+    """The subset of the pymysql connection interface that DbWrapper and its callers rely on."""
+
+    def __init__(self, path: str, timeout: float = 60):
+        # Transactions are managed explicitly below, mirroring MySQL's autocommit switch.
+        self.raw = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.raw.row_factory = _dict_row_factory
+        self.raw.execute('PRAGMA foreign_keys = OFF')
+        self._autocommit = True
+
+    def cursor(self) -> SqliteCursor:
+        return SqliteCursor(self)
+
+    def autocommit(self, value: bool):
+        if value and self.raw.in_transaction:
+            # As in MySQL, switching autocommit back on commits the open transaction.
+            self.raw.commit()
+        self._autocommit = value
+
+    def ensure_transaction(self):
+        if not self._autocommit and not self.raw.in_transaction:
+            self.begin()
+
+    def begin(self):
+        if self.raw.in_transaction:
+            self.raw.commit()
+        # Take the write lock up front; connections in other threads wait for it (up to timeout) rather than
+        # failing when a read transaction later needs to write.
+        self.raw.execute('BEGIN IMMEDIATE')
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect: bool = True):
+        pass
+
+    def close(self):
+        self.raw.close()
+
+
+def _check_sqlite_version():
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise ValueError('the sqlite backend requires SQLite {} or newer, this Python uses {}'.format(
+            '.'.join(map(str, MIN_SQLITE_VERSION)), sqlite3.sqlite_version))
+
+
+def connect(db_config: Dict[str, Any]) -> SqliteConnection:
+    """Opens db_config['path']; the file must already contain the schema (e.g. a previous export)."""
+    _check_sqlite_version()
+    logger.info('Using sqlite database at %s', db_config['path'])
+    return SqliteConnection(db_config['path'], db_config.get('timeout', 60))
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from pad.db.sqlite_backend import connect, translate_sql
+
+
+@pytest.mark.parametrize('sql, has_bindings, expected', [
+    ('SELECT `a` FROM `t` WHERE `a` = %s', True, 'SELECT `a` FROM `t` WHERE `a` = ?'),
+    ('SELECT 1 WHERE `j` <=> CAST(%s AS JSON)', True, 'SELECT 1 WHERE `j` IS ?'),
+    ("SELECT 1 WHERE `a` LIKE '%%x'", True, "SELECT 1 WHERE `a` LIKE '%x'"),
+    ("SELECT 1 WHERE `a` LIKE '%x'", False, "SELECT 1 WHERE `a` LIKE '%x'"),
+    ('INSERT INTO `t` (`a`, `b`) VALUES (%s, %s) ON DUPLICATE KEY UPDATE `b` = VALUES(`b`)', True,
+     'INSERT INTO `t` (`a`, `b`) VALUES (?, ?) ON CONFLICT DO UPDATE SET `b` = excluded.`b`'),
+    ('UPDATE `t` SET `x` = IF(`h` <=> %s, `x`, %s)', True, 'UPDATE `t` SET `x` = IIF(`h` IS ?, `x`, ?)'),
+    ('UPDATE `t` SET `x` = UNIX_TIMESTAMP()', False, "UPDATE `t` SET `x` = CAST(strftime('%s', 'now') AS INTEGER)"),
+])
+def test_translate_sql(sql, has_bindings, expected):
+    assert translate_sql(sql, has_bindings) == expected
+
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = connect({'path': str(tmp_path / 'test.sqlite')})
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE t (a INTEGER PRIMARY KEY, b TEXT)')
+    yield connection
+    connection.close()
+
+
+def _select_all(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT `a`, `b` FROM `t` ORDER BY `a`')
+        return cursor.fetchall()
+
+
+def test_cursor_behaves_like_dict_cursor(connection):
+    with connection.cursor() as cursor:
+        assert cursor.executemany('INSERT INTO `t` (`a`, `b`) VALUES (%s, %s)', [[1, 'x'], [2, 'y']]) == 2
+        assert cursor.execute('INSERT INTO `t` (`a`, `b`) VALUES (%s, %s) ON DUPLICATE KEY UPDATE `b` = VALUES(`b`)',
+                              [2, 'z']) == 1
+        assert cursor.execute('SELECT `b` FROM `t` WHERE `a` = %s', [2]) == 1
+        assert cursor.fetchone() == {'b': 'z'}
+        assert cursor.fetchone() is None
+
+
+def test_rollback_discards_the_transaction(connection):
+    connection.autocommit(False)
+    connection.begin()
+    with connection.cursor() as cursor:
+        cursor.execute('INSERT INTO `t` (`a`, `b`) VALUES (%s, %s)', [1, 'x'])
+    connection.rollback()
+    connection.autocommit(True)
+    assert _select_all(connection) == []
+
+
+def test_enabling_autocommit_commits(connection):
+    connection.autocommit(False)
+    connection.begin()
+    with connection.cursor() as cursor:
+        cursor.execute('INSERT INTO `t` (`a`, `b`) VALUES (%s, %s)', [1, 'x'])
+    connection.autocommit(True)
+    connection.rollback()
+    assert _select_all(connection) == [{'a': 1, 'b': 'x'}]
+
+
+def test_old_sqlite_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite3, 'sqlite_version_info', (3, 34, 1))
+    monkeypatch.setattr(sqlite3, 'sqlite_version', '3.34.1')
+    with pytest.raises(ValueError, match='requires SQLite 3.35.0 or newer, this Python uses 3.34.1'):
+        connect({'path': str(tmp_path / 'test.sqlite')})
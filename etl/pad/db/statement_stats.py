@@ -0,0 +1,148 @@
+"""
+Per-statement SQL statistics for a run, grouped by processor, calling function and statement template.
+
+Collected by DbWrapper when --profile is on. Latencies go into a fixed set of logarithmic buckets, so the memory
+used per template stays constant however many statements run; the reported percentiles are the upper bound of the
+bucket they fall in, which is within about 20% of the exact value.
+"""
+import json
+import math
+import re
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r'(?<![\w`])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,)*\s*(?:\?|%s)\s*\)', re.IGNORECASE)
+_VALUES_LIST_RE = re.compile(r'(\bVALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# (processor, caller, statement template)
+StatementKey = Tuple[Optional[str], str, str]
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """Reduces a statement to its template, so that statements differing only in literal values group together."""
+    sql = _STRING_LITERAL_RE.sub('?', sql)
+    sql = _NUMBER_LITERAL_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _VALUES_LIST_RE.sub(r'\1, ...', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def calling_function(skip_module_prefix: str = 'pad.db') -> str:
+    """Name of the innermost function on the stack that is outside the given package."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__', '').startswith(skip_module_prefix):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    code = frame.f_code
+    return '{}.{}'.format(frame.f_globals.get('__name__'), getattr(code, 'co_qualname', code.co_name))
+
+
+# Latency buckets: bucket i holds durations up to _BUCKET_BASE * _BUCKET_GROWTH ** i seconds.
+_BUCKET_BASE = 1e-6
+_BUCKETS_PER_DOUBLING = 4
+_BUCKET_GROWTH = 2 ** (1 / _BUCKETS_PER_DOUBLING)
+
+
+def _bucket(duration: float) -> int:
+    if duration <= _BUCKET_BASE:
+        return 0
+    return math.ceil(math.log2(duration / _BUCKET_BASE) * _BUCKETS_PER_DOUBLING)
+
+
+def _bucket_limit(bucket: int) -> float:
+    return _BUCKET_BASE * _BUCKET_GROWTH ** bucket
+
+
+class StatementStat(object):
+    """Accumulated executions of a single statement template."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.buckets = defaultdict(int)  # type: Dict[int, int]
+
+    def record(self, row_count: int, duration: float):
+        self.calls += 1
+        self.rows += max(row_count or 0, 0)
+        self.total_time += duration
+        self.buckets[_bucket(duration)] += 1
+
+    def merge(self, other: 'StatementStat'):
+        self.calls += other.calls
+        self.rows += other.rows
+        self.total_time += other.total_time
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] += count
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile duration."""
+        if not self.calls:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * self.calls))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return _bucket_limit(bucket)
+        return _bucket_limit(max(self.buckets))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'rows': self.rows,
+            'total_s': round(self.total_time, 6),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+        }
+
+
+class StatementStats(object):
+    """Call count, rows and latency of every statement DbWrapper runs, by processor, caller and template."""
+
+    def __init__(self):
+        self.stats = defaultdict(StatementStat)  # type: Dict[StatementKey, StatementStat]
+
+    def record(self, processor: Optional[str], sql: str, row_count: int, duration: float):
+        self.stats[(processor, calling_function(), normalize_sql(sql))].record(row_count, duration)
+
+    def merge(self, other: 'StatementStats'):
+        for key, stat in other.stats.items():
+            self.stats[key].merge(stat)
+
+    def by_total_time(self) -> List[Tuple[StatementKey, StatementStat]]:
+        return sorted(self.stats.items(), key=lambda x: x[1].total_time, reverse=True)
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        result = []
+        for (processor, caller, sql), stat in self.by_total_time():
+            entry = {'processor': processor, 'caller': caller, 'statement': sql}
+            entry.update(stat.summary())
+            result.append(entry)
+        return result
+
+    def save(self, file_path: str):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def report(self, limit: Optional[int] = 25, statement_width: int = 80) -> str:
+        """A plain text table of the statements that took the most total time."""
+        header = ('processor / caller', 'calls', 'rows', 'total s', 'p50 ms', 'p99 ms', 'statement')
+        lines = ['{:<60} {:>8} {:>9} {:>9} {:>8} {:>8}  {}'.format(*header)]
+        for (processor, caller, sql), stat in self.by_total_time()[:limit]:
+            summary = stat.summary()
+            source = '{} / {}'.format(processor or '-', '.'.join(caller.split('.')[-2:]))
+            lines.append('{:<60} {:>8} {:>9} {:>9.2f} {:>8.2f} {:>8.2f}  {}'.format(
+                source[-60:], summary['calls'], summary['rows'], summary['total_s'],
+                summary['p50_ms'], summary['p99_ms'], sql[:statement_width]))
+        total_time = sum(stat.total_time for stat in self.stats.values())
+        total_calls = sum(stat.calls for stat in self.stats.values())
+        lines.append('{} statements in {:.2f}s across {} templates'.format(total_calls, total_time, len(self.stats)))
+        return '\n'.join(lines)
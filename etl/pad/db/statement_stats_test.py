@@ -0,0 +1,69 @@
+import pytest
+
+from pad.db.db_util import DbWrapper
+from pad.db.statement_stats import StatementStat, StatementStats, normalize_sql
+
+
+@pytest.mark.parametrize('sql, expected', [
+    ("SELECT * FROM t WHERE a = 'x''s' AND b = 12.5", 'SELECT * FROM t WHERE a = ? AND b = ?'),
+    ('SELECT * FROM t2 WHERE a IN (%s, %s, %s)', 'SELECT * FROM t2 WHERE a IN (...)'),
+    ('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)\n  ', 'INSERT INTO t (a, b) VALUES (%s, %s), ...'),
+    ('SELECT `col1` FROM `t3`', 'SELECT `col1` FROM `t3`'),
+])
+def test_normalize_sql(sql, expected):
+    assert normalize_sql(sql) == expected
+
+
+def test_percentiles_are_close_to_exact():
+    durations = [0.001 * (i + 1) for i in range(1000)]
+    stat = StatementStat()
+    for duration in durations:
+        stat.record(1, duration)
+
+    assert stat.calls == 1000 and stat.rows == 1000
+    assert stat.total_time == pytest.approx(sum(durations))
+    for pct, exact in [(50, 0.5), (99, 0.99), (100, 1.0)]:
+        assert exact <= stat.percentile(pct) <= exact * 1.2
+
+
+def test_storage_is_bounded():
+    stat = StatementStat()
+    for i in range(100000):
+        stat.record(0, 0.0005 + (i % 1000) * 1e-6)
+    assert len(stat.buckets) < 10
+
+
+def test_merge():
+    first, second = StatementStat(), StatementStat()
+    first.record(2, 0.001)
+    second.record(-1, 0.1)
+    second.record(3, 0.1)
+    first.merge(second)
+    assert (first.calls, first.rows) == (3, 5)
+    assert first.percentile(50) >= 0.1
+    assert StatementStat().percentile(50) == 0.0
+
+
+def test_db_wrapper_records_only_when_enabled(tmp_path):
+    db_config = {'backend': 'sqlite', 'path': str(tmp_path / 'test.sqlite')}
+
+    db = DbWrapper(False)
+    db.connect(db_config)
+    db.fetch_data('SELECT 1')
+    assert db.statement_stats is None
+    db.close()
+
+    db = DbWrapper(False, record_statement_stats=True)
+    db.connect(db_config)
+    with db.unit_of_work('unit'):
+        db.fetch_data('SELECT 1')
+        db.fetch_data('SELECT 2')
+    db.close()
+
+    stats = StatementStats()
+    stats.merge(db.statement_stats)
+    [(key, stat)] = stats.by_total_time()
+    assert key == ('unit', __name__ + '.test_db_wrapper_records_only_when_enabled', 'SELECT ?')
+    assert stat.calls == 2
+    assert stats.to_json()[0]['calls'] == 2
+    assert '2 statements' in stats.report()
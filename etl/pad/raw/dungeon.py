@@ -4,7 +4,7 @@ Parses Dungeon and DungeonFloor data.
 
 import csv
 from io import StringIO
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from pad.common import pad_util
 from pad.common.dungeon_types import RawDungeonType, RawRepeatDay
@@ -211,6 +211,17 @@ class Dungeon(pad_util.Printable):
         return 'Dungeon({} - {})'.format(self.dungeon_id, self.clean_name)
 
 
+def _iter_lines(text: str) -> Iterator[str]:
+    """Same lines as text.split('\\n'), without holding them all at once; the dungeon data is one large string."""
+    start = 0
+    while start <= len(text):
+        end = text.find('\n', start)
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+        start = end + 1
+
+
 def load_dungeon_data(data_dir: str = None, json_file: str = None) -> List[Dungeon]:
     """Converts dungeon JSON into an array of Dungeons."""
     data_json = pad_util.load_raw_json(data_dir, json_file, FILE_NAME)
@@ -219,7 +230,7 @@ def load_dungeon_data(data_dir: str = None, json_file: str = None) -> List[Dunge
     dungeons = []
     cur_dungeon = None
 
-    for line in dungeon_info.split('\n'):
+    for line in _iter_lines(dungeon_info):
         info = line[0:2]
         data = line[2:]
         data = data.replace("',", "`,").replace(",'", ",`")
@@ -54,5 +54,5 @@ class MonsterSkill(pad_util.Printable):
 
 def load_skill_data(data_dir=None, json_file: str = None) -> List[MonsterSkill]:
     """Load MonsterSkill objects from the PAD json file."""
-    data_json = pad_util.load_raw_json(data_dir, json_file, FILE_NAME)
-    return [MonsterSkill(i, ms) for i, ms in enumerate(data_json['skill'])]
+    raw_skills = pad_util.iter_raw_json_list(data_dir, json_file, FILE_NAME, 'skill')
+    return [MonsterSkill(i, ms) for i, ms in enumerate(raw_skills)]
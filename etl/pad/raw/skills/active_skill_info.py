@@ -2,6 +2,7 @@ import logging
 from collections import Counter, defaultdict, namedtuple
 from copy import copy
 from fractions import Fraction
+from functools import lru_cache
 from numbers import Rational
 from typing import Any, Iterable, List, Mapping, Optional, Union, Tuple, Dict
 
@@ -1525,13 +1526,25 @@ class ASInflictES(ActiveSkill):
         return converter.inflict_es(self)
 
 
-def convert(skill_list: List[MonsterSkill]):
-    skill_type_to_constructor = {}
+@lru_cache(maxsize=None)
+def skill_type_to_constructor() -> Dict[int, type]:
+    result = {}
     for skill in ALL_ACTIVE_SKILLS:
-        if skill.skill_type in skill_type_to_constructor:
+        if skill.skill_type in result:
             raise ValueError('Unexpected duplicate skill_type: ' + str(skill.skill_type))
-        skill_type_to_constructor[skill.skill_type] = skill
+        result[skill.skill_type] = skill
+    return result
+
+
+def convert(skill_list: List[MonsterSkill]):
+    results = convert_skills(skill_list)
+    link_multi_part(results)
+    return list(results.values())
 
+
+def convert_skills(skill_list: List[MonsterSkill]) -> Dict[int, ActiveSkill]:
+    """Converts the skills by id, without filling in the children of multi-part skills."""
+    constructors = skill_type_to_constructor()
     results = {}
     for s in skill_list:
         skill_constructor = None
@@ -1539,13 +1552,16 @@ def convert(skill_list: List[MonsterSkill]):
         if s.skill_type == 0 and len(s.data) > 1 and s.data[1] != 0:
             # This is an annoying special case
             skill_constructor = ASMultiplierMultiTargetAttrNuke
-        elif s.skill_type in skill_type_to_constructor:
-            skill_constructor = skill_type_to_constructor[s.skill_type]
+        elif s.skill_type in constructors:
+            skill_constructor = constructors[s.skill_type]
 
         if skill_constructor is not None:
             results[s.skill_id] = skill_constructor(s)
+    return results
+
 
-    # Fill in MultiSkills
+def link_multi_part(results: Dict[int, ActiveSkill]):
+    """Fills in the children of multi-part skills from results, which must include every converted skill."""
     for s in results.values():
         if not isinstance(s, ASMultiPart):
             continue
@@ -1557,8 +1573,6 @@ def convert(skill_list: List[MonsterSkill]):
             p_skill = results[p_id]
             s.child_skills.append(p_skill)
 
-    return list(results.values())
-
 
 ALL_ACTIVE_SKILLS = [
     ASFixedMultiTargetAttrNuke,
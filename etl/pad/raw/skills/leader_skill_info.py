@@ -1,7 +1,7 @@
 import logging
 from collections import namedtuple
-from functools import reduce
-from typing import Optional, List
+from functools import lru_cache, reduce
+from typing import Dict, Optional, List
 
 from pad.raw.skills.en.leader_skill_text import EnLSTextConverter
 
@@ -1955,6 +1955,13 @@ class LSRarityConditionBonus(LeaderSkill):
 
 
 def convert(skill_list: List[MonsterSkill]):
+    results = convert_skills(skill_list)
+    link_multi_part(results)
+    return list(results.values())
+
+
+def convert_skills(skill_list: List[MonsterSkill]) -> Dict[int, LeaderSkill]:
+    """Converts the skills by id, without filling in the children of multi-part skills."""
     results = {}
     for s in skill_list:
         try:
@@ -1963,8 +1970,11 @@ def convert(skill_list: List[MonsterSkill]):
                 results[ns.skill_id] = ns
         except Exception as ex:
             human_fix_logger.warning('Failed to convert {} {}'.format(s.skill_type, ex))
+    return results
 
-    # Fills in LSMultiPartSkills
+
+def link_multi_part(results: Dict[int, LeaderSkill]):
+    """Fills in the children of multi-part skills from results, which must include every converted skill."""
     for s in results.values():
         if not isinstance(s, LSMultiPartSkill):
             continue
@@ -1974,7 +1984,16 @@ def convert(skill_list: List[MonsterSkill]):
                 continue
             p_skill = results[p_id]
             s.child_skills.append(p_skill)
-    return list(results.values())
+
+
+@lru_cache(maxsize=None)
+def skill_type_to_constructor() -> Dict[int, type]:
+    result = {}
+    for ls_type in ALL_LEADER_SKILLS:
+        if ls_type.skill_type in result:
+            raise ValueError('Unexpected duplicate skill_type: ' + str(ls_type.skill_type))
+        result[ls_type.skill_type] = ls_type
+    return result
 
 
 # TODO: These ended up being 1:1, convert skill type to a class value, then
@@ -1985,12 +2004,7 @@ def convert_skill(skill) -> Optional[LeaderSkill]:
         # Currently the skill data for 1538 is ['無し', '', 0, 0, 0, ''] but it's in use.
         return LeaderSkill(0, skill)
 
-    d = {}
-    for ls_type in ALL_LEADER_SKILLS:
-        if ls_type.skill_type in d:
-            raise ValueError('Unexpected duplicate skill_type: ' + str(ls_type.skill_type))
-        d[ls_type.skill_type] = ls_type
-    return d.get(skill.skill_type, lambda s: None)(skill)
+    return skill_type_to_constructor().get(skill.skill_type, lambda s: None)(skill)
 
 
 ALL_LEADER_SKILLS = [
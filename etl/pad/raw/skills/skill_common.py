@@ -222,6 +222,13 @@ class Board:
     def __init__(self, data: List[List[int]] = None):
         self.data = data or [[-1 for _ in range(7)] for _ in range(6)]
 
+    # Most skills have an empty board; pickle those (e.g. from a SkillParser worker) without the grid.
+    def __getstate__(self):
+        return {'data': self.data if self else None}
+
+    def __setstate__(self, state):
+        self.__init__(state['data'])
+
     def __or__(self, other):
         if not isinstance(other, Board):
             raise TypeError(f"unsupported operand type(s) for |: 'Board' and '{other.__class__.__name__}'")
@@ -1,5 +1,6 @@
 import logging
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple
 
 from pad.raw.skill import MonsterSkill
 from pad.raw.skills import active_skill_info, leader_skill_info
@@ -8,6 +9,28 @@ from pad.raw.skills.leader_skill_info import LeaderSkill
 
 human_fix_logger = logging.getLogger('human_fix')
 
+# Below this many skills per worker, starting the workers and pickling the results costs more than it saves.
+MIN_SKILLS_PER_PROCESS = 5000
+
+
+def _convert_shard(skill_list: List[MonsterSkill]) -> Tuple[Dict[int, ActiveSkill], Dict[int, LeaderSkill]]:
+    return active_skill_info.convert_skills(skill_list), leader_skill_info.convert_skills(skill_list)
+
+
+def _convert_in_processes(skill_list: List[MonsterSkill], processes: int) \
+        -> Tuple[Dict[int, ActiveSkill], Dict[int, LeaderSkill]]:
+    processes = min(processes, len(skill_list) // MIN_SKILLS_PER_PROCESS)
+    shard_size = -(-len(skill_list) // processes)
+    shards = [skill_list[i:i + shard_size] for i in range(0, len(skill_list), shard_size)]
+
+    as_by_id, ls_by_id = {}, {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # Merged in shard order, so the skills come out in the same order as a serial parse.
+        for shard_as, shard_ls in executor.map(_convert_shard, shards):
+            as_by_id.update(shard_as)
+            ls_by_id.update(shard_ls)
+    return as_by_id, ls_by_id
+
 
 class SkillParser:
     def __init__(self):
@@ -22,9 +45,21 @@ class SkillParser:
     def leader(self, ls_id: int) -> LeaderSkill:
         return self.ls_by_id.get(ls_id, None)
 
-    def parse(self, skill_list: List[MonsterSkill]):
-        self.active_skills = active_skill_info.convert(skill_list)
-        self.leader_skills = leader_skill_info.convert(skill_list)
+    def parse(self, skill_list: List[MonsterSkill], processes: int = 1):
+        """Converts the skills, in that many worker processes if processes > 1.
+
+        Each worker converts a contiguous shard of the list; multi-part skills are linked to their children once the
+        shards are merged, since a child can be in any shard.
+        """
+        if processes > 1 and len(skill_list) >= MIN_SKILLS_PER_PROCESS * 2:
+            as_by_id, ls_by_id = _convert_in_processes(skill_list, processes)
+        else:
+            as_by_id, ls_by_id = _convert_shard(skill_list)
+        active_skill_info.link_multi_part(as_by_id)
+        leader_skill_info.link_multi_part(ls_by_id)
+
+        self.active_skills = list(as_by_id.values())
+        self.leader_skills = list(ls_by_id.values())
         self.as_by_id = {x.skill_id: x for x in self.active_skills}
         self.ls_by_id = {x.skill_id: x for x in self.leader_skills}
 
@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+
+from pad.common import pad_util
+from pad.raw.skill import MonsterSkill
+from pad.raw.skills import skill_parser
+from pad.raw.skills.skill_common import Board
+from pad.raw.skills.skill_parser import SkillParser
+
+AS_MULTI_PART_ID = 1
+LS_MULTI_PART_ID = 2
+BOARD_CHANGE_ID = 3
+
+
+def _raw_skill(skill_type, data, levels=0):
+    return ['skill', 'desc', skill_type, levels, 10 if levels else 0, 0] + data
+
+
+def _skill_list():
+    """40 skills; with 10 per process, the multi-part skills are in the first shard and their children in the second."""
+    raw = [_raw_skill(1, [0, 1000], levels=5) for _ in range(40)]
+    raw[AS_MULTI_PART_ID] = _raw_skill(116, [38, 39], levels=5)
+    raw[LS_MULTI_PART_ID] = _raw_skill(138, [36, 37])
+    # Fills the first column with fire orbs.
+    raw[BOARD_CHANGE_ID] = _raw_skill(127, [1, 1], levels=5)
+    raw[36] = _raw_skill(11, [0, 200])
+    raw[37] = _raw_skill(11, [1, 300])
+    raw[38] = _raw_skill(127, [2, 2], levels=5)
+    raw[39] = _raw_skill(1, [1, 2000], levels=5)
+    return [MonsterSkill(i, r) for i, r in enumerate(raw)]
+
+
+def summarize(parser: SkillParser):
+    """Every field of every skill, including the children of multi-part skills."""
+    def describe(skills):
+        return [(type(s).__name__, pad_util.json_string_dump(s)) for s in skills]
+
+    return describe(parser.active_skills), describe(parser.leader_skills)
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(skill_parser, 'MIN_SKILLS_PER_PROCESS', 10)
+    calls = []
+    convert_in_processes = skill_parser._convert_in_processes
+
+    def counting_convert(skill_list, processes):
+        calls.append(processes)
+        return convert_in_processes(skill_list, processes)
+
+    monkeypatch.setattr(skill_parser, '_convert_in_processes', counting_convert)
+    return calls
+
+
+def test_sharded_parse_matches_serial(sharded):
+    serial = SkillParser().parse(_skill_list())
+    assert sharded == []
+    parallel = SkillParser().parse(_skill_list(), processes=2)
+    assert sharded == [2]
+
+    assert summarize(parallel) == summarize(serial)
+
+    as_multi_part = parallel.active(AS_MULTI_PART_ID)
+    assert [c.skill_id for c in as_multi_part.child_skills] == [38, 39]
+    assert as_multi_part.child_skills[0] is parallel.active(38)
+    ls_multi_part = parallel.leader(LS_MULTI_PART_ID)
+    assert [c.skill_id for c in ls_multi_part.child_skills] == [36, 37]
+    assert ls_multi_part.atk == serial.leader(LS_MULTI_PART_ID).atk == 6
+
+    # Came back from a worker with the board filled in.
+    assert parallel.active(BOARD_CHANGE_ID).board.data == serial.active(BOARD_CHANGE_ID).board.data
+    assert [row[0] for row in parallel.active(BOARD_CHANGE_ID).board.data] == [0] * 6
+    assert not parallel.active(0).board
+
+
+def test_board_round_trip():
+    empty = pickle.loads(pickle.dumps(Board()))
+    assert not empty
+    assert empty.data == Board().data
+
+    data = [[j % 6 for j in range(7)] for _ in range(6)]
+    board = pickle.loads(pickle.dumps(Board(data)))
+    assert board.data == data
+    assert board.__getstate__() == {'data': data}
+    assert Board().__getstate__() == {'data': None}
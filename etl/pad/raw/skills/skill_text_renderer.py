@@ -0,0 +1,129 @@
+"""
+Renders active and leader skill text through one shared set of converters, memoizing the result per skill.
+
+The memo can be saved between runs. An entry is reused only while the skill's raw data (including the skills it is
+built from) and the text code are unchanged, so a run only renders the skills that changed.
+"""
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List, Optional
+
+from pad.common import pad_util
+from pad.raw.skills.en.active_skill_text import EnASTextConverter
+from pad.raw.skills.en.leader_skill_text import EnLSTextConverter
+from pad.raw.skills.ja.active_skill_text import JaASTextConverter
+from pad.raw.skills.ja.leader_skill_text import JaLSTextConverter
+from pad.raw.skills.ko.active_skill_text import KoASTextConverter
+from pad.raw.skills.ko.leader_skill_text import KoLSTextConverter
+from pad.raw.skills.leader_skill_info import LeaderSkill
+
+logger = logging.getLogger('processor')
+
+AS_CONVERTERS = {
+    'ja': JaASTextConverter(),
+    'en': EnASTextConverter(),
+    'ko': KoASTextConverter(),
+}
+
+LS_CONVERTERS = {
+    'ja': JaLSTextConverter(),
+    'en': EnLSTextConverter(),
+    'ko': KoLSTextConverter(),
+}
+
+
+@lru_cache(maxsize=None)
+def converter_version() -> str:
+    """Hash of the skill parsing and text code, plus the awakening data the converters read."""
+    skills_dir = os.path.dirname(os.path.abspath(__file__))
+    awoken_skill_file = os.path.join(skills_dir, '..', '..', 'storage_processor', 'awoken_skill.json')
+    md5 = hashlib.md5(pad_util.tree_hash(skills_dir, ['.py']).encode())
+    md5.update(pad_util.file_hash(awoken_skill_file).encode())
+    return md5.hexdigest()
+
+
+def skill_fingerprint(skill) -> str:
+    """md5 of everything a skill's text is rendered from: its raw data and that of its child skills."""
+    md5 = hashlib.md5()
+    _update_fingerprint(md5, skill)
+    return md5.hexdigest()
+
+
+def _update_fingerprint(md5, skill):
+    md5.update(repr((type(skill).__name__, skill.skill_id, skill.skill_type,
+                     skill.raw_data, skill.raw_description)).encode())
+    for child in getattr(skill, 'child_skills', []):
+        _update_fingerprint(md5, child)
+
+
+class SkillTextRenderer(object):
+    """Memoized full and templated skill text, optionally loaded from and saved to a JSON cache file."""
+
+    def __init__(self):
+        self.cache_file = None  # type: Optional[str]
+        # '<as|ls>/<method>/<language>/<skill id>' -> [fingerprint, text]
+        self.entries = {}  # type: Dict[str, List[Optional[str]]]
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def load(self, cache_file: str):
+        """Uses cache_file for this renderer, keeping its entries if they were rendered by the current code."""
+        self.cache_file = cache_file
+        if not os.path.exists(cache_file):
+            return
+        with open(cache_file, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('version') != converter_version():
+            logger.info('Skill text code changed, discarding %s', cache_file)
+            return
+        with self._lock:
+            self.entries.update(saved.get('texts', {}))
+        logger.info('Loaded %d cached skill texts', len(self.entries))
+
+    def save(self):
+        if self.cache_file is None:
+            return
+        logger.info('Skill text: %d cached, %d rendered', self.hits, self.misses)
+        with self._lock:
+            tmp_path = self.cache_file + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': converter_version(), 'texts': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+
+    def full_text(self, skill, language: str) -> Optional[str]:
+        return self._render(skill, 'full_text', language)
+
+    def templated_text(self, skill, language: str) -> str:
+        """Active skills only; leader skills have no templated text."""
+        return self._render(skill, 'templated_text', language)
+
+    def _render(self, skill, method: str, language: str) -> Optional[str]:
+        if isinstance(skill, LeaderSkill):
+            kind, converter = 'ls', LS_CONVERTERS[language]
+        else:
+            kind, converter = 'as', AS_CONVERTERS[language]
+        key = '{}/{}/{}/{}'.format(kind, method, language, skill.skill_id)
+        fingerprint = skill_fingerprint(skill)
+
+        # Processors render from several threads. The text itself is rendered outside the lock; at worst two threads
+        # render the same skill and store the same text.
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        text = getattr(skill, method)(converter)
+        with self._lock:
+            self.entries[key] = [fingerprint, text]
+        return text
+
+
+# Shared by everything that renders skill text, so that each skill is rendered once per run.
+renderer = SkillTextRenderer()
@@ -0,0 +1,84 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pad.raw.skills.skill_text_renderer import SkillTextRenderer
+
+
+class FakeActiveSkill(object):
+    """Has the attributes the renderer fingerprints, and counts how often its text is rendered."""
+
+    def __init__(self, skill_id, raw_data=(1, 2)):
+        self.skill_id = skill_id
+        self.skill_type = 0
+        self.raw_data = list(raw_data)
+        self.raw_description = 'desc'
+        self.child_skills = []
+        self.renders = 0
+
+    def full_text(self, converter):
+        self.renders += 1
+        return 'skill {} {}'.format(self.skill_id, self.raw_data)
+
+
+@pytest.fixture
+def renderer():
+    return SkillTextRenderer()
+
+
+def test_text_is_rendered_once(renderer):
+    skill = FakeActiveSkill(1)
+    assert renderer.full_text(skill, 'en') == 'skill 1 [1, 2]'
+    assert renderer.full_text(skill, 'en') == 'skill 1 [1, 2]'
+    assert skill.renders == 1
+    assert (renderer.hits, renderer.misses) == (1, 1)
+
+    renderer.full_text(skill, 'ja')
+    assert skill.renders == 2
+
+
+def test_changed_skill_is_rendered_again(renderer):
+    skill = FakeActiveSkill(1)
+    renderer.full_text(skill, 'en')
+    skill.raw_data.append(3)
+    assert renderer.full_text(skill, 'en') == 'skill 1 [1, 2, 3]'
+
+    child = FakeActiveSkill(2)
+    skill.child_skills.append(child)
+    renderer.full_text(skill, 'en')
+    child.raw_data.append(4)
+    renderer.full_text(skill, 'en')
+    assert skill.renders == 4
+
+
+def test_saved_texts_are_reused(renderer, tmp_path):
+    cache_file = str(tmp_path / 'skill_text.json')
+    renderer.load(cache_file)
+    renderer.full_text(FakeActiveSkill(1), 'en')
+    renderer.save()
+
+    loaded = SkillTextRenderer()
+    loaded.load(cache_file)
+    skill = FakeActiveSkill(1)
+    assert loaded.full_text(skill, 'en') == 'skill 1 [1, 2]'
+    assert skill.renders == 0
+
+
+def test_texts_from_other_code_are_discarded(renderer, tmp_path):
+    cache_file = str(tmp_path / 'skill_text.json')
+    with open(cache_file, 'w') as f:
+        json.dump({'version': 'old', 'texts': {'as/full_text/en/1': ['x', 'stale']}}, f)
+    renderer.load(cache_file)
+    assert renderer.entries == {}
+
+
+def test_concurrent_renders(renderer):
+    skills = [FakeActiveSkill(i % 50) for i in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        texts = list(executor.map(lambda s: renderer.full_text(s, 'en'), skills))
+
+    assert texts == ['skill {} [1, 2]'.format(i % 50) for i in range(2000)]
+    assert renderer.hits + renderer.misses == 2000
+    assert renderer.misses == sum(s.renders for s in skills)
+    assert len(renderer.entries) == 50
@@ -0,0 +1,140 @@
+"""
+Lists the cross-server entities that changed since a previous run.
+
+Each card, skill, dungeon and enemy skill is reduced to a digest per field, and the digests are saved between runs.
+Comparing the current digests with the saved ones gives the entities that were added, removed or modified, and for
+the modified ones, which fields changed.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, NamedTuple
+
+from pad.common.shared_types import dump_helper, object_vars
+
+logger = logging.getLogger('processor')
+
+# Bump when the digests would change for the same data, e.g. if the digest encoding changes.
+DIGEST_VERSION = 2
+
+
+class Collection(NamedTuple):
+    # Name in the feed
+    name: str
+    # CrossServerDatabase attribute holding the entities
+    attr: str
+    # Entity attribute that identifies it across runs
+    id_field: str
+    # Fields that hold other entities; only the id of those entities is digested
+    references: Dict[str, str] = {}
+
+
+COLLECTIONS = [
+    # Cards only hold the merged skills once those are built, so they are digested by id; skill changes show up in
+    # the skill collections.
+    Collection('cards', 'all_cards', 'monster_id',
+               {'gem': 'monster_id', 'leader_skill': 'skill_id', 'active_skill': 'skill_id'}),
+    Collection('active_skills', 'active_skills', 'skill_id'),
+    Collection('leader_skills', 'leader_skills', 'skill_id'),
+    Collection('dungeons', 'dungeons', 'dungeon_id'),
+    Collection('enemy_skills', 'enemy_skills', 'enemy_skill_id'),
+]
+
+# {collection name: {entity id: {field: digest}}}
+Digests = Dict[str, Dict[str, Dict[str, str]]]
+
+
+def _stable_helper(x):
+    # dump_helper falls back to repr, which for sets depends on the run's hash seed.
+    if isinstance(x, (set, frozenset)):
+        return sorted(x, key=repr)
+    return dump_helper(x)
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=_stable_helper, ensure_ascii=False)
+    return hashlib.md5(encoded.encode('utf-8')).hexdigest()
+
+
+def entity_digests(entity: Any, references: Dict[str, str]) -> Dict[str, str]:
+    result = {}
+    for field, value in object_vars(entity).items():
+        if field in references and value is not None:
+            value = getattr(value, references[field])
+        result[field] = _digest(value)
+    return result
+
+
+def collection_digests(cs_database, collection: Collection) -> Dict[str, Dict[str, str]]:
+    return {str(getattr(e, collection.id_field)): entity_digests(e, collection.references)
+            for e in getattr(cs_database, collection.attr)}
+
+
+def _sorted_ids(ids) -> List[int]:
+    return sorted(int(i) for i in ids)
+
+
+class ChangeFeed(object):
+    """The changes between the digests saved at path by a previous run and the current cross-server data."""
+
+    def __init__(self, path: str, cs_database):
+        self.path = path
+        self.digests = {c.name: collection_digests(cs_database, c) for c in COLLECTIONS}  # type: Digests
+        self.previous_digests = None  # type: Digests
+
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get('version') == DIGEST_VERSION:
+                self.previous_digests = saved['collections']
+            else:
+                logger.info('Ignoring change digests from an older version: %s', path)
+
+        # Per collection, the added and removed ids and the changed fields of each modified id.
+        self.changes = self._diff()  # type: Dict[str, Dict[str, Any]]
+
+    @property
+    def has_baseline(self) -> bool:
+        """False on the first run, when every entity is reported as added."""
+        return self.previous_digests is not None
+
+    def _diff(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for collection in COLLECTIONS:
+            current = self.digests[collection.name]
+            previous = (self.previous_digests or {}).get(collection.name, {})
+            modified = {}
+            for entity_id in _sorted_ids(current.keys() & previous.keys()):
+                old_fields, new_fields = previous[str(entity_id)], current[str(entity_id)]
+                if old_fields != new_fields:
+                    modified[entity_id] = sorted(f for f in old_fields.keys() | new_fields.keys()
+                                                 if old_fields.get(f) != new_fields.get(f))
+            result[collection.name] = {
+                'added': _sorted_ids(current.keys() - previous.keys()),
+                'removed': _sorted_ids(previous.keys() - current.keys()),
+                'modified': modified,
+            }
+        return result
+
+    def changed_ids(self, collection_name: str) -> List[int]:
+        """Ids of the added or modified entities in a collection, for consumers that only upsert those."""
+        changes = self.changes[collection_name]
+        return sorted(changes['added'] + list(changes['modified']))
+
+    def summary(self) -> str:
+        return ', '.join('{}: +{} -{} ~{}'.format(name, len(c['added']), len(c['removed']), len(c['modified']))
+                         for name, c in self.changes.items())
+
+    def save_feed(self, feed_path: str):
+        tmp_path = feed_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'has_baseline': self.has_baseline, 'changes': self.changes}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, feed_path)
+
+    def save(self):
+        """Saves the current digests as the baseline for the next run."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': DIGEST_VERSION, 'collections': self.digests}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
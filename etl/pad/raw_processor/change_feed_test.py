@@ -0,0 +1,106 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pad.common.shared_types import Server
+from pad.raw_processor.change_feed import ChangeFeed
+
+
+def _card(monster_id, name, gem=None, server=Server.jp):
+    return SimpleNamespace(monster_id=monster_id, name=name, gem=gem, server=server, tags={'a', 'b'})
+
+
+def _database(cards=(), active_skills=(), dungeons=()):
+    return SimpleNamespace(all_cards=list(cards), active_skills=list(active_skills), leader_skills=[],
+                           dungeons=list(dungeons), enemy_skills=[])
+
+
+def _cards():
+    gem = _card(5, 'gem')
+    return [_card(1, 'one', gem), _card(2, 'two'), gem]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cross_server_digests.json')
+
+
+def _no_changes():
+    return {'added': [], 'removed': [], 'modified': {}}
+
+
+def test_first_run_adds_everything(path):
+    feed = ChangeFeed(path, _database(_cards(), [SimpleNamespace(skill_id=10, desc='x')]))
+    assert not feed.has_baseline
+    assert feed.changes['cards'] == {'added': [1, 2, 5], 'removed': [], 'modified': {}}
+    assert feed.changes['active_skills']['added'] == [10]
+    assert feed.changes['dungeons'] == _no_changes()
+
+
+def test_unchanged_data_has_no_changes(path):
+    ChangeFeed(path, _database(_cards())).save()
+    feed = ChangeFeed(path, _database(_cards()))
+    assert feed.has_baseline
+    assert all(c == _no_changes() for c in feed.changes.values())
+    assert feed.summary() == ('cards: +0 -0 ~0, active_skills: +0 -0 ~0, leader_skills: +0 -0 ~0, '
+                              'dungeons: +0 -0 ~0, enemy_skills: +0 -0 ~0')
+
+
+def test_added_removed_and_modified(path):
+    dungeons = [SimpleNamespace(dungeon_id=100, name='d', floors=[1, 2])]
+    ChangeFeed(path, _database(_cards(), dungeons=dungeons)).save()
+
+    cards = _cards()
+    cards[1].name = 'TWO'
+    cards[1].server = Server.na
+    cards.append(_card(3, 'three'))
+    del cards[0]
+    dungeons[0].floors.append(3)
+    feed = ChangeFeed(path, _database(cards, dungeons=dungeons))
+
+    assert feed.changes['cards'] == {'added': [3], 'removed': [1], 'modified': {2: ['name', 'server']}}
+    assert feed.changes['dungeons']['modified'] == {100: ['floors']}
+    assert feed.changed_ids('cards') == [2, 3]
+
+
+def test_references_are_digested_by_id(path):
+    ChangeFeed(path, _database(_cards())).save()
+
+    cards = _cards()
+    cards[2].name = 'renamed gem'
+    feed = ChangeFeed(path, _database(cards))
+    # Only the gem card itself changed, not the card that refers to it.
+    assert feed.changes['cards']['modified'] == {5: ['name']}
+
+    cards[0].gem = _card(6, 'other gem')
+    feed = ChangeFeed(path, _database(cards))
+    assert feed.changes['cards']['modified'] == {1: ['gem'], 5: ['name']}
+
+
+def test_new_field_is_a_modification(path):
+    ChangeFeed(path, _database(_cards())).save()
+    cards = _cards()
+    cards[1].extra = None
+    assert ChangeFeed(path, _database(cards)).changes['cards']['modified'] == {2: ['extra']}
+
+
+def test_other_digest_version_is_ignored(path):
+    with open(path, 'w') as f:
+        json.dump({'version': 0, 'collections': {}}, f)
+    feed = ChangeFeed(path, _database(_cards()))
+    assert not feed.has_baseline
+    assert feed.changes['cards']['added'] == [1, 2, 5]
+
+
+def test_save_feed(path, tmp_path):
+    ChangeFeed(path, _database(_cards())).save()
+    cards = _cards()
+    cards[0].name = 'ONE'
+    feed_path = str(tmp_path / 'change_feed.json')
+    ChangeFeed(path, _database(cards)).save_feed(feed_path)
+
+    with open(feed_path) as f:
+        saved = json.load(f)
+    assert saved['has_baseline']
+    assert saved['changes']['cards'] == {'added': [], 'removed': [], 'modified': {'1': ['name']}}
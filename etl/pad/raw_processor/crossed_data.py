@@ -4,10 +4,13 @@ Data from across multiple servers merged together.
 import logging
 import os
 import re
+import threading
+from collections import defaultdict
 from copy import copy
-from typing import Callable, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 from pad.common import dungeon_types, pad_util
+from pad.common.json_writer import JsonWriter, save_files
 from pad.common.pad_util import is_bad_name
 from pad.common.shared_types import DungeonId, MonsterId, Server
 from pad.raw import Dungeon, EnemySkill
@@ -16,6 +19,7 @@ from pad.raw.skills import skill_text_typing
 from pad.raw.skills.active_skill_info import ActiveSkill
 from pad.raw.skills.enemy_skill_info import ESInstance, ESNone, ESUnknown
 from pad.raw.skills.leader_skill_info import LeaderSkill
+from pad.raw_processor.change_feed import ChangeFeed
 from pad.raw_processor.jp_replacements import jp_en_replacements
 from pad.raw_processor.merged_data import MergedCard
 from pad.raw_processor.merged_database import Database
@@ -60,14 +64,9 @@ class CrossServerCard:
 
 def build_cross_server_cards(jp_database: Database, na_database: Database, kr_database: Database, server: Server) \
         -> List[CrossServerCard]:
-    all_monster_ids = list(sorted({
-        *jp_database.monster_id_to_card.keys(),
-        *na_database.monster_id_to_card.keys(),
-        *kr_database.monster_id_to_card.keys()}))
-
     # This is the list of cards we could potentially update
     combined_cards = []  # type: List[CrossServerCard]
-    for monster_id in all_monster_ids:
+    for monster_id in _all_monster_ids(jp_database, na_database, kr_database):
         jp_card = jp_database.card_by_monster_id(monster_id)
         na_card = na_database.card_by_monster_id(monster_id)
         kr_card = kr_database.card_by_monster_id(monster_id)
@@ -89,18 +88,18 @@ def build_cross_server_cards(jp_database: Database, na_database: Database, kr_da
             jp_gems[card.jp_card.card.name[:-3]] = card
             na_gems[card.na_card.card.name[:-6]] = card
 
+    # A gem is the value of at most one name in each dict, so the reverse maps find the name to drop once the gem
+    # is assigned without scanning the dicts.
+    jp_gem_names = {id(gem): name for name, gem in jp_gems.items()}
+    na_gem_names = {id(gem): name for name, gem in na_gems.items()}
     for card in combined_cards:
         card.gem = jp_gems.get(card.jp_card.card.name) or \
                    na_gems.get(card.na_card.card.name)
         if card.gem:
-            for jc in jp_gems:
-                if jp_gems[jc] == card.gem:
-                    jp_gems.pop(jc)
-                    break
-            for nc in na_gems:
-                if na_gems[nc] == card.gem:
-                    na_gems.pop(nc)
-                    break
+            if id(card.gem) in jp_gem_names:
+                jp_gems.pop(jp_gem_names.pop(id(card.gem)))
+            if id(card.gem) in na_gem_names:
+                na_gems.pop(na_gem_names.pop(id(card.gem)))
 
     jp_gems.update(na_gems)
     aggreg = jp_gems.keys()
@@ -146,12 +145,14 @@ def _coalesce_by_server(jp: T, na: T, kr: T, server: Server,
     return jp, na, kr
 
 
-# Creates a CrossServerCard if appropriate.
-# If the card cannot be created, provides an error message.
-def make_cross_server_card(jp_card: MergedCard,
-                           na_card: MergedCard,
-                           kr_card: MergedCard,
-                           server: Server) -> (CrossServerCard, str):
+def _coalesce_cards(jp_card: MergedCard,
+                    na_card: MergedCard,
+                    kr_card: MergedCard,
+                    server: Server) -> Tuple[MergedCard, MergedCard, MergedCard]:
+    """Fills in the cards' missing data from the other servers.
+
+    Missing skills are set on the given cards themselves, so this also edits the source databases.
+    """
     def override_if_necessary(source_card: MergedCard, dest_card: MergedCard):
         """Return source_card if dest_card is invalid, otherwise return dest_card"""
         if dest_card is None:
@@ -182,7 +183,32 @@ def make_cross_server_card(jp_card: MergedCard,
         return card1, card2, card3
 
     # Override priority: JP > NA, NA -> JP, NA -> KR.
-    jp_card, na_card, kr_card = _coalesce_by_server(jp_card, na_card, kr_card, server, override_in_order)
+    return _coalesce_by_server(jp_card, na_card, kr_card, server, override_in_order)
+
+
+def _all_monster_ids(jp_database: Database, na_database: Database, kr_database: Database) -> List[MonsterId]:
+    return list(sorted({
+        *jp_database.monster_id_to_card.keys(),
+        *na_database.monster_id_to_card.keys(),
+        *kr_database.monster_id_to_card.keys()}))
+
+
+def fill_missing_card_skills(jp_database: Database, na_database: Database, kr_database: Database, server: Server):
+    """Sets the skills that build_cross_server_cards fills in on the source cards, without merging the cards."""
+    for monster_id in _all_monster_ids(jp_database, na_database, kr_database):
+        _coalesce_cards(jp_database.card_by_monster_id(monster_id),
+                        na_database.card_by_monster_id(monster_id),
+                        kr_database.card_by_monster_id(monster_id),
+                        server)
+
+
+# Creates a CrossServerCard if appropriate.
+# If the card cannot be created, provides an error message.
+def make_cross_server_card(jp_card: MergedCard,
+                           na_card: MergedCard,
+                           kr_card: MergedCard,
+                           server: Server) -> (CrossServerCard, str):
+    jp_card, na_card, kr_card = _coalesce_cards(jp_card, na_card, kr_card, server)
 
     if is_bad_name(jp_card.card.name):
         # This is a debug monster, or not yet supported
@@ -295,15 +321,8 @@ class CrossServerDungeon:
         self.kr_dungeon = kr_dungeon
         self.cur_dungeon = (jp_dungeon, na_dungeon, kr_dungeon)[server.value]
 
-        # Replacements for JP dungeon attributes to English
-        self.na_dungeon.clean_name = jp_en_replacements(self.na_dungeon.clean_name)
-
         self.sub_dungeons = make_cross_server_sub_dungeons(jp_dungeon, na_dungeon, kr_dungeon, server)
 
-        # Replacements for JP subdungeon attributes to English
-        for csd in self.sub_dungeons:
-            csd.na_sub_dungeon.clean_name = jp_en_replacements(csd.na_sub_dungeon.clean_name)
-
 
 class CrossServerSubDungeon:
     def __init__(self,
@@ -319,15 +338,18 @@ class CrossServerSubDungeon:
         self.server = server
 
 
+def _all_dungeon_ids(jp_database: Database, na_database: Database, kr_database: Database) -> List[DungeonId]:
+    return list(sorted({dungeon.dungeon_id for dungeon
+                        in jp_database.dungeons + na_database.dungeons + kr_database.dungeons}))
+
+
 def build_cross_server_dungeons(jp_database: Database,
                                 na_database: Database,
                                 kr_database: Database,
                                 server: Server) -> List[CrossServerDungeon]:
-    dungeon_ids = list(sorted({dungeon.dungeon_id for dungeon
-                               in jp_database.dungeons + na_database.dungeons + kr_database.dungeons}))
-
+    """Merges the dungeons; translate_na_dungeon_names should have been applied to the databases first."""
     combined_dungeons = []  # type: List[CrossServerDungeon]
-    for dungeon_id in dungeon_ids:
+    for dungeon_id in _all_dungeon_ids(jp_database, na_database, kr_database):
         jp_dungeon = jp_database.dungeon_by_id(dungeon_id)
         na_dungeon = na_database.dungeon_by_id(dungeon_id)
         kr_dungeon = kr_database.dungeon_by_id(dungeon_id)
@@ -347,19 +369,57 @@ def make_cross_server_dungeon(jp_dungeon: Dungeon,
                               server: Server) -> (CrossServerDungeon, str):
     jp_dungeon, na_dungeon, kr_dungeon = _coalesce_by_server(jp_dungeon, na_dungeon, kr_dungeon, server)
 
+    err_msg = _dungeon_skip_reason(jp_dungeon)
+    if err_msg:
+        return None, err_msg
+
+    return CrossServerDungeon(jp_dungeon, na_dungeon, kr_dungeon, server), None
+
+
+def _dungeon_skip_reason(jp_dungeon: Dungeon) -> Optional[str]:
     if is_bad_name(jp_dungeon.clean_name):
-        return None, 'Skipping debug dungeon: {}'.format(repr(jp_dungeon))
+        return 'Skipping debug dungeon: {}'.format(repr(jp_dungeon))
 
     if jp_dungeon.full_dungeon_type == dungeon_types.RawDungeonType.DEPRECATED:
-        return None, 'Skipping deprecated dungeon'
+        return 'Skipping deprecated dungeon'
 
-    return CrossServerDungeon(jp_dungeon, na_dungeon, kr_dungeon, server), None
+    return None
+
+
+def translate_na_dungeon_names(jp_database: Database, na_database: Database, kr_database: Database, server: Server):
+    """Replaces JP text in the NA names of the dungeons and sub dungeons that build_cross_server_dungeons merges.
+
+    The names are changed in place, possibly on the JP dungeons where those stand in for missing NA ones, so this must
+    run only once per set of databases.
+    """
+    for dungeon_id in _all_dungeon_ids(jp_database, na_database, kr_database):
+        jp_dungeon, na_dungeon, kr_dungeon = _coalesce_by_server(jp_database.dungeon_by_id(dungeon_id),
+                                                                 na_database.dungeon_by_id(dungeon_id),
+                                                                 kr_database.dungeon_by_id(dungeon_id),
+                                                                 server)
+        if _dungeon_skip_reason(jp_dungeon):
+            continue
+
+        # Replacements for JP dungeon attributes to English
+        na_dungeon.clean_name = jp_en_replacements(na_dungeon.clean_name)
+
+        # Replacements for JP subdungeon attributes to English
+        for _, na_sub_dungeon, _ in _coalesce_sub_dungeons(jp_dungeon, na_dungeon, kr_dungeon, server):
+            na_sub_dungeon.clean_name = jp_en_replacements(na_sub_dungeon.clean_name)
 
 
 def make_cross_server_sub_dungeons(jp_dungeon: Dungeon,
                                    na_dungeon: Dungeon,
                                    kr_dungeon: Dungeon,
                                    server: Server) -> List[CrossServerSubDungeon]:
+    return [CrossServerSubDungeon(jp_sd, na_sd, kr_sd, server)
+            for jp_sd, na_sd, kr_sd in _coalesce_sub_dungeons(jp_dungeon, na_dungeon, kr_dungeon, server)]
+
+
+def _coalesce_sub_dungeons(jp_dungeon: Dungeon,
+                           na_dungeon: Dungeon,
+                           kr_dungeon: Dungeon,
+                           server: Server) -> List[Tuple[SubDungeon, SubDungeon, SubDungeon]]:
     jp_sd_map = {sd.sub_dungeon_id: sd for sd in jp_dungeon.sub_dungeons}
     na_sd_map = {sd.sub_dungeon_id: sd for sd in na_dungeon.sub_dungeons}
     kr_sd_map = {sd.sub_dungeon_id: sd for sd in kr_dungeon.sub_dungeons}
@@ -378,9 +438,7 @@ def make_cross_server_sub_dungeons(jp_dungeon: Dungeon,
         na_sd = na_sd_map.get(key)
         kr_sd = kr_sd_map.get(key)
 
-        jp_sd, na_sd, kr_sd = _coalesce_by_server(jp_sd, na_sd, kr_sd, server)
-
-        results.append(CrossServerSubDungeon(jp_sd, na_sd, kr_sd, server))
+        results.append(_coalesce_by_server(jp_sd, na_sd, kr_sd, server))
 
     return results
 
@@ -472,36 +530,41 @@ def build_cross_server_enemy_skills(jp_skills: List[EnemySkill],
     return results
 
 
+class _lazy:
+    """A CrossServerDatabase attribute computed on first access and then stored on the instance.
+
+    Processors share the database across threads, so the first access builds under the instance's lock and any
+    concurrent access waits for that build instead of repeating it.
+    """
+
+    def __init__(self, build: Callable[['CrossServerDatabase'], Any]):
+        self.build = build
+        self.__doc__ = build.__doc__
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, obj: 'CrossServerDatabase', objtype=None):
+        if obj is None:
+            return self
+        with obj._build_lock:
+            if self.name not in obj.__dict__:
+                obj.__dict__[self.name] = self.build(obj)
+        return obj.__dict__[self.name]
+
+
 class CrossServerDatabase:
-    def __init__(self, jp_database: Database, na_database: Database, kr_database: Database, server=Server.jp):
-        self.all_cards = build_cross_server_cards(jp_database, na_database, kr_database, server)
-        self.ownable_cards = [c for c in self.all_cards
-                              if 0 < c.monster_id < 19999
-                              and not is_bad_name(c.jp_card.card.name)]
-
-        self.leader_skills = build_cross_server_skills(jp_database.leader_skills,
-                                                       na_database.leader_skills,
-                                                       kr_database.leader_skills,
-                                                       server)
-
-        self.active_skills = build_cross_server_skills(jp_database.active_skills,
-                                                       na_database.active_skills,
-                                                       kr_database.active_skills,
-                                                       server)
-
-        for ask in self.active_skills:
-            ask.skill_type_tags = list(skill_text_typing.parse_as_conditions(ask))
-            ask.skill_type_tags.sort(key=lambda x: x.value)
+    """The jp/na/kr databases merged for one server.
 
-        self.dungeons = build_cross_server_dungeons(jp_database,
-                                                    na_database,
-                                                    kr_database,
-                                                    server)  # type: List[CrossServerDungeon]
+    The merged cards, skills, dungeons and enemy skills are each built on first access, so a run only pays for the
+    collections its processors use.
+    """
 
-        self.enemy_skills = build_cross_server_enemy_skills(jp_database.raw_enemy_skills,
-                                                            na_database.raw_enemy_skills,
-                                                            kr_database.raw_enemy_skills,
-                                                            server)
+    def __init__(self, jp_database: Database, na_database: Database, kr_database: Database, server=Server.jp):
+        self._build_lock = threading.RLock()
+        self._jp_database = jp_database
+        self._na_database = na_database
+        self._kr_database = kr_database
 
         self.jp_bonuses = jp_database.bonuses
         self.na_bonuses = na_database.bonuses
@@ -519,28 +582,185 @@ class CrossServerDatabase:
         self.na_purchase = na_database.purchase
         self.kr_purchase = kr_database.purchase
 
-        self.monster_id_to_card = {c.monster_id: c for c in self.all_cards}
-        self.leader_id_to_leader = {s.skill_id: s for s in self.leader_skills}
-        self.active_id_to_active = {s.skill_id: s for s in self.active_skills}
-        self.dungeon_id_to_dungeon = {d.dungeon_id: d for d in self.dungeons}
-
         self.hq_image_monster_ids = []  # type: List[MonsterId]
         self.animated_monster_ids = []  # type: List[MonsterId]
 
-        for csc in self.ownable_cards:
-            if csc.leader_skill:
-                csc.leader_skill = self.leader_id_to_leader[csc.leader_skill.skill_id]
-            if csc.active_skill:
-                csc.active_skill = self.active_id_to_active[csc.active_skill.skill_id]
-
         self.server = server
 
+    @_lazy
+    def all_cards(self) -> List[CrossServerCard]:
+        """The merged cards.
+
+        Ownable cards are linked to the merged leader and active skills once both the cards and the skills are built;
+        until then they hold skills merged from their own server cards. Building the cards doesn't build the skills.
+        """
+        all_cards = build_cross_server_cards(self._jp_database, self._na_database, self._kr_database, self.server)
+        if 'leader_skills' in self.__dict__:
+            self._link_skills(all_cards, 'leader_skill', self.leader_id_to_leader)
+        if 'active_skills' in self.__dict__:
+            self._link_skills(all_cards, 'active_skill', self.active_id_to_active)
+        self._apply_image_info(all_cards)
+        return all_cards
+
+    def _link_skills(self, cards: List[CrossServerCard], attr: str, skill_by_id: Dict[int, CrossServerSkill]):
+        for csc in cards:
+            skill = getattr(csc, attr)
+            if skill and self._is_ownable(csc):
+                setattr(csc, attr, skill_by_id[skill.skill_id])
+
+    @staticmethod
+    def _is_ownable(csc: CrossServerCard) -> bool:
+        return 0 < csc.monster_id < 19999 and not is_bad_name(csc.jp_card.card.name)
+
+    @_lazy
+    def ownable_cards(self) -> List[CrossServerCard]:
+        return [c for c in self.all_cards if self._is_ownable(c)]
+
+    @_lazy
+    def leader_skills(self) -> List[CrossServerSkill]:
+        leader_skills = build_cross_server_skills(self._jp_database.leader_skills,
+                                                  self._na_database.leader_skills,
+                                                  self._kr_database.leader_skills,
+                                                  self.server)
+        if 'all_cards' in self.__dict__:
+            self._link_skills(self.all_cards, 'leader_skill', {s.skill_id: s for s in leader_skills})
+        return leader_skills
+
+    @_lazy
+    def active_skills(self) -> List[CrossServerSkill]:
+        active_skills = build_cross_server_skills(self._jp_database.active_skills,
+                                                  self._na_database.active_skills,
+                                                  self._kr_database.active_skills,
+                                                  self.server)
+
+        for ask in active_skills:
+            ask.skill_type_tags = list(skill_text_typing.parse_as_conditions(ask))
+            ask.skill_type_tags.sort(key=lambda x: x.value)
+        if 'all_cards' in self.__dict__:
+            self._link_skills(self.all_cards, 'active_skill', {s.skill_id: s for s in active_skills})
+        return active_skills
+
+    @_lazy
+    def dungeons(self) -> List[CrossServerDungeon]:
+        self._na_dungeon_names_translated
+        return build_cross_server_dungeons(self._jp_database,
+                                           self._na_database,
+                                           self._kr_database,
+                                           self.server)
+
+    @_lazy
+    def enemy_skills(self) -> List[CrossServerEnemySkill]:
+        return build_cross_server_enemy_skills(self._jp_database.raw_enemy_skills,
+                                               self._na_database.raw_enemy_skills,
+                                               self._kr_database.raw_enemy_skills,
+                                               self.server)
+
+    @_lazy
+    def monster_id_to_card(self) -> Dict[MonsterId, CrossServerCard]:
+        return {c.monster_id: c for c in self.all_cards}
+
+    @_lazy
+    def leader_id_to_leader(self) -> Dict[int, CrossServerSkill]:
+        return {s.skill_id: s for s in self.leader_skills}
+
+    @_lazy
+    def active_id_to_active(self) -> Dict[int, CrossServerSkill]:
+        return {s.skill_id: s for s in self.active_skills}
+
+    @_lazy
+    def dungeon_id_to_dungeon(self) -> Dict[DungeonId, CrossServerDungeon]:
+        return {d.dungeon_id: d for d in self.dungeons}
+
+    @_lazy
+    def _na_dungeon_names_translated(self) -> bool:
+        translate_na_dungeon_names(self._jp_database, self._na_database, self._kr_database, self.server)
+        return True
+
+    def apply_source_fixups(self):
+        """Makes the edits to the source databases that merging the cards and dungeons depends on.
+
+        Missing skills are filled in on the source cards and the NA dungeon names are translated, without building
+        any of the merged collections. Call this before saving the source databases so their files don't depend on
+        what was accessed.
+        """
+        fill_missing_card_skills(self._jp_database, self._na_database, self._kr_database, self.server)
+        self._na_dungeon_names_translated
+
     def card_by_monster_id(self, monster_id: MonsterId) -> CrossServerCard:
         return self.monster_id_to_card.get(monster_id, None)
 
     def dungeon_by_id(self, dungeon_id: DungeonId) -> CrossServerDungeon:
         return self.dungeon_id_to_dungeon.get(dungeon_id, None)
 
+    # Secondary indexes. The collections they cover must not change after they are built.
+
+    @_lazy
+    def ownable_monster_id_to_card(self) -> Dict[MonsterId, CrossServerCard]:
+        return {c.monster_id: c for c in self.ownable_cards}
+
+    def ownable_card_by_monster_id(self, monster_id: MonsterId) -> Optional[CrossServerCard]:
+        return self.ownable_monster_id_to_card.get(monster_id, None)
+
+    @_lazy
+    def ownable_name_to_card(self) -> Dict[str, CrossServerCard]:
+        """Ownable cards by lowercased jp, na and kr name; where names collide, kr wins over na over jp."""
+        name_to_card = {}
+        for server_card in ('jp_card', 'na_card', 'kr_card'):
+            name_to_card.update({getattr(c, server_card).card.name: c for c in self.ownable_cards})
+        return {name.lower(): c for name, c in name_to_card.items()}
+
+    def ownable_card_by_name(self, name: str) -> Optional[CrossServerCard]:
+        return self.ownable_name_to_card.get(name.lower(), None)
+
+    @_lazy
+    def evolution_tree_to_cards(self) -> Dict[MonsterId, List[CrossServerCard]]:
+        """Ownable cards by the monster id of their evolution tree's base card."""
+        tree_to_cards = defaultdict(list)
+        for c in self.ownable_cards:
+            base_id = c.cur_card.card.base_id
+            tree_to_cards[c.cur_card.no_to_id(base_id) if base_id else c.monster_id].append(c)
+        return dict(tree_to_cards)
+
+    def evolution_tree(self, monster_id: MonsterId) -> List[CrossServerCard]:
+        """The ownable cards in the same evolution tree as monster_id, including it."""
+        csc = self.ownable_card_by_monster_id(monster_id)
+        if csc is None:
+            return []
+        base_id = csc.cur_card.card.base_id
+        return self.evolution_tree_to_cards[csc.cur_card.no_to_id(base_id) if base_id else csc.monster_id]
+
+    @_lazy
+    def active_skill_id_to_cards(self) -> Dict[int, List[CrossServerCard]]:
+        skill_to_cards = defaultdict(list)
+        for c in self.ownable_cards:
+            if c.active_skill:
+                skill_to_cards[c.active_skill.skill_id].append(c)
+        return dict(skill_to_cards)
+
+    def cards_by_active_skill_id(self, skill_id: int) -> List[CrossServerCard]:
+        return self.active_skill_id_to_cards.get(skill_id, [])
+
+    @_lazy
+    def leader_skill_id_to_cards(self) -> Dict[int, List[CrossServerCard]]:
+        skill_to_cards = defaultdict(list)
+        for c in self.ownable_cards:
+            if c.leader_skill:
+                skill_to_cards[c.leader_skill.skill_id].append(c)
+        return dict(skill_to_cards)
+
+    def cards_by_leader_skill_id(self, skill_id: int) -> List[CrossServerCard]:
+        return self.leader_skill_id_to_cards.get(skill_id, [])
+
+    @_lazy
+    def dungeon_type_to_dungeons(self) -> Dict[dungeon_types.RawDungeonType, List[CrossServerDungeon]]:
+        type_to_dungeons = defaultdict(list)
+        for d in self.dungeons:
+            type_to_dungeons[d.cur_dungeon.full_dungeon_type].append(d)
+        return dict(type_to_dungeons)
+
+    def dungeons_by_type(self, dungeon_type: dungeon_types.RawDungeonType) -> List[CrossServerDungeon]:
+        return self.dungeon_type_to_dungeons.get(dungeon_type, [])
+
     def load_extra_image_info(self, media_dir: str):
         for f in os.listdir(os.path.join(media_dir, 'jp', 'hq_portraits')):
             if (m := re.match(r'(\d+)\.png', f)):
@@ -550,23 +770,41 @@ class CrossServerDatabase:
             if (m := re.match(r'(\d+)\.tomb', f)):
                 self.animated_monster_ids.append(MonsterId(int(m.group(1))))
 
-        for csc in self.ownable_cards:
-            if csc.monster_id in self.hq_image_monster_ids:
+        # Cards built later get the flags as they are built.
+        with self._build_lock:
+            if 'all_cards' in self.__dict__:
+                self._apply_image_info(self.all_cards)
+
+    def _apply_image_info(self, cards: List[CrossServerCard]):
+        hq_image_monster_ids = set(self.hq_image_monster_ids)
+        animated_monster_ids = set(self.animated_monster_ids)
+        for csc in cards:
+            if not self._is_ownable(csc):
+                continue
+            if csc.monster_id in hq_image_monster_ids:
                 csc.has_hqimage = True
-            if csc.monster_id in self.animated_monster_ids:
+            if csc.monster_id in animated_monster_ids:
                 csc.has_animation = True
 
+    def change_feed(self, digest_path: str) -> ChangeFeed:
+        """The changes since the digests saved at digest_path; builds every collection the feed covers."""
+        return ChangeFeed(digest_path, self)
+
     def save(self, output_dir: str, file_name: str, obj: object, pretty: bool):
-        output_file = os.path.join(output_dir, '{}.json'.format(file_name))
-        with open(output_file, 'w', encoding='utf-8') as f:
-            pad_util.json_file_dump(obj, f, pretty)
-
-    def save_all(self, output_dir: str, pretty: bool):
-        self.save(output_dir, 'all_cards', self.all_cards, pretty)
-        self.save(output_dir, 'dungeons', self.dungeons, pretty)
-        self.save(output_dir, 'active_skills', self.active_skills, pretty)
-        self.save(output_dir, 'leader_skills', self.leader_skills, pretty)
-        self.save(output_dir, 'enemy_skills', self.enemy_skills, pretty)
-        self.save(output_dir, 'jp_bonuses', self.jp_bonuses, pretty)
-        self.save(output_dir, 'na_bonuses', self.na_bonuses, pretty)
-        self.save(output_dir, 'kr_bonuses', self.kr_bonuses, pretty)
+        JsonWriter(pretty).save(os.path.join(output_dir, '{}.json'.format(file_name)), obj)
+
+    def intermediate_files(self, output_dir: str) -> List[Tuple[str, object]]:
+        """The (path, data) of each file written by save_all."""
+        return [(os.path.join(output_dir, '{}.json'.format(file_name)), obj) for file_name, obj in [
+            ('all_cards', self.all_cards),
+            ('dungeons', self.dungeons),
+            ('active_skills', self.active_skills),
+            ('leader_skills', self.leader_skills),
+            ('enemy_skills', self.enemy_skills),
+            ('jp_bonuses', self.jp_bonuses),
+            ('na_bonuses', self.na_bonuses),
+            ('kr_bonuses', self.kr_bonuses),
+        ]]
+
+    def save_all(self, output_dir: str, pretty: bool, writer: JsonWriter = None, processes: int = 1):
+        save_files(writer or JsonWriter(pretty), self.intermediate_files(output_dir), processes)
@@ -0,0 +1,159 @@
+import logging
+from types import SimpleNamespace
+
+from pad.common.dungeon_types import RawDungeonType
+from pad.common.shared_types import Server
+from pad.raw_processor.crossed_data import CrossServerDatabase, build_cross_server_cards
+from pad.raw_processor.merged_data import MergedCard
+from pad.raw_processor.merged_database import Database
+
+
+def _card(monster_id, name, base_id=0, ancestor_id=0, ownable=True):
+    return SimpleNamespace(gungho_id=monster_id, name=name, base_id=base_id, ancestor_id=ancestor_id,
+                           ownable=ownable)
+
+
+def _skill(skill_id, name='skill'):
+    return SimpleNamespace(skill_id=skill_id, name=name)
+
+
+def _dungeon(dungeon_id, dungeon_type=RawDungeonType.NORMAL, name='dungeon'):
+    return SimpleNamespace(dungeon_id=dungeon_id, name=name, clean_name=name, full_dungeon_type=dungeon_type,
+                           sub_dungeons=[])
+
+
+def _database(server, cards=(), leader_skills=(), active_skills=(), dungeons=()):
+    """A database holding (card, leader skill, active skill) triples, without reading any raw data."""
+    database = Database(server, 'raw')
+    database.cards = [MergedCard(server, card, active_skill, leader_skill, [])
+                      for card, leader_skill, active_skill in cards]
+    database.leader_skills = list(leader_skills)
+    database.active_skills = list(active_skills)
+    database.dungeons = list(dungeons)
+    database._build_lookups()
+    return database
+
+
+def _cross_server_database(jp_database, na_database=None, kr_database=None):
+    return CrossServerDatabase(jp_database,
+                               na_database or _database(Server.na),
+                               kr_database or _database(Server.kr))
+
+
+def test_indexes():
+    ls, as1, as2 = _skill(1), _skill(10), _skill(11)
+    cards = [
+        (_card(1, 'Tyrra'), ls, as1),
+        (_card(2, 'Tyrannos', base_id=1, ancestor_id=1), ls, as2),
+        (_card(3, 'Brachys'), None, as2),
+        (_card(30000, 'Alt'), ls, as1),
+    ]
+    dungeons = [_dungeon(1), _dungeon(2, RawDungeonType.TECHNICAL), _dungeon(3)]
+    data = _cross_server_database(_database(Server.jp, cards, [ls], [as1, as2], dungeons))
+
+    assert data.ownable_card_by_monster_id(2).jp_card.card.name == 'Tyrannos'
+    assert data.ownable_card_by_monster_id(29900) is None
+    assert data.ownable_card_by_name('tyrra').monster_id == 1
+    assert [c.monster_id for c in data.evolution_tree(2)] == [1, 2]
+    assert [c.monster_id for c in data.evolution_tree(3)] == [3]
+    assert data.evolution_tree(29900) == []
+    assert [c.monster_id for c in data.cards_by_leader_skill_id(1)] == [1, 2]
+    assert [c.monster_id for c in data.cards_by_active_skill_id(11)] == [2, 3]
+    assert data.cards_by_active_skill_id(12) == []
+    assert [d.dungeon_id for d in data.dungeons_by_type(RawDungeonType.NORMAL)] == [1, 3]
+    assert data.dungeons_by_type(RawDungeonType.RANKING) == []
+
+
+def _skill_databases():
+    jp_ls, as1 = _skill(1), _skill(10)
+    jp_cards = [(_card(1, 'Tyrra'), jp_ls, as1), (_card(30000, 'Alt'), jp_ls, as1)]
+    # The NA card predates its leader skill, so merging fills it in from JP.
+    na_database = _database(Server.na, [(_card(1, 'Tyrra'), None, as1)], [], [as1])
+    return _database(Server.jp, jp_cards, [jp_ls], [as1]), na_database
+
+
+def test_cards_are_built_without_the_skills():
+    data = _cross_server_database(*_skill_databases())
+    tyrra = data.ownable_card_by_monster_id(1)
+    assert tyrra.leader_skill.skill_id == 1
+    assert 'leader_skills' not in vars(data) and 'active_skills' not in vars(data)
+
+
+def test_cards_share_the_merged_skills_in_either_build_order():
+    cards_first = _cross_server_database(*_skill_databases())
+    cards_first.all_cards
+    cards_first.leader_skills
+    cards_first.active_skills
+
+    skills_first = _cross_server_database(*_skill_databases())
+    skills_first.leader_skills
+    skills_first.active_skills
+
+    for data in [cards_first, skills_first]:
+        tyrra, alt = data.all_cards
+        assert tyrra.leader_skill is data.leader_id_to_leader[1]
+        assert tyrra.active_skill is data.active_id_to_active[10]
+        # Only ownable cards are linked.
+        assert alt.leader_skill is not data.leader_id_to_leader[1]
+
+
+def test_source_fixups_do_not_build_the_collections(monkeypatch):
+    monkeypatch.setattr('pad.raw_processor.crossed_data.jp_en_replacements', lambda name: name + '!')
+    jp_database, na_database = _skill_databases()
+    jp_dungeon = _dungeon(1, name='ノーコン')
+    jp_dungeon.sub_dungeons = [SimpleNamespace(sub_dungeon_id=1001, name='b1', clean_name='b1')]
+    jp_database.dungeons = [jp_dungeon]
+    jp_database._build_lookups()
+    data = _cross_server_database(jp_database, na_database)
+    assert na_database.card_by_monster_id(1).leader_skill is None
+
+    data.apply_source_fixups()
+    assert not {'all_cards', 'leader_skills', 'active_skills', 'dungeons'} & vars(data).keys()
+    assert na_database.card_by_monster_id(1).leader_skill.skill_id == 1
+    # Without an NA dungeon, the JP one stands in for it and gets the NA name.
+    assert jp_dungeon.clean_name == 'ノーコン!'
+    assert jp_dungeon.sub_dungeons[0].clean_name == 'b1!'
+
+    data.apply_source_fixups()
+    [dungeon] = data.dungeons
+    assert dungeon.na_dungeon.clean_name == 'ノーコン!'
+    assert dungeon.sub_dungeons[0].na_sub_dungeon.clean_name == 'b1!'
+
+
+def test_image_info_is_applied_to_cards_built_later(tmp_path):
+    (tmp_path / 'jp' / 'hq_portraits').mkdir(parents=True)
+    (tmp_path / 'jp' / 'hq_portraits' / '1.png').touch()
+    (tmp_path / 'animated_tombstones').mkdir()
+    data = _cross_server_database(*_skill_databases())
+
+    data.load_extra_image_info(str(tmp_path))
+    assert 'all_cards' not in vars(data)
+    assert data.ownable_card_by_monster_id(1).has_hqimage
+    assert not data.ownable_card_by_monster_id(1).has_animation
+
+
+def test_gems_are_assigned_by_jp_or_na_name(caplog):
+    # Gems are only looked for past the first 4468 cards.
+    filler = [(i, 'card {}'.format(i), 'card {}'.format(i)) for i in range(100, 4600)]
+    names = [
+        (1, 'Tyrra', 'Tyrra'),
+        (2, 'ブラキス・ドラゴン', 'Brachys'),
+        # The jp names of the gems, minus 'の希石', and the na names, minus "'s Gem", are their keys. 'ブラキス' is
+        # the na key of the Tyrra gem and the jp key of the Brachys gem.
+        (5001, 'Tyrraの希石', "ブラキス's Gem"),
+        (5002, 'ブラキスの希石', "Brachys's Gem"),
+        (5003, 'ナイトの希石', "Knight's Gem"),
+    ]
+    jp_database = _database(Server.jp, [(_card(i, jp_name), None, None) for i, jp_name, _ in filler + names])
+    na_database = _database(Server.na, [(_card(i, na_name), None, None) for i, _, na_name in filler + names])
+
+    with caplog.at_level(logging.WARNING, logger='human_fix'):
+        cards = {c.monster_id: c for c in build_cross_server_cards(jp_database, na_database, _database(Server.kr),
+                                                                   Server.jp)}
+
+    # Matched by jp name.
+    assert cards[1].gem is cards[5001]
+    # Matched only by na name; the jp name has no gem.
+    assert cards[2].gem is cards[5002]
+    assert [c.monster_id for c in cards.values() if c.gem] == [1, 2]
+    assert [r.getMessage() for r in caplog.records if r.name == 'human_fix'] == ['Unassigned Gem(s): ナイト, Knight']
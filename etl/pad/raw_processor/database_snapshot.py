@@ -0,0 +1,87 @@
+"""
+On-disk snapshots of fully parsed Database state.
+
+A snapshot is keyed by the content of every raw file Database.load_database reads, the load options, and the
+source of the parsing code, so any change to the inputs or to the parsers invalidates it automatically.
+"""
+import hashlib
+import logging
+import os
+import pickle
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from pad.common import pad_util
+from pad.common.shared_types import Server
+from pad.raw import bonus, card, dungeon, skill, exchange, purchase, enemy_skill, extra_egg_machine
+
+logger = logging.getLogger('processor')
+
+# Bump to invalidate every existing snapshot, e.g. if the snapshot layout itself changes.
+SNAPSHOT_VERSION = 1
+
+INPUT_FILES = (
+    card.FILE_NAME,
+    dungeon.FILE_NAME,
+    bonus.FILE_NAME,
+    skill.FILE_NAME,
+    enemy_skill.FILE_NAME,
+    exchange.FILE_NAME,
+    purchase.FILE_NAME,
+    extra_egg_machine.FILE_NAME,
+)
+
+# Packages whose code determines the parsed result.
+_PARSER_PACKAGES = ('common', 'raw', 'raw_processor')
+
+
+@lru_cache(maxsize=None)
+def parser_version() -> str:
+    """Hash of the parsing code, so that editing any parser invalidates the snapshots it produced."""
+    pad_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    md5 = hashlib.md5(str(SNAPSHOT_VERSION).encode())
+    for package in _PARSER_PACKAGES:
+        md5.update(pad_util.tree_hash(os.path.join(pad_dir, package), ['.py']).encode())
+    return md5.hexdigest()
+
+
+def snapshot_key(server: Server, base_dir: str, load_args: Dict[str, Any]) -> str:
+    md5 = hashlib.md5(parser_version().encode())
+    md5.update(server.name.encode())
+    md5.update(repr(sorted(load_args.items())).encode())
+    for file_name in INPUT_FILES:
+        md5.update('{}={}'.format(file_name, pad_util.file_hash(os.path.join(base_dir, file_name))).encode())
+    return md5.hexdigest()
+
+
+def _snapshot_path(snapshot_dir: str, server: Server, key: str) -> str:
+    return os.path.join(snapshot_dir, '{}_database_{}.pickle'.format(server.name, key))
+
+
+def load_snapshot(snapshot_dir: str, server: Server, key: str) -> Optional[Dict[str, Any]]:
+    """The saved Database state for key, or None if there is no usable snapshot."""
+    path = _snapshot_path(snapshot_dir, server, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as ex:
+        logger.warning('Ignoring unreadable database snapshot %s: %s', path, ex)
+        return None
+
+
+def save_snapshot(snapshot_dir: str, server: Server, key: str, state: Dict[str, Any]):
+    """Writes the snapshot for key and removes the server's older snapshots."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = _snapshot_path(snapshot_dir, server, key)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    prefix = '{}_database_'.format(server.name)
+    for file_name in os.listdir(snapshot_dir):
+        old_path = os.path.join(snapshot_dir, file_name)
+        if file_name.startswith(prefix) and file_name.endswith('.pickle') and old_path != path:
+            os.remove(old_path)
@@ -46,6 +46,9 @@ class MergedEnemy(pad_util.Printable):
 
 
 class MergedCard(pad_util.Printable):
+    __slots__ = ('server', 'gungho_id', 'monster_id', 'card', 'active_skill_id', 'active_skill', 'leader_skill_id',
+                 'leader_skill', 'enemy_skills')
+
     def __init__(self,
                  server: Server,
                  card: Card,
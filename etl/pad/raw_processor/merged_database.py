@@ -1,8 +1,10 @@
 import logging
 import os
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Dict, Optional, Tuple
 
-from pad.common import pad_util
+from pad.common.json_writer import JsonWriter, save_files
+from pad.common.stage_profiler import StageProfiler
 from pad.common.monster_id_mapping import server_monster_id_fn
 from pad.common.shared_types import Server, MonsterId, MonsterNo, DungeonId, SkillId
 from pad.raw import Bonus, Card, Dungeon, MonsterSkill, EnemySkill, Exchange, Purchase
@@ -12,8 +14,11 @@ from pad.raw.skills.active_skill_info import ActiveSkill
 from pad.raw.skills.enemy_skill_info import ESInstance, ESBehavior
 from pad.raw.skills.leader_skill_info import LeaderSkill
 from pad.raw.skills.skill_parser import SkillParser
+from . import database_snapshot
 from .merged_data import MergedBonus, MergedCard, MergedEnemy
 
+logger = logging.getLogger('processor')
+
 human_fix_logger = logging.getLogger('human_fix')
 fail_logger = logging.getLogger('processor_failures')
 
@@ -114,7 +119,31 @@ class Database(object):
         self.monster_id_to_card = {}  # type: Dict[MonsterId, MergedCard]
         self.enemy_id_to_enemy = {}
 
-    def load_database(self, skip_skills=False, skip_bonus=False, skip_extra=False):
+    def load_database(self, skip_skills=False, skip_bonus=False, skip_extra=False, snapshot_dir: str = None,
+                      skill_processes: int = 1):
+        """Parses the raw data for this server, converting the skills in skill_processes worker processes.
+
+        If snapshot_dir is set, the parsed result is restored from a snapshot there when neither the raw files nor
+        the parser code changed since it was saved; otherwise it is parsed and a new snapshot saved. Warnings
+        logged while parsing are not repeated when a snapshot is used.
+        """
+        if snapshot_dir is None:
+            self._parse(skip_skills, skip_bonus, skip_extra, skill_processes)
+            return
+
+        load_args = {'skip_skills': skip_skills, 'skip_bonus': skip_bonus, 'skip_extra': skip_extra}
+        key = database_snapshot.snapshot_key(self.server, self.base_dir, load_args)
+        state = database_snapshot.load_snapshot(snapshot_dir, self.server, key)
+        if state is not None:
+            logger.info('Restored %s database from snapshot %s', self.server.name, key)
+            state.update(server=self.server, base_dir=self.base_dir)
+            self.__setstate__(state)
+            return
+
+        self._parse(skip_skills, skip_bonus, skip_extra, skill_processes)
+        database_snapshot.save_snapshot(snapshot_dir, self.server, key, self.__getstate__())
+
+    def _parse(self, skip_skills: bool, skip_bonus: bool, skip_extra: bool, skill_processes: int):
         base_dir = self.base_dir
         raw_cards = card.load_card_data(data_dir=base_dir)
         self.dungeons = dungeon.load_dungeon_data(data_dir=base_dir)
@@ -125,7 +154,7 @@ class Database(object):
         if not skip_skills:
             self.skills = skill.load_skill_data(data_dir=base_dir)
             parser = SkillParser()
-            parser.parse(self.skills)
+            parser.parse(self.skills, skill_processes)
             self.leader_skills = parser.leader_skills
             self.active_skills = parser.active_skills
             self.skill_id_to_leader_skill = {s.skill_id: s for s in self.leader_skills}
@@ -145,7 +174,12 @@ class Database(object):
         self.bonuses = _clean_bonuses(self.server, self.raw_bonuses, self.dungeons)
         self.enemies = _clean_enemy(raw_cards, self.enemy_skills)
         self.cards = _clean_cards(self.server, raw_cards, self.enemies, self)
+        self._build_lookups()
 
+    def _build_lookups(self):
+        self.skill_id_to_leader_skill = {s.skill_id: s for s in self.leader_skills}
+        self.skill_id_to_active_skill = {s.skill_id: s for s in self.active_skills}
+        self.es_id_to_enemy_skill = {es.enemy_skill_id: es for es in self.enemy_skills}
         self.dungeon_id_to_dungeon = {d.dungeon_id: d for d in self.dungeons}
         self.monster_no_to_card = {c.gungho_id: c for c in self.cards}
 
@@ -154,22 +188,40 @@ class Database(object):
 
         self.enemy_id_to_enemy = {e.enemy_id: e for e in self.enemies}
 
+    # The lookups are rebuilt after unpickling rather than shipped, e.g. from a load_databases() worker.
+    _LOOKUP_FIELDS = ('skill_id_to_leader_skill', 'skill_id_to_active_skill', 'es_id_to_enemy_skill',
+                      'dungeon_id_to_dungeon', 'monster_no_to_card', 'monster_id_to_card', 'enemy_id_to_enemy')
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self._LOOKUP_FIELDS}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_lookups()
+
+    def _output_file(self, output_dir: str, file_name: str) -> str:
+        return os.path.join(output_dir, '{}_{}.json'.format(self.server.name, file_name))
+
     def save(self, output_dir: str, file_name: str, obj: object, pretty: bool):
-        output_file = os.path.join(output_dir, '{}_{}.json'.format(self.server.name, file_name))
-        with open(output_file, 'w') as f:
-            pad_util.json_file_dump(obj, f, pretty)
-
-    def save_all(self, output_dir: str, pretty: bool):
-        self.save(output_dir, 'dungeons', self.dungeons, pretty)
-        self.save(output_dir, 'skills', self.skills, pretty)
-        self.save(output_dir, 'leader_skills', self.leader_skills, pretty)
-        self.save(output_dir, 'active_skills', self.active_skills, pretty)
-        self.save(output_dir, 'enemy_skills', self.raw_enemy_skills, pretty)
-        self.save(output_dir, 'bonuses', self.bonuses, pretty)
-        self.save(output_dir, 'cards', self.cards, pretty)
-        self.save(output_dir, 'exchange', self.exchange, pretty)
-        self.save(output_dir, 'purchase', self.purchase, pretty)
-        self.save(output_dir, 'enemies', self.enemies, pretty)
+        JsonWriter(pretty).save(self._output_file(output_dir, file_name), obj)
+
+    def intermediate_files(self, output_dir: str) -> List[Tuple[str, object]]:
+        """The (path, data) of each file written by save_all."""
+        return [(self._output_file(output_dir, file_name), obj) for file_name, obj in [
+            ('dungeons', self.dungeons),
+            ('skills', self.skills),
+            ('leader_skills', self.leader_skills),
+            ('active_skills', self.active_skills),
+            ('enemy_skills', self.raw_enemy_skills),
+            ('bonuses', self.bonuses),
+            ('cards', self.cards),
+            ('exchange', self.exchange),
+            ('purchase', self.purchase),
+            ('enemies', self.enemies),
+        ]]
+
+    def save_all(self, output_dir: str, pretty: bool, writer: JsonWriter = None, processes: int = 1):
+        save_files(writer or JsonWriter(pretty), self.intermediate_files(output_dir), processes)
 
     def leader_skill_by_id(self, skill_id: SkillId) -> LeaderSkill:
         return self.skill_id_to_leader_skill.get(skill_id, None)
@@ -191,3 +243,30 @@ class Database(object):
 
     def enemy_by_id(self, enemy_id):
         return self.enemy_id_to_enemy.get(enemy_id, None)
+
+
+def _load_database(server: Server, raw_dir: str, load_args: Dict[str, Any]) -> Database:
+    db = Database(server, raw_dir)
+    db.load_database(**load_args)
+    return db
+
+
+def load_databases(servers: List[Server], raw_dir: str, processes: int = 1, profiler: StageProfiler = None,
+                   **load_args) -> List[Database]:
+    """Loads a Database for each server, in that order.
+
+    With processes > 1 the servers are parsed in parallel worker processes and the results pickled back, so
+    loading takes about as long as the slowest server instead of the sum of all of them. load_args are passed
+    to Database.load_database. Serial loads are profiled per server.
+    """
+    profiler = profiler or StageProfiler()
+    if processes <= 1 or len(servers) <= 1:
+        databases = []
+        for server in servers:
+            with profiler.span('load_database[{}]'.format(server.name)):
+                databases.append(_load_database(server, raw_dir, load_args))
+        return databases
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(servers))) as executor:
+        futures = [executor.submit(_load_database, server, raw_dir, load_args) for server in servers]
+        return [f.result() for f in futures]
@@ -5,6 +5,7 @@ class AwokenSkill(SimpleSqlItem):
     """Monster awakening."""
     TABLE = 'awoken_skills'
     KEY_COL = 'awoken_skill_id'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_json(o):
@@ -11,6 +11,7 @@ class Dungeon(ServerDependentSqlItem):
     """Dungeon top-level item."""
     KEY_COL = 'dungeon_id'
     BASE_TABLE = 'dungeons'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_csd(o: CrossServerDungeon) -> 'Dungeon':
@@ -49,6 +50,7 @@ class DungeonWaveData(ServerDependentSqlItem):
     """Dungeon data that can only be computed from waves."""
     KEY_COL = 'dungeon_id'
     BASE_TABLE = 'dungeons'
+    CLEARS_HASH_COL = 'content_hash'
 
     def __init__(self,
                  dungeon_id: int = None,
@@ -63,6 +65,7 @@ class DungeonRewardData(ServerDependentSqlItem):
     """Dungeon data that can only be computed from bonus floor text."""
     KEY_COL = 'dungeon_id'
     BASE_TABLE = 'dungeons'
+    CLEARS_HASH_COL = 'content_hash'
 
     def __init__(self,
                  dungeon_id: int = None,
@@ -87,6 +90,7 @@ class SubDungeon(ServerDependentSqlItem):
     """Per-difficulty dungeon section."""
     KEY_COL = 'sub_dungeon_id'
     BASE_TABLE = 'sub_dungeons'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_cssd(sd: CrossServerSubDungeon, dgid: int) -> 'SubDungeon':
@@ -140,6 +144,7 @@ class SubDungeonWaveData(ServerDependentSqlItem):
     """Sub-dungeon data that can only be computed from waves."""
     KEY_COL = 'sub_dungeon_id'
     BASE_TABLE = 'sub_dungeons'
+    CLEARS_HASH_COL = 'content_hash'
 
     @staticmethod
     def from_waveresult(o: ResultFloor, cssd: CrossServerSubDungeon) -> 'SubDungeonWaveData':
@@ -184,6 +189,7 @@ class SubDungeonRewardData(ServerDependentSqlItem):
     """Sub-dungeon data that can only be computed from bonus floor text."""
     KEY_COL = 'sub_dungeon_id'
     BASE_TABLE = 'sub_dungeons'
+    CLEARS_HASH_COL = 'content_hash'
 
     def __init__(self,
                  sub_dungeon_id: int = None,
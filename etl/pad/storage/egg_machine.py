@@ -10,6 +10,7 @@ class EggMachine(SimpleSqlItem):
     """A per-server egg machine."""
     TABLE = 'egg_machines'
     KEY_COL = {'server_id', 'machine_row', 'machine_type'}
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_eem(eem: ExtraEggMachine, server: Server) -> 'EggMachine':
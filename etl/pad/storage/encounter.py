@@ -7,8 +7,11 @@ from pad.dungeon.wave_converter import ResultSlot
 
 class Encounter(SimpleSqlItem):
     """A monster that appears in a dungeon."""
+    __slots__ = ('encounter_id', 'dungeon_id', 'sub_dungeon_id', 'enemy_id', 'monster_id', 'stage', 'amount',
+                 'order_idx', 'turns', 'level', 'hp', 'atk', 'defense', 'exp', 'tstamp')
     TABLE = 'encounters'
     KEY_COL = 'encounter_id'  # ('sub_dungeon_id', 'stage', 'enemy_id', 'order_idx', 'level')
+    HASH_COL = 'content_hash'
 
     def __init__(self,
                  encounter_id: int = None,
@@ -52,6 +55,7 @@ class Encounter(SimpleSqlItem):
 
 class Drop(SimpleSqlItem):
     """Dungeon monster drop."""
+    __slots__ = ('drop_id', 'encounter_id', 'monster_id', 'tstamp')
     TABLE = 'drops'
     KEY_COL = 'drop_id'
 
@@ -11,6 +11,7 @@ class EnemySkill(ServerDependentSqlItem):
     """Enemy skill data."""
     KEY_COL = 'enemy_skill_id'
     BASE_TABLE = 'enemy_skills'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_json(o):
@@ -87,6 +88,7 @@ class EnemyData(ServerDependentSqlItem):
     """Enemy skill data."""
     KEY_COL = 'enemy_id'
     BASE_TABLE = 'enemy_data'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_mb(o: MonsterBehavior, status: int) -> 'EnemyData':
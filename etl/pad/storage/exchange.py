@@ -8,6 +8,7 @@ class Exchange(SimpleSqlItem):
     """Monster exchanges."""
     TABLE = 'exchanges'
     KEY_COL = {'trade_id', 'server_id'}
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_raw_exchange(o):
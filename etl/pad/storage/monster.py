@@ -10,8 +10,17 @@ from pad.storage_processor.shared_storage import ServerDependentSqlItem
 
 class Monster(ServerDependentSqlItem):
     """Monster data."""
+    __slots__ = ('monster_id', 'monster_no_jp', 'monster_no_na', 'monster_no_kr', 'name_ja', 'name_en', 'name_ko',
+                 'hp_min', 'hp_max', 'hp_scale', 'atk_min', 'atk_max', 'atk_scale', 'rcv_min', 'rcv_max', 'rcv_scale',
+                 'cost', 'exp', 'level', 'rarity', 'limit_mult', 'attribute_1_id', 'attribute_2_id', 'attribute_3_id',
+                 'leader_skill_id', 'active_skill_id', 'type_1_id', 'type_2_id', 'type_3_id', 'awakenings',
+                 'super_awakenings', 'inheritable', 'stackable', 'fodder_exp', 'sell_gold', 'sell_mp', 'buy_mp',
+                 'reg_date', 'on_jp', 'on_na', 'on_kr', 'diff_stats', 'diff_awakenings', 'diff_leader_skill',
+                 'diff_active_skill', 'base_id', 'group_id', 'collab_id', 'has_animation', 'has_hqimage', 'voice_id_jp',
+                 'voice_id_na', 'orb_skin_id', 'bgm_id', 'latent_slots', 'tstamp')
     KEY_COL = 'monster_id'
     BASE_TABLE = 'monsters'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_csm(o: CrossServerCard) -> 'Monster':
@@ -253,6 +262,7 @@ class MonsterWithExtraImageInfo(ServerDependentSqlItem):
     """Monster helper for updating the image-related info."""
     KEY_COL = 'monster_id'
     BASE_TABLE = 'monsters'
+    CLEARS_HASH_COL = 'content_hash'
 
     def __init__(self,
                  monster_id: int = None,
@@ -272,6 +282,7 @@ class MonsterWithMPValue(ServerDependentSqlItem):
     """Monster helper for inserting MP purchase."""
     KEY_COL = 'monster_id'
     BASE_TABLE = 'monsters'
+    CLEARS_HASH_COL = 'content_hash'
 
     def __init__(self,
                  monster_id: int = None,
@@ -311,6 +322,7 @@ class Awakening(ServerDependentSqlItem):
     """Monster awakening entry."""
     KEY_COL = {'monster_id', 'order_idx'}
     BASE_TABLE = 'awakenings'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_csm(o: CrossServerCard) -> List['Awakening']:
@@ -346,6 +358,7 @@ class Evolution(ServerDependentSqlItem):
     """Monster evolution entry."""
     KEY_COL = 'to_id'
     BASE_TABLE = 'evolutions'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_csm(o: CrossServerCard) -> Optional['Evolution']:
@@ -434,6 +447,7 @@ class AltMonster(ServerDependentSqlItem):
     """Alt. monster data."""
     KEY_COL = 'alt_monster_id'
     BASE_TABLE = 'alt_monsters'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_csm(o: CrossServerCard, mid: Optional[int]) -> 'AltMonster':
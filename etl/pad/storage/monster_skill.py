@@ -5,11 +5,7 @@ from pad.db.db_util import DbWrapper
 from pad.raw.skills import skill_text_typing
 from pad.raw.skills.active_behaviors import behavior_to_json
 from pad.raw.skills.active_skill_info import ActiveSkill as ASSkill, ASConverted
-from pad.raw.skills.en.active_skill_text import EnASTextConverter
-from pad.raw.skills.en.leader_skill_text import EnLSTextConverter
-from pad.raw.skills.ja.active_skill_text import JaASTextConverter
-from pad.raw.skills.ja.leader_skill_text import JaLSTextConverter
-from pad.raw.skills.ko.active_skill_text import KoASTextConverter
+from pad.raw.skills.skill_text_renderer import renderer
 from pad.raw_processor.crossed_data import CrossServerSkill
 from pad.storage_processor.shared_storage import ServerDependentSqlItem
 
@@ -18,6 +14,7 @@ class ActiveSkill(ServerDependentSqlItem):
     """Monster active skill."""
     KEY_COL = 'active_skill_id'
     BASE_TABLE = 'active_skills'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_css(css: CrossServerSkill) -> 'ActiveSkill':
@@ -26,12 +23,12 @@ class ActiveSkill(ServerDependentSqlItem):
         kr_skill = css.kr_skill
         cur_skill = css.cur_skill
 
-        desc_ja = cur_skill.full_text(JaASTextConverter())
-        desc_en = cur_skill.full_text(EnASTextConverter())
-        desc_ko = cur_skill.full_text(KoASTextConverter())
-        desc_templated_ja = cur_skill.templated_text(JaASTextConverter())
-        desc_templated_en = cur_skill.templated_text(EnASTextConverter())
-        desc_templated_ko = cur_skill.templated_text(KoASTextConverter())
+        desc_ja = renderer.full_text(cur_skill, 'ja')
+        desc_en = renderer.full_text(cur_skill, 'en')
+        desc_ko = renderer.full_text(cur_skill, 'ko')
+        desc_templated_ja = renderer.templated_text(cur_skill, 'ja')
+        desc_templated_en = renderer.templated_text(cur_skill, 'en')
+        desc_templated_ko = renderer.templated_text(cur_skill, 'ko')
 
         skill_type_tags = skill_text_typing.parse_as_conditions(css)
         tags = skill_text_typing.format_conditions(skill_type_tags)
@@ -107,12 +104,12 @@ class ActiveSubskill(ServerDependentSqlItem):
 
     @staticmethod
     def from_as(act: ASSkill) -> 'ActiveSubskill':
-        desc_ja = act.full_text(JaASTextConverter())
-        desc_en = act.full_text(EnASTextConverter())
-        desc_ko = act.full_text(KoASTextConverter())
-        desc_templated_ja = act.templated_text(JaASTextConverter())
-        desc_templated_en = act.templated_text(EnASTextConverter())
-        desc_templated_ko = act.templated_text(KoASTextConverter())
+        desc_ja = renderer.full_text(act, 'ja')
+        desc_en = renderer.full_text(act, 'en')
+        desc_ko = renderer.full_text(act, 'ko')
+        desc_templated_ja = renderer.templated_text(act, 'ja')
+        desc_templated_en = renderer.templated_text(act, 'en')
+        desc_templated_ko = renderer.templated_text(act, 'ko')
 
         skill_type_tags = skill_text_typing.parse_as_conditions(act, True)
         tags = skill_text_typing.format_conditions(skill_type_tags)
@@ -183,12 +180,12 @@ class ActivePart(ServerDependentSqlItem):
 
     @staticmethod
     def from_as(act: ASSkill) -> 'ActivePart':
-        desc_ja = act.full_text(JaASTextConverter())
-        desc_en = act.full_text(EnASTextConverter())
-        desc_ko = act.full_text(KoASTextConverter())
-        desc_templated_ja = act.templated_text(JaASTextConverter())
-        desc_templated_en = act.templated_text(EnASTextConverter())
-        desc_templated_ko = act.templated_text(KoASTextConverter())
+        desc_ja = renderer.full_text(act, 'ja')
+        desc_en = renderer.full_text(act, 'en')
+        desc_ko = renderer.full_text(act, 'ko')
+        desc_templated_ja = renderer.templated_text(act, 'ja')
+        desc_templated_en = renderer.templated_text(act, 'en')
+        desc_templated_ko = renderer.templated_text(act, 'ko')
 
         skill_type_tags = skill_text_typing.parse_as_conditions(act, True)
         tags = skill_text_typing.format_conditions(skill_type_tags)
@@ -318,6 +315,7 @@ class LeaderSkill(ServerDependentSqlItem):
     """Monster leader skill."""
     KEY_COL = 'leader_skill_id'
     BASE_TABLE = 'leader_skills'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_css(css: CrossServerSkill) -> 'LeaderSkill':
@@ -326,10 +324,8 @@ class LeaderSkill(ServerDependentSqlItem):
         kr_skill = css.kr_skill
         cur_skill = css.cur_skill
 
-        jp_ls_converter = JaLSTextConverter()
-        en_ls_converter = EnLSTextConverter()
-        desc_ja = cur_skill.full_text(jp_ls_converter) or jp_skill.raw_description
-        desc_en = cur_skill.full_text(en_ls_converter) or na_skill.raw_description
+        desc_ja = renderer.full_text(cur_skill, 'ja') or jp_skill.raw_description
+        desc_en = renderer.full_text(cur_skill, 'en') or na_skill.raw_description
         skill_type_tags = skill_text_typing.parse_ls_conditions(css)
         tags = skill_text_typing.format_conditions(skill_type_tags)
 
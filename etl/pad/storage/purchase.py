@@ -8,6 +8,7 @@ class Purchase(SimpleSqlItem):
     """MP Purchases."""
     TABLE = 'purchases'
     KEY_COL = {'server_id', 'target_monster_id', 'start_timestamp', 'end_timestamp'}
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_raw_purchase(o: "Purchase"):
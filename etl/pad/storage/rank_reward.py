@@ -5,6 +5,7 @@ class RankReward(SimpleSqlItem):
     """Rank reward."""
     TABLE = 'rank_rewards'
     KEY_COL = 'rank'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_csv(o):
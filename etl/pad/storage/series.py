@@ -6,6 +6,7 @@ class Series(SimpleSqlItem):
     """A monster series."""
     TABLE = 'series'
     KEY_COL = 'series_id'
+    HASH_COL = 'content_hash'
     UNSORTED_SERIES_ID = 0
 
     @staticmethod
@@ -38,6 +39,7 @@ class MonsterSeries(SimpleSqlItem):
     """A monster's association with a series."""
     TABLE = 'monster_series'
     KEY_COL = 'monster_series_id'
+    HASH_COL = 'content_hash'
 
     def __init__(self,
                  monster_series_id: int = None,
@@ -5,6 +5,7 @@ class ActiveSkillTag(SimpleSqlItem):
     """Tags for active skills."""
     TABLE = 'active_skill_tags'
     KEY_COL = 'active_skill_tag_id'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_json(o):
@@ -36,6 +37,7 @@ class LeaderSkillTag(SimpleSqlItem):
     """Tags for leader skills."""
     TABLE = 'leader_skill_tags'
     KEY_COL = 'leader_skill_tag_id'
+    HASH_COL = 'content_hash'
 
     @staticmethod
     def from_json(o):
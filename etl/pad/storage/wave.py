@@ -1,11 +1,13 @@
 from pad.common import monster_id_mapping
 from pad.common.monster_id_mapping import server_monster_id_fn
-from pad.common.shared_types import Server
+from pad.common.shared_types import Server, slot_names
 from pad.db.sql_item import SqlItem
 from pad.raw import wave as wave_data
 
 
 class WaveItem(SqlItem):
+    __slots__ = ('id', 'server', 'dungeon_id', 'floor_id', 'stage', 'slot', 'spawn_type', 'monster_id', 'monster_level',
+                 'drop_monster_id', 'drop_monster_level', 'plus_amount', 'pull_id', 'entry_id', 'leader_id', 'friend_id')
     DROP_MONSTER_ID_GOLD = 9900
     TABLE = 'wave_data'
     KEY_COL = 'id'
@@ -78,4 +80,4 @@ class WaveItem(SqlItem):
         return WaveItem.KEY_COL
 
     def _insert_columns(self):
-        return self.__dict__.keys()
+        return slot_names(WaveItem)
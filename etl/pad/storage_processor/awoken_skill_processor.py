@@ -8,6 +8,10 @@ __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file
 
 
 class AwokenSkillProcessor(object):
+    DEPENDS_ON = []
+    WRITES = ['awoken_skills']
+    INPUTS = []
+
     def __init__(self):
         with open(os.path.join(__location__, 'awoken_skill.json')) as f:
             self.awoken_skills = json.load(f)
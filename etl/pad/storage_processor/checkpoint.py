@@ -0,0 +1,65 @@
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Dict, List
+
+logger = logging.getLogger('processor')
+
+
+class ProcessorCheckpoint(object):
+    """Completed processor tasks, and progress within long ones, saved after every change.
+
+    A checkpoint only applies to the run it was written for: run_key should identify the inputs and options, and
+    a saved checkpoint with a different key is discarded. Progress must only be recorded for committed work.
+    """
+
+    def __init__(self, path: str, run_key: str, resume: bool = False):
+        self.path = path
+        self.run_key = run_key
+        self.completed = []  # type: List[str]
+        self.progress_by_task = {}  # type: Dict[str, Dict[str, Any]]
+        self._lock = Lock()
+
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get('run_key') == run_key:
+                self.completed = saved.get('completed', [])
+                self.progress_by_task = saved.get('progress', {})
+                logger.info('Resuming from checkpoint, completed: %s', ', '.join(self.completed) or 'none')
+            else:
+                logger.warning('Ignoring checkpoint %s, it was written for a different run', path)
+
+    def is_completed(self, task_name: str) -> bool:
+        return task_name in self.completed
+
+    def mark_completed(self, task_name: str):
+        with self._lock:
+            if task_name not in self.completed:
+                self.completed.append(task_name)
+            self.progress_by_task.pop(task_name, None)
+            self._save()
+
+    def progress(self, task_name: str) -> Dict[str, Any]:
+        return dict(self.progress_by_task.get(task_name, {}))
+
+    def set_progress(self, task_name: str, **values):
+        with self._lock:
+            self.progress_by_task.setdefault(task_name, {}).update(values)
+            self._save()
+
+    def clear(self):
+        """Removes the checkpoint file, once the run it covers has finished."""
+        with self._lock:
+            self.completed = []
+            self.progress_by_task = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'run_key': self.run_key, 'completed': self.completed, 'progress': self.progress_by_task},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from pad.db.db_util import DbWrapper
+from pad.storage_processor.checkpoint import ProcessorCheckpoint
+from pad.storage_processor.scheduler import ProcessorScheduler, ProcessorTask
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'checkpoint.json')
+
+
+def test_resume_restores_completed_and_progress(path):
+    checkpoint = ProcessorCheckpoint(path, 'key')
+    checkpoint.mark_completed('a')
+    checkpoint.set_progress('b', offset=10)
+    checkpoint.set_progress('b', batch=2)
+
+    resumed = ProcessorCheckpoint(path, 'key', resume=True)
+    assert resumed.is_completed('a')
+    assert not resumed.is_completed('b')
+    assert resumed.progress('b') == {'offset': 10, 'batch': 2}
+    assert resumed.progress('c') == {}
+
+
+def test_completing_a_task_drops_its_progress(path):
+    checkpoint = ProcessorCheckpoint(path, 'key')
+    checkpoint.set_progress('a', offset=10)
+    checkpoint.mark_completed('a')
+    checkpoint.mark_completed('a')
+
+    resumed = ProcessorCheckpoint(path, 'key', resume=True)
+    assert resumed.completed == ['a']
+    assert resumed.progress('a') == {}
+
+
+def test_without_resume_starts_over(path):
+    ProcessorCheckpoint(path, 'key').mark_completed('a')
+    assert not ProcessorCheckpoint(path, 'key').is_completed('a')
+
+
+def test_different_run_key_is_ignored(path):
+    ProcessorCheckpoint(path, 'key').mark_completed('a')
+    assert not ProcessorCheckpoint(path, 'other key', resume=True).is_completed('a')
+
+
+def test_clear_removes_the_file(path):
+    checkpoint = ProcessorCheckpoint(path, 'key')
+    checkpoint.mark_completed('a')
+    checkpoint.clear()
+    assert not os.path.exists(path)
+    assert not checkpoint.is_completed('a')
+    checkpoint.clear()
+
+
+def test_scheduler_resumes_after_failure(tmp_path, path):
+    db_config = {'backend': 'sqlite', 'path': str(tmp_path / 'test.sqlite')}
+
+    def connect():
+        db = DbWrapper(False)
+        db.connect(db_config)
+        return db
+
+    def build(runs, fail):
+        def task(name, depends_on=()):
+            def run(db):
+                if name == fail:
+                    raise RuntimeError(name)
+                runs.append(name)
+
+            return ProcessorTask(name, run, depends_on=depends_on)
+
+        scheduler = ProcessorScheduler(connect, max_workers=1, checkpoint=ProcessorCheckpoint(path, 'key', True))
+        scheduler.add(task('a'))
+        scheduler.add(task('b', ['a']))
+        scheduler.add(task('c', ['b']))
+        return scheduler
+
+    first_runs = []
+    with pytest.raises(RuntimeError):
+        build(first_runs, fail='b').run()
+    assert first_runs == ['a']
+
+    second_runs = []
+    scheduler = build(second_runs, fail=None)
+    scheduler.run()
+    assert second_runs == ['b', 'c']
+    assert scheduler.checkpoint.completed == ['a', 'b', 'c']
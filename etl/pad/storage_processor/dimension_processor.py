@@ -14,7 +14,7 @@ logger = logging.getLogger('processor')
 class DimensionItem(SimpleSqlItem):
     """Dimension table superclass"""
     def __init__(self, dimension_id: int, name: str):
-        self.__dict__[self.KEY_COL] = dimension_id
+        setattr(self, self.KEY_COL, dimension_id)
         self.name = name
 
 
@@ -144,9 +144,12 @@ DIMENSION_OBJECTS = [
 
 
 class DimensionProcessor(object):
+    DEPENDS_ON = []
+    WRITES = sorted({o.TABLE for o in DIMENSION_OBJECTS})
+    INPUTS = []
+
     def __init__(self):
         pass
 
     def process(self, db: DbWrapper):
-        for item in DIMENSION_OBJECTS:
-            db.insert_or_update(item)
+        db.bulk_insert_or_update(DIMENSION_OBJECTS)
@@ -12,15 +12,29 @@ from pad.raw_processor.crossed_data import CrossServerSubDungeon, CrossServerDun
 from pad.storage.dungeon import SubDungeonWaveData, DungeonWaveData, SubDungeonRewardData, DungeonRewardData
 from pad.storage.encounter import Encounter, Drop
 from pad.storage.wave import WaveItem
+from pad.storage_processor.checkpoint import ProcessorCheckpoint
+from pad.storage_processor.dungeon_processor import DungeonProcessor
+from pad.storage_processor.enemy_skill_processor import EnemySkillProcessor
+from pad.storage_processor.monster_processor import MonsterProcessor
 
 logger = logging.getLogger('processor')
 human_fix_logger = logging.getLogger('human_fix')
 
 
 class DungeonContentProcessor(object):
-    def __init__(self, data: crossed_data.CrossServerDatabase):
+    DEPENDS_ON = [DungeonProcessor, MonsterProcessor, EnemySkillProcessor]
+    WRITES = ['encounters', 'drops', 'dungeons', 'sub_dungeons']
+
+    # With a checkpoint, commit and record the last finished dungeon this often.
+    CHECKPOINT_EVERY_DUNGEONS = 250
+
+    def __init__(self, data: crossed_data.CrossServerDatabase, checkpoint: Optional[ProcessorCheckpoint] = None):
         self.data = data
         self.converter = WaveConverter(data)
+        self.checkpoint = checkpoint
+        # Filled from the dungeon type index when the contents are processed.
+        self.technical_dungeon_ids = set()
+        self.common_monster_dungeon_ids = set()
 
     def process(self, db: DbWrapper):
         logger.info('loading dungeon contents')
@@ -31,7 +45,22 @@ class DungeonContentProcessor(object):
         logger.info('done loading contents')
 
     def _process_dungeon_contents(self, db: DbWrapper):
+        last_dungeon_id = None
+        if self.checkpoint:
+            last_dungeon_id = self.checkpoint.progress(type(self).__name__).get('last_dungeon_id')
+            if last_dungeon_id is not None:
+                logger.info('resuming dungeon contents after dungeon:%s', last_dungeon_id)
+
+        self.technical_dungeon_ids = {d.dungeon_id for d in self.data.dungeons_by_type(RawDungeonType.TECHNICAL)}
+        self.common_monster_dungeon_ids = {d.dungeon_id for d in self.data.dungeons_by_type(RawDungeonType.NORMAL)
+                                           if d.dungeon_id < 1000}
+        self.common_monster_dungeon_ids.update(d for d in self.technical_dungeon_ids if d < 1000)
+
+        wave_data_items = []
+        dungeons_since_checkpoint = 0
         for dungeon in self.data.dungeons:
+            if last_dungeon_id is not None and dungeon.dungeon_id <= last_dungeon_id:
+                continue
             if dungeon.dungeon_id % 250 == 0:
                 logger.info('scanning dungeon:%s', dungeon.dungeon_id)
             sub_dungeon_items = []
@@ -40,7 +69,7 @@ class DungeonContentProcessor(object):
                 result_floor = self._compute_result_floor(db, dungeon, sub_dungeon)
                 if result_floor:
                     item = SubDungeonWaveData.from_waveresult(result_floor, sub_dungeon)
-                    db.insert_or_update(item)
+                    wave_data_items.append(item)
                     sub_dungeon_items.append(item)
 
                     self._maybe_insert_encounters(db, dungeon, sub_dungeon, result_floor)
@@ -48,7 +77,17 @@ class DungeonContentProcessor(object):
             if sub_dungeon_items:
                 max_sub_dungeon = max(sub_dungeon_items, key=lambda x: x.sub_dungeon_id)
                 item = DungeonWaveData(dungeon_id=dungeon.dungeon_id, icon_id=max_sub_dungeon.icon_id)
-                db.insert_or_update(item)
+                wave_data_items.append(item)
+
+            dungeons_since_checkpoint += 1
+            if self.checkpoint and dungeons_since_checkpoint >= self.CHECKPOINT_EVERY_DUNGEONS:
+                db.bulk_insert_or_update(wave_data_items)
+                db.commit()
+                self.checkpoint.set_progress(type(self).__name__, last_dungeon_id=dungeon.dungeon_id)
+                wave_data_items = []
+                dungeons_since_checkpoint = 0
+
+        db.bulk_insert_or_update(wave_data_items)
 
     def _compute_result_floor(self,
                               db: DbWrapper,
@@ -62,9 +101,7 @@ class DungeonContentProcessor(object):
         if not wave_items:
             return None
 
-        normal_or_tech = dungeon.cur_dungeon.full_dungeon_type in [RawDungeonType.NORMAL,
-                                                                   RawDungeonType.TECHNICAL]
-        try_common_monsters = normal_or_tech and dungeon.cur_dungeon.dungeon_id < 1000
+        try_common_monsters = dungeon.dungeon_id in self.common_monster_dungeon_ids
 
         return self.converter.convert(wave_items, try_common_monsters)
 
@@ -82,7 +119,7 @@ class DungeonContentProcessor(object):
                 seen_enemies.add(slot.monster_id)
 
                 turns = card.enemy_turns
-                if dungeon.cur_dungeon.full_dungeon_type == RawDungeonType.TECHNICAL and card.enemy_turns_alt:
+                if dungeon.dungeon_id in self.technical_dungeon_ids and card.enemy_turns_alt:
                     turns = card.enemy_turns_alt
 
                 sd = sub_dungeon.cur_sub_dungeon
@@ -183,11 +220,8 @@ class DungeonContentProcessor(object):
         all_bonuses = self.data.jp_bonuses + self.data.na_bonuses + self.data.kr_bonuses
         floor_bonuses = list(filter(is_floor_bonus, all_bonuses))
 
-        # Stick all the monster names, from all languages, lowercased, into a lookup map.
-        monster_name_to_id = {x.jp_card.card.name: x for x in self.data.ownable_cards}
-        monster_name_to_id.update({x.na_card.card.name: x for x in self.data.ownable_cards})
-        monster_name_to_id.update({x.kr_card.card.name: x for x in self.data.ownable_cards})
-        monster_name_to_id = {x.lower(): y for x, y in monster_name_to_id.items()}
+        # All the monster names, from all languages, lowercased.
+        monster_name_to_id = self.data.ownable_name_to_card
 
         for merged_bonus in floor_bonuses:
             raw_text = merged_bonus.bonus.clean_message
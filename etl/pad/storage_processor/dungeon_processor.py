@@ -1,8 +1,10 @@
 import logging
 
 from pad.db.db_util import DbWrapper
+from pad.raw import dungeon as raw_dungeon
 from pad.raw_processor import crossed_data
 from pad.storage.dungeon import Dungeon, FixedTeam, FixedTeamMonster, SubDungeon
+from pad.storage_processor.monster_processor import MonsterProcessor
 
 logger = logging.getLogger('processor')
 
@@ -15,6 +17,10 @@ AND visible = false
 
 
 class DungeonProcessor(object):
+    DEPENDS_ON = [MonsterProcessor]
+    WRITES = ['dungeons', 'sub_dungeons', 'fixed_teams', 'fixed_team_monsters']
+    INPUTS = [raw_dungeon.FILE_NAME]
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         self.data = data
 
@@ -29,13 +35,15 @@ class DungeonProcessor(object):
         logger.info('Updated visibility of %s dungeons', updated_rows)
 
     def _process_dungeons(self, db: DbWrapper):
+        items = []
         for dungeon in self.data.dungeons:
-            db.insert_or_update(Dungeon.from_csd(dungeon))
+            items.append(Dungeon.from_csd(dungeon))
             for subdungeon in dungeon.sub_dungeons:
-                db.insert_or_update(SubDungeon.from_cssd(subdungeon, dungeon.dungeon_id))
+                items.append(SubDungeon.from_cssd(subdungeon, dungeon.dungeon_id))
                 if not subdungeon.cur_sub_dungeon.fixed_monsters:
                     continue
-                db.insert_or_update(FixedTeam.from_cssd(subdungeon))
+                items.append(FixedTeam.from_cssd(subdungeon))
                 for fcid in range(6):
                     fixed = subdungeon.cur_sub_dungeon.fixed_monsters.get(fcid)
-                    db.insert_or_update(FixedTeamMonster.from_fc(fixed, fcid, subdungeon))
+                    items.append(FixedTeamMonster.from_fc(fixed, fcid, subdungeon))
+        db.bulk_insert_or_update(items)
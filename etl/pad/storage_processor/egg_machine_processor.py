@@ -3,14 +3,21 @@ import logging
 from pad.common.monster_id_mapping import server_monster_id_fn
 from pad.common.shared_types import Server
 from pad.db.db_util import DbWrapper
+from pad.raw import extra_egg_machine
 from pad.raw_processor import crossed_data
 from pad.storage.egg_machine import EggMachine
 from pad.storage.egg_machines_monsters import EggMachinesMonster
+from pad.storage_processor.dimension_processor import DimensionProcessor
+from pad.storage_processor.monster_processor import MonsterProcessor
 
 logger = logging.getLogger('processor')
 
 
 class EggMachineProcessor(object):
+    DEPENDS_ON = [DimensionProcessor, MonsterProcessor]
+    WRITES = ['egg_machines', 'egg_machines_monsters']
+    INPUTS = [extra_egg_machine.FILE_NAME]
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         self.egg_machines = {
             Server.jp: data.jp_egg_machines,
@@ -9,6 +9,7 @@ from pad.raw.enemy_skills import enemy_skill_proto
 from pad.raw.skills.enemy_skill_info import ESLogic
 from pad.raw_processor import crossed_data
 from pad.storage.enemy_skill import EnemySkill, EnemyData
+from pad.storage_processor.input_manifest import CARD_INPUTS
 
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
@@ -17,6 +18,10 @@ human_fix_logger = logging.getLogger('human_fix')
 
 
 class EnemySkillProcessor(object):
+    DEPENDS_ON = []
+    WRITES = ['enemy_skills', 'enemy_data']
+    INPUTS = CARD_INPUTS
+
     def __init__(self, db: DbWrapper, data: crossed_data.CrossServerDatabase):
         self.db = db
         self.data = data
@@ -4,12 +4,19 @@ import os
 from pad.db.db_util import DbWrapper
 from pad.common.shared_types import Server
 from pad.storage.exchange import Exchange
+from pad.raw import exchange
 from pad.raw_processor import crossed_data
+from pad.storage_processor.dimension_processor import DimensionProcessor
+from pad.storage_processor.monster_processor import MonsterProcessor
 
 logger = logging.getLogger('processor')
 
 
 class ExchangeProcessor(object):
+    DEPENDS_ON = [DimensionProcessor, MonsterProcessor]
+    WRITES = ['exchanges']
+    INPUTS = [exchange.FILE_NAME]
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         self.exchange_data = {
             Server.jp: data.jp_exchange,
@@ -0,0 +1,102 @@
+"""
+Tracks what each processor was last run against, so an incremental run can skip processors whose inputs are unchanged.
+
+Processors declare INPUTS, the raw file names (from each server's raw directory) that their output derives from.
+A processor's input digest covers those files for every server, the pipeline code, the run options, and any extra
+input fingerprints supplied by the caller (e.g. the enemy skill proto directory). Processors that don't declare
+INPUTS (their data comes from elsewhere, e.g. the database) always run.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from pad.common import pad_util
+from pad.common.shared_types import Server
+from pad.raw import card, skill, enemy_skill
+
+logger = logging.getLogger('processor')
+
+# Cross-server cards are built from the card, skill and enemy skill data.
+CARD_INPUTS = [card.FILE_NAME, skill.FILE_NAME, enemy_skill.FILE_NAME]
+
+
+def code_version() -> str:
+    """Hash of the pad package, including the static data files shipped with the processors."""
+    pad_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return pad_util.tree_hash(pad_dir, ['.py', '.json', '.csv'])
+
+
+def listing_hash(*dirs: str) -> str:
+    """md5 of the file names in some directories; for inputs where only the presence of files matters."""
+    md5 = hashlib.md5()
+    for d in dirs:
+        md5.update(d.encode())
+        if os.path.isdir(d):
+            md5.update('\n'.join(sorted(os.listdir(d))).encode())
+    return md5.hexdigest()
+
+
+class InputManifest(object):
+    """The input digest each processor last completed with, saved as JSON between runs."""
+
+    def __init__(self, path: str, raw_dir: str, options: Dict[str, Optional[str]],
+                 servers: Iterable[Server] = (Server.jp, Server.na, Server.kr)):
+        self.path = path
+        self.raw_dir = raw_dir
+        self.servers = list(servers)
+        self.base_digest = '{}/{}'.format(code_version(), json.dumps(options, sort_keys=True))
+        self.file_hashes = {}  # type: Dict[str, str]
+        self.processors = {}  # type: Dict[str, str]
+        self.previous_file_hashes = {}  # type: Dict[str, str]
+
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.processors = saved.get('processors', {})
+            self.previous_file_hashes = saved.get('inputs', {})
+
+    def _file_hash(self, server: Server, file_name: str) -> str:
+        key = '{}/{}'.format(server.name, file_name)
+        if key not in self.file_hashes:
+            self.file_hashes[key] = pad_util.file_hash(os.path.join(self.raw_dir, server.name, file_name))
+        return self.file_hashes[key]
+
+    def digest(self, inputs: Iterable[str], extra: Iterable[str] = ()) -> str:
+        md5 = hashlib.md5(self.base_digest.encode())
+        for file_name in sorted(inputs):
+            for server in self.servers:
+                md5.update('{}/{}={}'.format(server.name, file_name, self._file_hash(server, file_name)).encode())
+        for fingerprint in extra:
+            md5.update(fingerprint.encode())
+        return md5.hexdigest()
+
+    def is_current(self, name: str, digest: str) -> bool:
+        return self.processors.get(name) == digest
+
+    def record(self, name: str, digest: str):
+        self.processors[name] = digest
+
+    def changed_files(self) -> List[str]:
+        return sorted(k for k, v in self.file_hashes.items() if self.previous_file_hashes.get(k) != v)
+
+    def save(self):
+        inputs = dict(self.previous_file_hashes)
+        inputs.update(self.file_hashes)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'inputs': inputs, 'processors': self.processors}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def select_changed_processors(processors, manifest: InputManifest, input_digests: Dict[Any, str]) -> List[Any]:
+    """The processors whose inputs changed since they last completed, plus the RUN_LAST ones if any of those run."""
+    logger.info('Changed inputs: %s', ', '.join(manifest.changed_files()) or 'none')
+    unchanged = {p for p, digest in input_digests.items() if manifest.is_current(p.__name__, digest)}
+    selected = [p for p in processors if p not in unchanged]
+    if all(getattr(p, 'RUN_LAST', False) for p in selected):
+        selected = []
+    if unchanged:
+        logger.info('Skipping processors with unchanged inputs: %s', ', '.join(sorted(p.__name__ for p in unchanged)))
+    return selected
@@ -0,0 +1,110 @@
+import pytest
+
+from pad.common.shared_types import Server
+from pad.storage_processor.input_manifest import InputManifest, select_changed_processors
+
+SERVERS = [Server.jp, Server.na]
+
+
+class CardProcessor(object):
+    INPUTS = ['cards.json', 'skills.json']
+
+
+class DungeonProcessor(object):
+    INPUTS = ['dungeons.json']
+
+
+class StaticProcessor(object):
+    INPUTS = []
+
+
+class DatabaseProcessor(object):
+    pass
+
+
+class LastProcessor(object):
+    RUN_LAST = True
+
+
+PROCESSORS = [CardProcessor, DungeonProcessor, StaticProcessor, DatabaseProcessor, LastProcessor]
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    for server in SERVERS:
+        (tmp_path / server.name).mkdir()
+        for file_name in ['cards.json', 'skills.json', 'dungeons.json']:
+            (tmp_path / server.name / file_name).write_text(file_name)
+    return tmp_path
+
+
+def _manifest(raw_dir, options=None):
+    return InputManifest(str(raw_dir / 'input_manifest.json'), str(raw_dir), options or {'server': 'combined'},
+                         SERVERS)
+
+
+def _digests(manifest, extra=None):
+    extra = extra or {}
+    return {p: manifest.digest(p.INPUTS, extra.get(p, ())) for p in PROCESSORS if hasattr(p, 'INPUTS')}
+
+
+def _complete_run(raw_dir, options=None, extra=None):
+    manifest = _manifest(raw_dir, options)
+    for processor, digest in _digests(manifest, extra).items():
+        manifest.record(processor.__name__, digest)
+    manifest.save()
+
+
+def _select(raw_dir, options=None, extra=None):
+    manifest = _manifest(raw_dir, options)
+    return select_changed_processors(PROCESSORS, manifest, _digests(manifest, extra))
+
+
+def test_first_run_selects_everything(raw_dir):
+    assert _select(raw_dir) == PROCESSORS
+
+
+def test_nothing_changed(raw_dir):
+    _complete_run(raw_dir)
+    # DatabaseProcessor declares no INPUTS, so it always runs, and LastProcessor runs after it.
+    assert _select(raw_dir) == [DatabaseProcessor, LastProcessor]
+
+
+def test_only_run_last_left_selects_nothing(raw_dir):
+    _complete_run(raw_dir)
+    manifest = _manifest(raw_dir)
+    assert select_changed_processors([CardProcessor, LastProcessor], manifest, _digests(manifest)) == []
+
+
+def test_changed_file_selects_its_processors(raw_dir):
+    _complete_run(raw_dir)
+    (raw_dir / 'na' / 'skills.json').write_text('changed')
+
+    assert _select(raw_dir) == [CardProcessor, DatabaseProcessor, LastProcessor]
+    manifest = _manifest(raw_dir)
+    manifest.digest(CardProcessor.INPUTS)
+    assert manifest.changed_files() == ['na/skills.json']
+
+
+def test_missing_file_is_a_change(raw_dir):
+    _complete_run(raw_dir)
+    (raw_dir / 'jp' / 'dungeons.json').unlink()
+    assert _select(raw_dir) == [DungeonProcessor, DatabaseProcessor, LastProcessor]
+
+
+def test_changed_options_select_everything(raw_dir):
+    _complete_run(raw_dir)
+    assert _select(raw_dir, options={'server': 'jp'}) == PROCESSORS
+
+
+def test_changed_extra_input(raw_dir):
+    _complete_run(raw_dir, extra={DungeonProcessor: ['a']})
+    assert _select(raw_dir, extra={DungeonProcessor: ['a']}) == [DatabaseProcessor, LastProcessor]
+    assert _select(raw_dir, extra={DungeonProcessor: ['b']}) == [DungeonProcessor, DatabaseProcessor, LastProcessor]
+
+
+def test_unfinished_processor_runs_again(raw_dir):
+    manifest = _manifest(raw_dir)
+    manifest.record(CardProcessor.__name__, _digests(manifest)[CardProcessor])
+    manifest.save()
+    assert _select(raw_dir) == [DungeonProcessor, StaticProcessor, DatabaseProcessor, LastProcessor]
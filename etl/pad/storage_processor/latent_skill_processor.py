@@ -8,9 +8,15 @@ from pad.storage.latent_skill import LatentSkill
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
 from pad.storage.monster import LatentTamadra
+from pad.storage_processor.input_manifest import CARD_INPUTS
+from pad.storage_processor.monster_processor import MonsterProcessor
 
 
 class LatentSkillProcessor(object):
+    DEPENDS_ON = [MonsterProcessor]
+    WRITES = ['latent_skills']
+    INPUTS = CARD_INPUTS
+
     def __init__(self, data: CrossServerDatabase):
         self.data = data
 
@@ -6,12 +6,22 @@ from pad.db.db_util import DbWrapper
 from pad.raw_processor import crossed_data
 from pad.storage.monster import AltMonster, Awakening, Evolution, Monster, MonsterWithExtraImageInfo, Transformation
 from pad.storage.monster_skill import LeaderSkill, upsert_active_skill_data
+from pad.storage_processor.awoken_skill_processor import AwokenSkillProcessor
+from pad.storage_processor.dimension_processor import DimensionProcessor
+from pad.storage_processor.input_manifest import CARD_INPUTS
+from pad.storage_processor.series_processor import SeriesProcessor
+from pad.storage_processor.skill_tag_processor import SkillTagProcessor
 
 logger = logging.getLogger('processor')
 human_fix_logger = logging.getLogger('human_fix')
 
 
 class MonsterProcessor(object):
+    DEPENDS_ON = [DimensionProcessor, AwokenSkillProcessor, SkillTagProcessor, SeriesProcessor]
+    WRITES = ['monsters', 'alt_monsters', 'awakenings', 'evolutions', 'transformations', 'leader_skills',
+              'active_skills', 'active_subskills', 'active_parts', 'active_skills_subskills', 'active_subskills_parts']
+    INPUTS = CARD_INPUTS
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         self.data = data
 
@@ -26,25 +36,24 @@ class MonsterProcessor(object):
 
     def _process_skills(self, db: DbWrapper):
         logger.info('loading skills for %s cards', len(self.data.ownable_cards))
-        ls_count = 0
-        as_count = 0
-        for csc in self.data.ownable_cards:
-            if csc.leader_skill:
-                ls_count += 1
-                db.insert_or_update(LeaderSkill.from_css(csc.leader_skill))
-            if csc.active_skill:
-                as_count += 1
-                upsert_active_skill_data(db, csc.active_skill)
-        logger.info('loaded %s leader skills and %s active skills', ls_count, as_count)
+        # Cards sharing a skill share the merged skill, so each one only has to be written once.
+        for skill_id in self.data.leader_skill_id_to_cards:
+            db.insert_or_update(LeaderSkill.from_css(self.data.leader_id_to_leader[skill_id]))
+        for skill_id in self.data.active_skill_id_to_cards:
+            upsert_active_skill_data(db, self.data.active_id_to_active[skill_id])
+        logger.info('loaded %s leader skills and %s active skills',
+                    len(self.data.leader_skill_id_to_cards), len(self.data.active_skill_id_to_cards))
 
     def _process_monsters(self, db):
         logger.info('loading monsters')
+        items = []
         for m in self.data.all_cards:
             if 0 < m.monster_id < 100_000 and not is_bad_name(m.jp_card.card.name):
-                db.insert_or_update(Monster.from_csm(m))
-            canonical_id = next((cm.monster_id for cm in self.data.ownable_cards
-                                 if cm.monster_id == m.monster_id % 100_000), None)
-            db.insert_or_update(AltMonster.from_csm(m, canonical_id))
+                items.append(Monster.from_csm(m))
+            canonical = self.data.ownable_card_by_monster_id(m.monster_id % 100_000)
+            canonical_id = canonical.monster_id if canonical else None
+            items.append(AltMonster.from_csm(m, canonical_id))
+        db.bulk_insert_or_update(items)
 
     def _process_monster_images(self, db):
         logger.info('monster images, hq_count=%s, anim_count=%s',
@@ -53,11 +62,11 @@ class MonsterProcessor(object):
         if not self.data.hq_image_monster_ids or not self.data.animated_monster_ids:
             logger.info('skipping image info load')
             return
-        for csm in self.data.ownable_cards:
-            item = MonsterWithExtraImageInfo(monster_id=csm.monster_id,
-                                             has_animation=csm.has_animation,
-                                             has_hqimage=csm.has_hqimage)
-            db.insert_or_update(item)
+        items = [MonsterWithExtraImageInfo(monster_id=csm.monster_id,
+                                           has_animation=csm.has_animation,
+                                           has_hqimage=csm.has_hqimage)
+                 for csm in self.data.ownable_cards]
+        db.bulk_insert_or_update(items)
 
     def _process_awakenings(self, db):
         logger.info('loading awakenings')
@@ -79,20 +88,28 @@ class MonsterProcessor(object):
 
     def _process_evolutions(self, db):
         logger.info('loading evolutions')
-        for m in self.data.ownable_cards:
-            if not m.cur_card.card.ancestor_id:
-                continue
+        items = []
+        for tree in self.data.evolution_tree_to_cards.values():
+            for m in tree:
+                if not m.cur_card.card.ancestor_id:
+                    continue
 
-            item = Evolution.from_csm(m)
-            if item:
-                db.insert_or_update(item)
+                item = Evolution.from_csm(m)
+                if item:
+                    items.append(item)
+        db.bulk_insert_or_update(items)
 
         logger.info('loading transforms')
-        for m in self.data.ownable_cards:
-            if not (m.cur_card.active_skill and m.cur_card.active_skill.transform_ids):
-                continue
+        items = []
+        # Coalescing gives every card with an active skill on any server a cross-server one, so this covers all
+        # cards that can transform.
+        for cards in self.data.active_skill_id_to_cards.values():
+            for m in cards:
+                if not (m.cur_card.active_skill and m.cur_card.active_skill.transform_ids):
+                    continue
 
-            denom = sum(val for val in m.cur_card.active_skill.transform_ids.values())
-            for tfid, num in m.cur_card.active_skill.transform_ids.items():
-                if tfid is not None:
-                    db.insert_or_update(Transformation.from_csm(m, tfid, num, denom))
+                denom = sum(val for val in m.cur_card.active_skill.transform_ids.values())
+                for tfid, num in m.cur_card.active_skill.transform_ids.items():
+                    if tfid is not None:
+                        items.append(Transformation.from_csm(m, tfid, num, denom))
+        db.bulk_insert_or_update(items)
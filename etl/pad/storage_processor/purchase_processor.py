@@ -6,12 +6,19 @@ from pad.db.db_util import DbWrapper
 from pad.common.shared_types import Server
 from pad.storage.purchase import Purchase
 from pad.storage.monster import MonsterWithMPValue
+from pad.raw import purchase
 from pad.raw_processor import crossed_data
+from pad.storage_processor.dimension_processor import DimensionProcessor
+from pad.storage_processor.monster_processor import MonsterProcessor
 
 logger = logging.getLogger('processor')
 
 
 class PurchaseProcessor(object):
+    DEPENDS_ON = [DimensionProcessor, MonsterProcessor]
+    WRITES = ['purchases', 'monsters']
+    INPUTS = [purchase.FILE_NAME]
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         self.purchase_data = {
             Server.jp: data.jp_purchase,
@@ -2,6 +2,7 @@ import logging
 # from datetime import datetime, timedelta
 
 from pad.db.db_util import DbWrapper
+from pad.storage_processor.timestamp_processor import TimestampProcessor
 
 logger = logging.getLogger('processor')
 
@@ -11,6 +12,10 @@ def date2tstamp(date):
 
 
 class PurgeDataProcessor:
+    DEPENDS_ON = [TimestampProcessor]
+    WRITES = []
+    RUN_LAST = True
+
     def process(self, db: DbWrapper):
         pass
         # print('Starting deletion of old records')
@@ -8,6 +8,10 @@ __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file
 
 
 class RankRewardProcessor(object):
+    DEPENDS_ON = []
+    WRITES = ['rank_rewards']
+    INPUTS = []
+
     def __init__(self):
         with open(os.path.join(__location__, 'rank_reward.csv')) as f:
             reader = csv.reader(f)
@@ -5,10 +5,13 @@ from typing import List
 from datetime import timedelta
 
 from pad.db.db_util import DbWrapper
+from pad.raw import bonus as raw_bonus, dungeon as raw_dungeon
 from pad.raw.bonus import BonusType
 from pad.raw_processor import crossed_data
 from pad.raw_processor.merged_data import MergedBonus
 from pad.storage.schedule import ScheduleEvent
+from pad.storage_processor.dimension_processor import DimensionProcessor
+from pad.storage_processor.dungeon_processor import DungeonProcessor
 
 logger = logging.getLogger('processor')
 human_fix_logger = logging.getLogger('human_fix')
@@ -91,6 +94,10 @@ IGNORED_BONUS_TYPES = [
 
 
 class ScheduleProcessor(object):
+    DEPENDS_ON = [DimensionProcessor, DungeonProcessor]
+    WRITES = ['schedule']
+    INPUTS = [raw_bonus.FILE_NAME, raw_dungeon.FILE_NAME]
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         self.data = data
 
@@ -0,0 +1,149 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, Future
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional
+
+from pad.common.stage_profiler import SpanPath, StageProfiler
+from pad.db.db_util import DbWrapper
+from pad.db.statement_stats import StatementStats
+from pad.storage_processor.checkpoint import ProcessorCheckpoint
+
+logger = logging.getLogger('processor')
+
+
+class ProcessorTask(object):
+    """A unit of processor work, run in its own transaction.
+
+    depends_on names the tasks that must finish first; tasks not scheduled in this run are ignored. Tasks that
+    write a common table never run concurrently. run_last tasks wait for every task that is not run_last.
+    """
+
+    def __init__(self, name: str, run: Callable[[DbWrapper], None],
+                 depends_on: Iterable[str] = (), writes: Iterable[str] = (), run_last: bool = False):
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.writes = set(writes)
+        self.run_last = run_last
+
+    def __str__(self):
+        return 'ProcessorTask({})'.format(self.name)
+
+
+def processor_task(processor, run: Callable[[DbWrapper], None], name: Optional[str] = None) -> ProcessorTask:
+    """Task for a processor (instance or class), using the DEPENDS_ON/WRITES/RUN_LAST declared on its class."""
+    processor_type = processor if isinstance(processor, type) else type(processor)
+    return ProcessorTask(name or processor_type.__name__, run,
+                         depends_on=[dep.__name__ for dep in getattr(processor_type, 'DEPENDS_ON', ())],
+                         writes=getattr(processor_type, 'WRITES', ()),
+                         run_last=getattr(processor_type, 'RUN_LAST', False))
+
+
+class ProcessorScheduler(object):
+    """Runs processor tasks in dependency order, independent ones concurrently.
+
+    Each task gets a fresh DbWrapper from connect() so that tasks do not share a connection or transaction.
+    With max_workers=1, tasks run one at a time in the order they were added (as far as dependencies allow).
+    Each task is a profiler span, nested under the span that is open when run() is called. With a checkpoint,
+    tasks it lists as completed are skipped and each task is added to it once it finishes.
+    """
+
+    def __init__(self, connect: Callable[[], DbWrapper], max_workers: int = 4, commit_every: Optional[int] = None,
+                 profiler: Optional[StageProfiler] = None, checkpoint: Optional[ProcessorCheckpoint] = None):
+        self.connect = connect
+        self.max_workers = max_workers
+        self.commit_every = commit_every
+        self.profiler = profiler or StageProfiler()
+        self.checkpoint = checkpoint
+        self.tasks = []  # type: List[ProcessorTask]
+        self.completed = []  # type: List[str]
+        self.statement_stats = StatementStats()
+        self._stats_lock = Lock()
+
+    def add(self, task: ProcessorTask):
+        if any(t.name == task.name for t in self.tasks):
+            raise ValueError('duplicate processor task:', task.name)
+        self.tasks.append(task)
+
+    def _dependencies(self) -> Dict[str, List[str]]:
+        scheduled = {t.name for t in self.tasks}
+        not_last = [t.name for t in self.tasks if not t.run_last]
+        deps = {}
+        for t in self.tasks:
+            deps[t.name] = [d for d in t.depends_on if d in scheduled]
+            if t.run_last:
+                deps[t.name].extend(n for n in not_last if n not in deps[t.name])
+
+        # Fail before starting anything if the dependencies can't be satisfied.
+        remaining = dict(deps)
+        while remaining:
+            ready = [n for n, d in remaining.items() if not any(x in remaining for x in d)]
+            if not ready:
+                raise ValueError('processor dependency cycle between:', sorted(remaining))
+            for n in ready:
+                del remaining[n]
+        return deps
+
+    def _run_task(self, task: ProcessorTask, span_parent: SpanPath):
+        db = self.connect()
+        try:
+            with self.profiler.span(task.name, span_parent), db.unit_of_work(task.name, self.commit_every):
+                task.run(db)
+        finally:
+            if db.statement_stats is not None:
+                with self._stats_lock:
+                    self.statement_stats.merge(db.statement_stats)
+            db.close()
+
+    def run(self):
+        """Runs every task; after a failure no new tasks are started, and the first error is raised."""
+        deps = self._dependencies()
+        span_parent = self.profiler.current_path()
+        pending = list(self.tasks)
+        running = {}  # type: Dict[Future, ProcessorTask]
+        done = set()
+        errors = []
+
+        if self.checkpoint:
+            skipped = [t for t in pending if self.checkpoint.is_completed(t.name)]
+            if skipped:
+                logger.info('skipping processors completed before: %s', ', '.join(t.name for t in skipped))
+            pending = [t for t in pending if t not in skipped]
+            done.update(t.name for t in skipped)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='processor') as executor:
+            while pending or running:
+                if not errors:
+                    busy_tables = set().union(*(t.writes for t in running.values()))
+                    for task in list(pending):
+                        if len(running) >= self.max_workers:
+                            break
+                        if all(d in done for d in deps[task.name]) and not (task.writes & busy_tables):
+                            logger.info('starting %s', task.name)
+                            pending.remove(task)
+                            running[executor.submit(self._run_task, task, span_parent)] = task
+                            busy_tables |= task.writes
+                elif not running:
+                    break
+
+                if not running:
+                    raise ValueError('no runnable processor tasks among:', [t.name for t in pending])
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    if future.exception() is not None:
+                        logger.error('%s failed: %s', task.name, future.exception())
+                        errors.append(future.exception())
+                    else:
+                        logger.info('finished %s', task.name)
+                        done.add(task.name)
+                        self.completed.append(task.name)
+                        if self.checkpoint:
+                            self.checkpoint.mark_completed(task.name)
+
+        if errors:
+            skipped = [t.name for t in pending]
+            if skipped:
+                logger.error('skipped processors after failure: %s', ', '.join(skipped))
+            raise errors[0]
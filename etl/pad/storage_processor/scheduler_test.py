@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+
+from pad.db.db_util import DbWrapper
+from pad.storage_processor.scheduler import ProcessorScheduler, ProcessorTask, processor_task
+
+
+@pytest.fixture
+def connect(tmp_path):
+    db_config = {'backend': 'sqlite', 'path': str(tmp_path / 'test.sqlite')}
+    setup = DbWrapper(False)
+    setup.connect(db_config)
+    setup.fetch_data('CREATE TABLE runs (name TEXT NOT NULL)')
+    setup.close()
+
+    def _connect():
+        db = DbWrapper(False)
+        db.connect(db_config)
+        return db
+
+    return _connect
+
+
+def _recording_task(name, order, depends_on=(), writes=(), run_last=False, error=None):
+    def run(db):
+        db.insert_item('INSERT INTO runs (name) VALUES (%s)', [name])
+        if error:
+            raise error
+        order.append(name)
+
+    return ProcessorTask(name, run, depends_on=depends_on, writes=writes, run_last=run_last)
+
+
+def _stored_runs(connect):
+    db = connect()
+    try:
+        return sorted(r['name'] for r in db.fetch_data('SELECT name FROM runs'))
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_runs_dependencies_first(connect, max_workers):
+    order = []
+    scheduler = ProcessorScheduler(connect, max_workers=max_workers)
+    scheduler.add(_recording_task('last', order, run_last=True))
+    scheduler.add(_recording_task('c', order, depends_on=['b', 'a']))
+    scheduler.add(_recording_task('b', order, depends_on=['a']))
+    scheduler.add(_recording_task('a', order))
+    scheduler.add(_recording_task('d', order, depends_on=['not_scheduled']))
+    scheduler.run()
+
+    assert sorted(order) == ['a', 'b', 'c', 'd', 'last']
+    assert order.index('a') < order.index('b') < order.index('c')
+    assert order[-1] == 'last'
+    assert sorted(scheduler.completed) == sorted(order)
+    assert _stored_runs(connect) == sorted(order)
+
+
+def test_single_worker_keeps_added_order(connect):
+    order = []
+    scheduler = ProcessorScheduler(connect, max_workers=1)
+    for name in ['x', 'a', 'm']:
+        scheduler.add(_recording_task(name, order))
+    scheduler.run()
+    assert order == ['x', 'a', 'm']
+
+
+def test_tasks_writing_a_common_table_do_not_overlap(connect):
+    running = set()
+    overlaps = []
+    lock = threading.Lock()
+
+    def task(name, writes):
+        def run(db):
+            with lock:
+                for other in running:
+                    if writes & other[1]:
+                        overlaps.append((name, other[0]))
+                running.add((name, frozenset(writes)))
+            threading.Event().wait(0.02)
+            with lock:
+                running.discard((name, frozenset(writes)))
+
+        return ProcessorTask(name, run, writes=writes)
+
+    scheduler = ProcessorScheduler(connect, max_workers=4)
+    scheduler.add(task('a', {'monsters'}))
+    scheduler.add(task('b', {'monsters', 'awakenings'}))
+    scheduler.add(task('c', {'awakenings'}))
+    scheduler.add(task('d', {'dungeons'}))
+    scheduler.run()
+
+    assert overlaps == []
+    assert sorted(scheduler.completed) == ['a', 'b', 'c', 'd']
+
+
+def test_failure_skips_new_tasks_and_rolls_back(connect):
+    order = []
+    scheduler = ProcessorScheduler(connect, max_workers=1)
+    scheduler.add(_recording_task('a', order))
+    scheduler.add(_recording_task('fails', order, error=RuntimeError('boom')))
+    scheduler.add(_recording_task('after', order))
+    scheduler.add(_recording_task('dependent', order, depends_on=['fails']))
+
+    with pytest.raises(RuntimeError, match='boom'):
+        scheduler.run()
+
+    assert order == ['a']
+    assert scheduler.completed == ['a']
+    # The failed task's insert was rolled back with its unit of work.
+    assert _stored_runs(connect) == ['a']
+
+
+def test_cycle_fails_before_running(connect):
+    order = []
+    scheduler = ProcessorScheduler(connect)
+    scheduler.add(_recording_task('a', order, depends_on=['b']))
+    scheduler.add(_recording_task('b', order, depends_on=['a']))
+    scheduler.add(_recording_task('free', order))
+
+    with pytest.raises(ValueError, match='cycle'):
+        scheduler.run()
+    assert order == []
+
+
+def test_duplicate_task(connect):
+    scheduler = ProcessorScheduler(connect)
+    scheduler.add(_recording_task('a', []))
+    with pytest.raises(ValueError):
+        scheduler.add(_recording_task('a', []))
+
+
+def test_processor_task_uses_class_declarations():
+    class FirstProcessor(object):
+        pass
+
+    class SecondProcessor(object):
+        DEPENDS_ON = [FirstProcessor]
+        WRITES = {'monsters'}
+        RUN_LAST = True
+
+    task = processor_task(SecondProcessor(), lambda db: None)
+    assert task.name == 'SecondProcessor'
+    assert task.depends_on == ['FirstProcessor']
+    assert task.writes == {'monsters'}
+    assert task.run_last
+
+    task = processor_task(FirstProcessor, lambda db: None, name='first')
+    assert (task.name, task.depends_on, task.writes, task.run_last) == ('first', [], set(), False)
@@ -12,6 +12,10 @@ logger = logging.getLogger('processor')
 
 
 class SeriesProcessor(object):
+    DEPENDS_ON = []
+    WRITES = ['series']
+    INPUTS = []
+
     def __init__(self, data: crossed_data.CrossServerDatabase):
         with open(os.path.join(__location__, 'series.json')) as f:
             self.series = json.load(f)
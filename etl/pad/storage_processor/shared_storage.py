@@ -6,6 +6,8 @@ from pad.db.sql_item import SimpleSqlItem
 
 
 class ServerDependentSqlItem(SimpleSqlItem, ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def BASE_TABLE(self):
@@ -8,6 +8,10 @@ __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file
 
 
 class SkillTagProcessor(object):
+    DEPENDS_ON = []
+    WRITES = ['active_skill_tags', 'leader_skill_tags']
+    INPUTS = []
+
     def __init__(self):
         with open(os.path.join(__location__, 'skill_tag_active.json')) as f:
             self.active_skill_tags = json.load(f)
@@ -45,6 +45,10 @@ _UPDATE_TABLES = [
 
 
 class TimestampProcessor(object):
+    DEPENDS_ON = []
+    WRITES = ['timestamps']
+    RUN_LAST = True
+
     def __init__(self):
         pass
 
@@ -111,7 +111,7 @@ def pull_data(args, api_client=None, db_wrapper=None):
                 wave_item = WaveItem(pull_id=pull_id, entry_id=entry_id, server=args.server.upper(),
                                      dungeon_id=dungeon_id, floor_id=floor_id, stage=stage_idx, slot=monster_idx,
                                      monster=monster, leader_id=leaders[0], friend_id=leaders[1])
-                db_wrapper.insert_item(wave_item.insert_sql())
+                db_wrapper.insert_item(*wave_item.insert_sql())
 
         if server != 'NA':
             time.sleep(.5)
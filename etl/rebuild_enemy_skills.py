@@ -5,8 +5,12 @@ Regenerates the flattened enemy skill list for all monsters.
 
 import argparse
 import logging
+import multiprocessing
 import os
-from typing import List
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
 
 from dadguide_proto.enemy_skills_pb2 import MonsterBehavior, LevelBehavior
 from pad.common.shared_types import Server
@@ -31,6 +35,12 @@ def parse_args():
     inputGroup.add_argument("--interactive", required=False,
                             help="Lets you specify a card id on the command line")
     inputGroup.add_argument("--server", default="JP", help="Server to build for")
+    inputGroup.add_argument("--load_processes", type=int, default=1,
+                            help="Load the server databases in this many parallel processes")
+    inputGroup.add_argument("--snapshot_dir", required=False,
+                            help="Directory for parsed database snapshots, reused while the raw data is unchanged")
+    inputGroup.add_argument("--processes", type=int, default=1,
+                            help="Rebuild the monsters in this many parallel processes")
 
     outputGroup = parser.add_argument_group("Output")
     outputGroup.add_argument("--output_dir", required=True,
@@ -206,19 +216,86 @@ def process_card(csc: CrossServerCard) -> MonsterBehavior:
     return result
 
 
-def run(args):
-    behavior_data_dir = os.path.join(args.output_dir, 'behavior_data')
-    os.makedirs(behavior_data_dir, exist_ok=True)
-    behavior_text_dir = os.path.join(args.output_dir, 'behavior_text')
-    os.makedirs(behavior_text_dir, exist_ok=True)
-    behavior_plain_dir = os.path.join(args.output_dir, 'behavior_plain')
-    os.makedirs(behavior_plain_dir, exist_ok=True)
+class OutputDirs(NamedTuple):
+    data: str
+    text: str
+    plain: str
 
-    jp_db = merged_database.Database(Server.jp, args.input_dir)
-    na_db = merged_database.Database(Server.na, args.input_dir)
 
-    jp_db.load_database(skip_bonus=True, skip_extra=True)
-    na_db.load_database(skip_bonus=True, skip_extra=True)
+class CardResult(NamedTuple):
+    monster_id: int
+    name: str
+    written: bool
+    error: Optional[str]
+
+
+def rebuild_card(csc: CrossServerCard, dirs: OutputDirs) -> CardResult:
+    """Rebuilds and saves the behavior of one monster, returning the failure instead of raising it."""
+    card = csc.na_card.card
+    try:
+        monster_behavior = process_card(csc)
+        if monster_behavior is None:
+            return CardResult(csc.monster_id, card.name, False, None)
+
+        # Do some sanity cleanup on the behavior
+        monster_behavior = clean_monster_behavior(monster_behavior)
+
+        behavior_data_file = os.path.join(dirs.data, '{}.textproto'.format(csc.monster_id))
+        safe_save_to_file(behavior_data_file, monster_behavior)
+
+        behavior_text_file = os.path.join(dirs.text, '{}.txt'.format(csc.monster_id))
+        save_monster_behavior(behavior_text_file, csc, monster_behavior)
+
+        enemy_behavior = [x.na_skill for x in csc.enemy_behavior]
+        behavior_plain_file = os.path.join(dirs.plain, '{}.txt'.format(csc.monster_id))
+        save_behavior_plain(behavior_plain_file, csc, enemy_behavior)
+        return CardResult(csc.monster_id, card.name, True, None)
+    except Exception:
+        return CardResult(csc.monster_id, card.name, False, traceback.format_exc())
+
+
+# Cards for forked workers; inherited by the children rather than pickled.
+_fork_cards = []  # type: List[CrossServerCard]
+_fork_dirs = None  # type: Optional[OutputDirs]
+
+
+def _rebuild_forked_card(idx: int) -> CardResult:
+    return rebuild_card(_fork_cards[idx], _fork_dirs)
+
+
+def rebuild_cards(cards: List[CrossServerCard], dirs: OutputDirs, processes: int = 1):
+    """Yields the result for each card, in card order.
+
+    With processes > 1 (and a platform that can fork), the cards are rebuilt in forked workers. Each worker writes
+    the files of the monsters it rebuilt; every file depends only on its own monster, so the output is the same as a
+    serial run.
+    """
+    global _fork_cards, _fork_dirs
+    if processes <= 1 or len(cards) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        for csc in cards:
+            yield rebuild_card(csc, dirs)
+        return
+
+    _fork_cards, _fork_dirs = cards, dirs
+    try:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as executor:
+            # A few monsters take far longer than the rest, so hand out small chunks.
+            yield from executor.map(_rebuild_forked_card, range(len(cards)), chunksize=20)
+    finally:
+        _fork_cards, _fork_dirs = [], None
+
+
+def run(args) -> List[CardResult]:
+    """Rebuilds the behavior files, returning the cards that failed."""
+    dirs = OutputDirs(data=os.path.join(args.output_dir, 'behavior_data'),
+                      text=os.path.join(args.output_dir, 'behavior_text'),
+                      plain=os.path.join(args.output_dir, 'behavior_plain'))
+    for output_dir in dirs:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jp_db, na_db = merged_database.load_databases([Server.jp, Server.na], args.input_dir, args.load_processes,
+                                                  skip_bonus=True, skip_extra=True,
+                                                  snapshot_dir=args.snapshot_dir)
 
     print('merging data')
     if args.server.lower() == "jp":
@@ -237,43 +314,25 @@ def run(args):
     fixed_card_id = args.card_id
     if args.interactive:
         fixed_card_id = input("enter a card id:").strip()
+    if fixed_card_id:
+        combined_cards = [csc for csc in combined_cards if csc.monster_id == int(fixed_card_id)]
 
-    count = 0
-    for csc in combined_cards[count:]:
-        merged_card = csc.na_card
-        card = merged_card.card
-        if fixed_card_id and csc.monster_id != int(fixed_card_id):
-            continue
-        try:
-            count += 1
-            if count % 100 == 0:
-                print('processing {:4d} of {}'.format(count, len(combined_cards)))
-            monster_behavior = process_card(csc)
-            if monster_behavior is None:
-                continue
-
-            # Do some sanity cleanup on the behavior
-            monster_behavior = clean_monster_behavior(monster_behavior)
-
-            behavior_data_file = os.path.join(behavior_data_dir, '{}.textproto'.format(csc.monster_id))
-            safe_save_to_file(behavior_data_file, monster_behavior)
+    failures = []  # type: List[CardResult]
+    for count, result in enumerate(rebuild_cards(combined_cards, dirs, args.processes), start=1):
+        if count % 100 == 0:
+            print('processing {:4d} of {}'.format(count, len(combined_cards)))
+        if result.error:
+            print('failed to process', result.monster_id, result.name)
+            print(result.error)
+            failures.append(result)
 
-            behavior_text_file = os.path.join(behavior_text_dir, '{}.txt'.format(csc.monster_id))
-            save_monster_behavior(behavior_text_file, csc, monster_behavior)
-
-            enemy_behavior = [x.na_skill for x in csc.enemy_behavior]
-            behavior_plain_file = os.path.join(behavior_plain_dir, '{}.txt'.format(csc.monster_id))
-            save_behavior_plain(behavior_plain_file, csc, enemy_behavior)
-
-        except Exception as ex:
-            print('failed to process', csc.monster_id, card.name)
-            print(ex)
-            # if 'unsupported operation' not in str(ex):
-            import traceback
-            traceback.print_exc()
-            exit(0)
+    if failures:
+        print('{} of {} monsters failed:'.format(len(failures), len(combined_cards)))
+        for result in failures:
+            print('\t{} {}'.format(result.monster_id, result.name))
+    return failures
 
 
 if __name__ == '__main__':
     input_args = parse_args()
-    run(input_args)
+    sys.exit(1 if run(input_args) else 0)
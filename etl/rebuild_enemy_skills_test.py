@@ -0,0 +1,95 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import rebuild_enemy_skills
+from rebuild_enemy_skills import CardResult, OutputDirs, rebuild_cards
+
+FAILING_ID = 13
+EMPTY_ID = 14
+
+
+def _cards():
+    # More than one chunk of work for the forked workers.
+    return [SimpleNamespace(monster_id=i, na_card=SimpleNamespace(card=SimpleNamespace(name='card {}'.format(i))),
+                            enemy_behavior=[])
+            for i in range(1, 51)]
+
+
+@pytest.fixture(autouse=True)
+def stub_behavior(monkeypatch):
+    """Replaces the enemy skill simulation and file formats, keeping the per-card flow of rebuild_card."""
+
+    def process_card(csc):
+        if csc.monster_id == FAILING_ID:
+            raise ValueError('bad behavior')
+        if csc.monster_id == EMPTY_ID:
+            return None
+        return 'behavior {}'.format(csc.monster_id)
+
+    def save(path, *values):
+        with open(path, 'w') as f:
+            f.write(repr(values[-1]))
+        # Records which process wrote the file, outside the compared output.
+        with open(path + '.pid', 'w') as f:
+            f.write(str(os.getpid()))
+
+    monkeypatch.setattr(rebuild_enemy_skills, 'process_card', process_card)
+    monkeypatch.setattr(rebuild_enemy_skills, 'clean_monster_behavior', lambda behavior: behavior)
+    monkeypatch.setattr(rebuild_enemy_skills, 'safe_save_to_file', save)
+    monkeypatch.setattr(rebuild_enemy_skills, 'save_monster_behavior', save)
+    monkeypatch.setattr(rebuild_enemy_skills, 'save_behavior_plain', save)
+
+
+def _dirs(output_dir) -> OutputDirs:
+    dirs = OutputDirs(*(str(output_dir / d) for d in ['behavior_data', 'behavior_text', 'behavior_plain']))
+    for d in dirs:
+        os.makedirs(d)
+    return dirs
+
+
+def _read_output(output_dir, pids=False):
+    result = {}
+    for root, _, files in os.walk(str(output_dir)):
+        for file_name in files:
+            if file_name.endswith('.pid') == pids:
+                with open(os.path.join(root, file_name)) as f:
+                    result[os.path.relpath(os.path.join(root, file_name), str(output_dir))] = f.read()
+    return result
+
+
+def test_serial_and_forked_runs_match(tmp_path):
+    serial = list(rebuild_cards(_cards(), _dirs(tmp_path / 'serial'), processes=1))
+    forked = list(rebuild_cards(_cards(), _dirs(tmp_path / 'forked'), processes=2))
+
+    assert [r.monster_id for r in serial] == list(range(1, 51))
+    assert [r[:3] for r in forked] == [r[:3] for r in serial]
+
+    failed = serial[FAILING_ID - 1]
+    assert not failed.written
+    assert 'ValueError: bad behavior' in failed.error
+    assert 'ValueError: bad behavior' in forked[FAILING_ID - 1].error
+    assert serial[EMPTY_ID - 1] == CardResult(EMPTY_ID, 'card {}'.format(EMPTY_ID), False, None)
+    assert all(r.written and r.error is None for r in serial if r.monster_id not in (FAILING_ID, EMPTY_ID))
+
+    serial_files = _read_output(tmp_path / 'serial')
+    assert len(serial_files) == 3 * 48
+    assert 'behavior_data/{}.textproto'.format(FAILING_ID) not in serial_files
+    assert _read_output(tmp_path / 'forked') == serial_files
+
+    assert set(_read_output(tmp_path / 'serial', pids=True).values()) == {str(os.getpid())}
+    assert str(os.getpid()) not in set(_read_output(tmp_path / 'forked', pids=True).values())
+
+
+def test_run_returns_the_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(rebuild_enemy_skills.merged_database, 'load_databases', lambda *args, **kwargs: (None, None))
+    monkeypatch.setattr(rebuild_enemy_skills, 'CrossServerDatabase',
+                        lambda *args: SimpleNamespace(all_cards=_cards()))
+    args = SimpleNamespace(input_dir=None, output_dir=str(tmp_path), load_processes=1, snapshot_dir=None,
+                           server='NA', card_id=None, interactive=None, processes=2)
+
+    [failure] = rebuild_enemy_skills.run(args)
+    assert failure.monster_id == FAILING_ID
+    assert 'ValueError: bad behavior' in failure.error
+    assert os.path.exists(str(tmp_path / 'behavior_plain' / '1.txt'))
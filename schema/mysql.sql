@@ -29,6 +29,7 @@ CREATE TABLE `active_skill_tags` (
   `name_ko` text NOT NULL,
   `order_idx` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`active_skill_tag_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB AUTO_INCREMENT=1000 DEFAULT CHARSET=utf8;
@@ -73,6 +74,7 @@ CREATE TABLE `active_skills` (
   `turn_min` int(11) NOT NULL,
   `tags` text NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`active_skill_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -90,6 +92,7 @@ CREATE TABLE `active_skills_na` (
   `turn_min` int(11) NOT NULL,
   `tags` text NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`active_skill_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -106,6 +109,7 @@ CREATE TABLE `awakenings` (
   `is_super` tinyint(1) NOT NULL,
   `order_idx` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`awakening_id`),
   KEY `monster_id_idx` (`monster_id`),
   KEY `tstamp_idx` (`tstamp`),
@@ -122,6 +126,7 @@ CREATE TABLE `awakenings_na` (
   `is_super` tinyint(1) NOT NULL,
   `order_idx` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`awakening_id`),
   KEY `monster_id_idx` (`monster_id`),
   KEY `tstamp_idx` (`tstamp`),
@@ -181,6 +186,7 @@ CREATE TABLE `awoken_skills` (
   `adj_atk` int(11) NOT NULL,
   `adj_rcv` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`awoken_skill_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB AUTO_INCREMENT=73 DEFAULT CHARSET=utf8;
@@ -330,6 +336,7 @@ CREATE TABLE `dungeons` (
   `reward_icon_ids` text,
   `visible` tinyint(1) NOT NULL,
   `tstamp` bigint(20) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`dungeon_id`),
   KEY `tstamp` (`tstamp`),
   KEY `tdt_seq` (`series_id`),
@@ -351,6 +358,7 @@ CREATE TABLE `dungeons_na` (
   `reward_icon_ids` text,
   `visible` tinyint(1) NOT NULL,
   `tstamp` bigint(20) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`dungeon_id`),
   KEY `tstamp` (`tstamp`),
   KEY `tdt_seq` (`series_id`),
@@ -374,6 +382,7 @@ CREATE TABLE `egg_machines` (
   `cost` int(11) NOT NULL,
   `contents` text NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`egg_machine_id`),
   UNIQUE KEY `server_id` (`server_id`,`machine_row`,`machine_type`),
   KEY `tstamp` (`tstamp`),
@@ -415,6 +424,7 @@ CREATE TABLE `encounters` (
   `atk` bigint(20) NOT NULL,
   `defence` bigint(20) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`encounter_id`),
   KEY `tstamp` (`tstamp`),
   KEY `tsd_seq` (`sub_dungeon_id`),
@@ -456,6 +466,7 @@ CREATE TABLE `enemy_data` (
   `status` int(11) NOT NULL,
   `behavior` blob NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`enemy_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -466,6 +477,7 @@ CREATE TABLE `enemy_data_na` (
   `status` int(11) NOT NULL,
   `behavior` blob NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`enemy_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -488,6 +500,7 @@ CREATE TABLE `enemy_skills` (
   `max_hits` int(11) NOT NULL,
   `atk_mult` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`enemy_skill_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -506,6 +519,7 @@ CREATE TABLE `enemy_skills_na` (
   `max_hits` int(11) NOT NULL,
   `atk_mult` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`enemy_skill_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -527,6 +541,7 @@ CREATE TABLE `evolutions` (
   `mat_4_id` int(11) DEFAULT NULL,
   `mat_5_id` int(11) DEFAULT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`evolution_id`),
   KEY `from_id_idx` (`from_id`),
   KEY `to_id_idx` (`to_id`),
@@ -558,6 +573,7 @@ CREATE TABLE `evolutions_na` (
   `mat_4_id` int(11) DEFAULT NULL,
   `mat_5_id` int(11) DEFAULT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`evolution_id`),
   KEY `from_id_idx` (`from_id`),
   KEY `to_id_idx` (`to_id`),
@@ -595,6 +611,7 @@ CREATE TABLE `exchanges` (
   `order_idx` int(11) NOT NULL,
   `flags` tinyint(1) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`exchange_id`),
   UNIQUE KEY `trade_id` (`trade_id`,`server_id`),
   KEY `tstamp` (`tstamp`),
@@ -616,6 +633,7 @@ CREATE TABLE `leader_skill_tags` (
   `name_ko` text NOT NULL,
   `order_idx` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`leader_skill_tag_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB AUTO_INCREMENT=1000 DEFAULT CHARSET=utf8;
@@ -666,6 +684,7 @@ CREATE TABLE `leader_skills` (
   `extra_time` decimal(8,2) NOT NULL,
   `tags` text NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`leader_skill_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -689,6 +708,7 @@ CREATE TABLE `leader_skills_na` (
   `extra_time` decimal(8,2) NOT NULL,
   `tags` text NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`leader_skill_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -755,6 +775,7 @@ CREATE TABLE `monsters` (
   `latent_slots` int(11) NOT NULL,
   `name_en_override` text,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`monster_id`),
   KEY `attribute_1_idx` (`attribute_1_id`),
   KEY `attribute_2_idx` (`attribute_2_id`),
@@ -827,6 +848,7 @@ CREATE TABLE `monsters_na` (
   `latent_slots` int(11) NOT NULL,
   `name_en_override` text,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`monster_id`),
   KEY `attribute_1_idx` (`attribute_1_id`),
   KEY `attribute_2_idx` (`attribute_2_id`),
@@ -866,6 +888,7 @@ CREATE TABLE `alt_monsters` (
   `reg_date` date NOT NULL,
   `is_alt` int(1) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`alt_monster_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -878,6 +901,7 @@ CREATE TABLE `alt_monsters_na` (
   `reg_date` date NOT NULL,
   `is_alt` int(1) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`alt_monster_id`),
   KEY `tstamp_idx` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -913,6 +937,7 @@ CREATE TABLE `purchases` (
   `end_timestamp` int(11) NOT NULL,
   `permanent` tinyint(1) NOT NULL DEFAULT '0',
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`purchase_id`),
   UNIQUE KEY `pid` (`purchase_id`,`server_id`),
   KEY `tstamp` (`tstamp`),
@@ -937,6 +962,7 @@ CREATE TABLE `rank_rewards` (
   `friend` int(11) NOT NULL,
   `stamina` int(11) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`rank`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -1007,6 +1033,7 @@ CREATE TABLE `series` (
   `name_ko` text NOT NULL,
   `series_type` text,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`series_id`),
   KEY `tstamp` (`tstamp`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
@@ -1045,6 +1072,7 @@ CREATE TABLE `monster_series` (
   `series_id` int(11) NOT NULL,
   `priority` tinyint(1) NOT NULL,
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`monster_series_id`),
   KEY `tstamp` (`tstamp`),
   CONSTRAINT `monster_series_fk_monster_id` FOREIGN KEY (`monster_id`) REFERENCES `monsters` (`monster_id`) ON DELETE NO ACTION ON UPDATE NO ACTION,
@@ -1100,6 +1128,7 @@ CREATE TABLE `sub_dungeons` (
   `rewards` text,
   `technical` tinyint(4) NOT NULL DEFAULT '1',
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`sub_dungeon_id`),
   KEY `tstamp_idx` (`tstamp`),
   KEY `dungeon_id_idx` (`dungeon_id`),
@@ -1134,6 +1163,7 @@ CREATE TABLE `sub_dungeons_na` (
   `rewards` text,
   `technical` tinyint(4) NOT NULL DEFAULT '1',
   `tstamp` int(11) NOT NULL,
+  `content_hash` char(32) DEFAULT NULL,
   PRIMARY KEY (`sub_dungeon_id`),
   KEY `tstamp_idx` (`tstamp`),
   KEY `dungeon_id_idx` (`dungeon_id`),
@@ -11,19 +11,14 @@ from pad.common import pad_util
 from pad.common.shared_types import Server
 from pad.raw.skills import skill_text_typing
 from pad.raw.skills.emoji_en.enemy_skill_text import EnEmojiESTextConverter
-from pad.raw.skills.en.active_skill_text import EnASTextConverter
 from pad.raw.skills.en.enemy_skill_text import EnESTextConverter
-from pad.raw.skills.en.leader_skill_text import EnLSTextConverter
 from pad.raw.skills.enemy_skill_info import BEHAVIOR_MAP
-from pad.raw.skills.ja.active_skill_text import JaASTextConverter
 from pad.raw.skills.ja.enemy_skill_text import JaESTextConverter
-from pad.raw.skills.ja.leader_skill_text import JaLSTextConverter
 from pad.raw.skills.leader_skill_info import LeaderSkill
+from pad.raw.skills.skill_text_renderer import renderer
 from pad.raw_processor import merged_database
 from pad.raw_processor.crossed_data import CrossServerDatabase, CrossServerEnemySkill, CrossServerDungeon
 
-AS_CONVERTERS = (JaASTextConverter(), EnASTextConverter(), EnASTextConverter())
-LS_CONVERTERS = (JaLSTextConverter(), EnLSTextConverter(), EnLSTextConverter())
 ES_CONVERTERS = (JaESTextConverter(), EnESTextConverter(), EnESTextConverter(), EnEmojiESTextConverter())
 
 
@@ -39,6 +34,12 @@ def parse_args():
     input_group.add_argument("--image_data_only", default=False, action="store_true",
                              help="Should we only dump image availability")
     input_group.add_argument("--server", default="JP", help="Server to build for")
+    input_group.add_argument("--load_processes", type=int, default=1,
+                             help="Load the server databases in this many parallel processes")
+    input_group.add_argument("--snapshot_dir", required=False,
+                             help="Directory for parsed database snapshots, reused while the raw data is unchanged")
+    input_group.add_argument("--skill_text_cache", required=False,
+                             help="File of rendered skill text, reused for skills whose data is unchanged")
 
     help_group = parser.add_argument_group("Help")
     help_group.add_argument("-h", "--help", action="help",
@@ -75,17 +76,10 @@ def dump_data(args):
     if args.image_data_only:
         exit(0)
 
-    print('Processing JP')
-    jp_db = merged_database.Database(Server.jp, input_dir)
-    jp_db.load_database(skip_extra=True)
-
-    print('Processing NA')
-    na_db = merged_database.Database(Server.na, input_dir)
-    na_db.load_database(skip_extra=True)
-
-    print('Processing KR')
-    kr_db = merged_database.Database(Server.kr, input_dir)
-    kr_db.load_database(skip_extra=True)
+    print('Processing JP, NA and KR')
+    jp_db, na_db, kr_db = merged_database.load_databases([Server.jp, Server.na, Server.kr], input_dir,
+                                                         args.load_processes, skip_extra=True,
+                                                         snapshot_dir=args.snapshot_dir)
 
     print('Merging and saving')
     if args.server.lower() == "jp":
@@ -98,7 +92,10 @@ def dump_data(args):
         raise ValueError("Server must be JP, NA, or KR")
 
     cross_db = CrossServerDatabase(jp_db, na_db, kr_db, server)
+    if args.skill_text_cache:
+        renderer.load(args.skill_text_cache)
     save_cross_database(output_dir, cross_db)
+    renderer.save()
 
 
 def save_cross_database(output_dir: str, db: CrossServerDatabase):
@@ -113,12 +110,12 @@ def save_cross_database(output_dir: str, db: CrossServerDatabase):
     as_file = os.path.join(output_dir, 'active_skills.txt')
     with open(as_file, 'w', encoding='utf-8') as f:
         for css in db.active_skills:
-            dump_skill(f, css, AS_CONVERTERS, skill_text_typing.parse_as_conditions)
+            dump_skill(f, css, skill_text_typing.parse_as_conditions)
 
     ls_file = os.path.join(output_dir, 'leader_skills.txt')
     with open(ls_file, 'w', encoding='utf-8') as f:
         for css in db.leader_skills:
-            dump_skill(f, css, LS_CONVERTERS, skill_text_typing.parse_ls_conditions)
+            dump_skill(f, css, skill_text_typing.parse_ls_conditions)
 
     es_file = os.path.join(output_dir, 'enemy_skills.txt')
     with open(es_file, 'w', encoding='utf-8') as f:
@@ -144,15 +141,15 @@ def dump_monster(f, c):
     f.write('\n')
 
     if c.active_skill:
-        dump_skill(f, c.active_skill, AS_CONVERTERS, skill_text_typing.parse_as_conditions)
+        dump_skill(f, c.active_skill, skill_text_typing.parse_as_conditions)
 
     if c.leader_skill:
-        dump_skill(f, c.leader_skill, LS_CONVERTERS, skill_text_typing.parse_ls_conditions)
+        dump_skill(f, c.leader_skill, skill_text_typing.parse_ls_conditions)
 
 
 # Write active skill id/type, english name, raw english description, then computed descriptions for
-# english, japanese, and korean
-def dump_skill(f, css, converter, tag_extractor_fn):
+# english, japanese, and korean (korean uses the english text)
+def dump_skill(f, css, tag_extractor_fn):
     jp_skill = css.jp_skill
     na_skill = css.na_skill
     kr_skill = css.kr_skill
@@ -169,9 +166,9 @@ def dump_skill(f, css, converter, tag_extractor_fn):
             f.write('Stats: [{}, {}, {}, {}]\n'.format(cur_skill.hp, cur_skill.atk, cur_skill.rcv, cur_skill.shield))
 
     f.write('Game: {}\n'.format(na_skill.raw_description))
-    f.write('JP: {}\n'.format(cur_skill.full_text(converter[0]) or jp_skill.raw_description))
-    f.write('EN: {}\n'.format(cur_skill.full_text(converter[1]) or na_skill.raw_description))
-    f.write('KR: {}\n'.format(cur_skill.full_text(converter[2]) or kr_skill.raw_description))
+    f.write('JP: {}\n'.format(renderer.full_text(cur_skill, 'ja') or jp_skill.raw_description))
+    f.write('EN: {}\n'.format(renderer.full_text(cur_skill, 'en') or na_skill.raw_description))
+    f.write('KR: {}\n'.format(renderer.full_text(cur_skill, 'en') or kr_skill.raw_description))
     f.write('\n')
 
 